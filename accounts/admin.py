@@ -4,4 +4,8 @@ from accounts.models import User
 
 # Register your models here.
 
-admin.site.register(User)
\ No newline at end of file
+@admin.register(User)
+class UserAdmin(admin.ModelAdmin):
+    list_display = ("username", "user_type", "phone", "is_active")
+    # Do'kon, buyurtma va sharh formalaridagi autocomplete shu qidiruvdan foydalanadi
+    search_fields = ("username", "phone")
@@ -5,3 +5,6 @@ class UsersConfig(AppConfig):
     app_label = "accounts"
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from accounts import signals  # noqa: F401
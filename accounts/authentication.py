@@ -0,0 +1,153 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+
+USER_STATE_FIELDS = ('is_active', 'is_staff', 'is_superuser', 'user_type', 'first_registered_device')
+
+
+def device_hash(device_id):
+    if not device_id:
+        return ''
+    return hashlib.sha256(f'{settings.SECRET_KEY}:{device_id}'.encode()).hexdigest()[:32]
+
+
+class UserStateCache:
+    """Foydalanuvchi holatining jarayon ichidagi qisqa muddatli nusxasi.
+
+    Token ichida bo'lmagan ma'lumot kerak bo'lganda har so'rovda DB ga
+    murojaat qilinmaydi. Boshqa jarayonlardagi o'zgarish ttl soniyadan kech
+    ko'rinishi mumkin. Eng ko'pi maxsize ta foydalanuvchi saqlanadi (LRU).
+    """
+
+    def __init__(self, ttl=None, maxsize=None):
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else getattr(settings, 'USER_STATE_CACHE_TTL', 30)
+
+    @property
+    def maxsize(self):
+        return self._maxsize if self._maxsize is not None else getattr(settings, 'USER_STATE_CACHE_SIZE', 10000)
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._data.move_to_end(user_id)
+                    return entry[1]
+                del self._data[user_id]
+        state = User.objects.filter(pk=user_id).values(*USER_STATE_FIELDS).first()
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, state)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return state
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+user_states = UserStateCache()
+
+
+class ClaimsUser(TokenUser):
+    """Access token asosidagi foydalanuvchi, DB dan model sifatida yuklanmaydi.
+
+    is_active, is_staff, is_superuser va user_type claimlardan emas, user_states dan
+    olinadi: o'chirilgan yoki huquqi olingan foydalanuvchi token muddati tugashini
+    kutmasdan USER_STATE_CACHE_TTL soniya ichida rad etiladi.
+    """
+
+    @property
+    def state(self):
+        return user_states.get(self.id)
+
+    @cached_property
+    def is_active(self):
+        state = self.state
+        return bool(state and state['is_active'])
+
+    @cached_property
+    def is_staff(self):
+        state = self.state
+        return bool(state and state['is_staff'])
+
+    @cached_property
+    def is_superuser(self):
+        state = self.state
+        return bool(state and state['is_superuser'])
+
+    @cached_property
+    def user_type(self):
+        state = self.state
+        return state['user_type'] if state else None
+
+    @cached_property
+    def device_hash(self):
+        return self.token.get('device', '')
+
+
+class ClaimsAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
+
+
+class ClaimsRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['user_type'] = user.user_type
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['device'] = device_hash(user.first_registered_device)
+        return token
+
+
+def registered_device_hash(user):
+    if isinstance(user, ClaimsUser):
+        if user.device_hash:
+            return user.device_hash
+        state = user.state
+        return device_hash(state['first_registered_device']) if state else ''
+    return device_hash(user.first_registered_device)
+
+
+def register_device(user_id, device_id):
+    """Qurilmani faqat hali qurilma yozilmagan bo'lsa saqlaydi.
+
+    Bitta ustunli shartli UPDATE: parallel so'rovlardan faqat bittasi yutadi.
+    """
+    updated = User.objects.filter(
+        Q(first_registered_device__isnull=True) | Q(first_registered_device=''), pk=user_id,
+    ).update(first_registered_device=device_id)
+    user_states.invalidate(user_id)
+    return bool(updated)
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    """hashlib.scrypt, parametrlari PASSWORD_SCRYPT_* sozlamalaridan olinadi.
+
+    Algoritm nomi Django nikidek "scrypt", shuning uchun mavjud xeshlar tekshiriladi.
+    Parametrlar o'zgarsa, foydalanuvchi keyingi kirishida paroli yangi parametrlar bilan qayta xeshlanadi.
+    """
+
+    @property
+    def work_factor(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14)
+
+    @property
+    def block_size(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_BLOCK_SIZE', 8)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_SCRYPT_PARALLELISM', 1)
+
+    @property
+    def maxmem(self):
+        # hashlib standart chegarasi (32 MiB) katta work_factor uchun yetmaydi
+        return 256 * self.work_factor * self.block_size * self.parallelism
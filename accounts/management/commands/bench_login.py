@@ -0,0 +1,116 @@
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import get_hasher, make_password, check_password
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.revocation import RevocationIndex
+from seller.bench import benchmark_database, summarize
+
+PASSWORD = 'bench-pass-123'
+LOCAL_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-login'},
+    'ratelimit': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-login-ratelimit'},
+}
+
+
+def run(samples, iterations, func):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        begin = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - begin)
+    return iterations / (time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = ('Measure password verifications and full logins per second on one core for each hasher, '
+            'and the cost of a throttled login attempt.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--work-factor', type=int, action='append', dest='work_factors',
+                            help='scrypt work factor (N) to compare, can be repeated. Defaults to 2^14 and 2^15.')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        variants = [('pbkdf2', {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.PBKDF2PasswordHasher']})]
+        for work_factor in options['work_factors'] or [2 ** 14, 2 ** 15]:
+            variants.append((f'scrypt-n{work_factor}', {
+                'PASSWORD_HASHERS': ['accounts.hashers.ScryptPasswordHasher'],
+                'PASSWORD_SCRYPT_WORK_FACTOR': work_factor,
+            }))
+
+        results = {'cpu_count': os.cpu_count(), 'hashers': {}}
+        setup_test_environment()
+        try:
+            with benchmark_database(), override_settings(CACHES=LOCAL_CACHE):
+                for name, overrides in variants:
+                    with override_settings(**overrides, LOGIN_RATE_LIMITS={'ip': (10 ** 9, 60),
+                                                                          'username': (10 ** 9, 300)}):
+                        results['hashers'][name] = self._measure(name, options['iterations'])
+                with override_settings(LOGIN_RATE_LIMITS={'ip': (1, 60), 'username': (1, 300)}):
+                    results['throttled'] = self._throttled(options['iterations'])
+            results['revocation_check_ns'] = self._revocation_check()
+        finally:
+            teardown_test_environment()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"hasher":>16} {"verify/s":>9} {"login/s":>8} {"login p50 ms":>13} {"login p99 ms":>13}')
+        for name, stats in results['hashers'].items():
+            self.stdout.write(f'{name:>16} {stats["verify_per_second"]:>9.1f} {stats["logins_per_second"]:>8.1f} '
+                              f'{stats["login"]["p50_ms"]:>13.2f} {stats["login"]["p99_ms"]:>13.2f}')
+        throttled = results['throttled']
+        self.stdout.write(f'Throttled attempts: {throttled["rejections_per_second"]:.0f}/s, '
+                          f'p50 {throttled["latency"]["p50_ms"]:.2f} ms (no password hashing).')
+        self.stdout.write(f'Revoked refresh token lookup: {results["revocation_check_ns"]:.0f} ns '
+                          f'(100k revoked tokens in the index).')
+        self.stdout.write(f'Figures are per core; multiply by worker processes (cpu_count={results["cpu_count"]}).')
+
+    def _measure(self, name, iterations):
+        encoded = make_password(PASSWORD)
+        verify_samples, login_samples = [], []
+        verify_rate = run(verify_samples, iterations, lambda: check_password(PASSWORD, encoded))
+
+        username = f'bench-{name}'
+        User.objects.create_user(username=username, password=PASSWORD, user_type='user')
+        client = APIClient()
+        payload = {'username': username, 'password': PASSWORD}
+        login_rate = run(login_samples, iterations, lambda: client.post('/auth/login/', payload, format='json'))
+        return {
+            'algorithm': get_hasher().algorithm,
+            'verify_per_second': verify_rate,
+            'logins_per_second': login_rate,
+            'verify': summarize(verify_samples),
+            'login': summarize(login_samples),
+        }
+
+    def _throttled(self, iterations):
+        client = APIClient()
+        payload = {'username': 'attacker-target', 'password': 'wrong-password'}
+        client.post('/auth/login/', payload, format='json')
+        samples = []
+        statuses = set()
+        rate = run(samples, iterations, lambda: statuses.add(
+            client.post('/auth/login/', payload, format='json').status_code))
+        return {'rejections_per_second': rate, 'statuses': sorted(statuses), 'latency': summarize(samples)}
+
+    def _revocation_check(self, size=100000, lookups=1000000):
+        index = RevocationIndex()
+        now = time.time()
+        for n in range(size):
+            index.add(f'{n:032x}', now + 3600)
+        # Sinxronlash oralig'i ichidagi tekshiruv: faqat xotiradagi qidiruv
+        index._next_sync = time.monotonic() + 3600
+        probes = [f'{n * 7:032x}' for n in range(1000)]
+        started = time.perf_counter()
+        for _ in range(lookups // len(probes)):
+            for jti in probes:
+                index.is_revoked(jti)
+        return (time.perf_counter() - started) / lookups * 1e9
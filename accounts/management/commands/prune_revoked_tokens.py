@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from accounts.revocation import prune_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete revoked refresh tokens that have expired and can no longer be presented.'
+
+    def handle(self, *args, **options):
+        pruned = prune_expired()
+        self.stdout.write(self.style.SUCCESS(f'Pruned {pruned} expired revoked tokens.'))
@@ -0,0 +1,18 @@
+from django.db import models
+from django.utils import timezone
+
+
+class RevokedToken(models.Model):
+    """Ishlatilgan yoki bekor qilingan refresh tokenlar.
+
+    jti ustunidagi unique cheklov yakuniy tekshiruv: bitta tokenni ikki marta
+    almashtirib bo'lmaydi. id ning o'sish tartibi jarayonlardagi xotira
+    indeksi uchun o'zgarishlar jurnali vazifasini bajaradi.
+    """
+
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    def __str__(self):
+        return self.jti
@@ -13,4 +13,5 @@ class User(AbstractUser):
     payment_method = models.CharField(default=0, null=True, blank=True, max_length=16)
     first_registered_device = models.CharField(max_length=255, null=True, blank=True)
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
-    image = models.ImageField(upload_to='images/user/', blank=True, null=True)
\ No newline at end of file
+    image = models.ImageField(upload_to='images/user/', blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
\ No newline at end of file
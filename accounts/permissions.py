@@ -1,13 +1,26 @@
 from rest_framework.permissions import BasePermission
 
+from accounts.authentication import device_hash, registered_device_hash, register_device
+
+
 class IsUsingRegisteredDevice(BasePermission):
     def has_permission(self, request, view):
         user = request.user
         device_id = request.headers.get("Device-ID")
 
-        if not user.first_registered_device:
-            user.first_registered_device = device_id
-            user.save()
-            return True
+        registered = registered_device_hash(user)
+        if registered:
+            return registered == device_hash(device_id)
+
+        if device_id and not register_device(user.id, device_id):
+            # Boshqa so'rov qurilmani bizdan oldin yozib ulgurgan
+            return registered_device_hash(user) == device_hash(device_id)
+        return True
 
-        return user.first_registered_device == device_id
\ No newline at end of file
+
+class IsVendor(BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated) and (
+            user.is_staff or getattr(user, 'user_type', None) in ('vendor', 'admin')
+        )
@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.models import RevokedToken, User
+
+
+class TokenReused(Exception):
+    pass
+
+
+class InactiveUser(Exception):
+    pass
+
+
+class RevocationIndex:
+    """Bekor qilingan refresh token jti larining jarayon ichidagi indeksi (jti -> tugash vaqti).
+
+    Birinchi murojaatda amal qilayotgan yozuvlar yuklanadi, keyin har sync_interval
+    soniyada faqat id > oxirgi o'qilgan id bo'lgan yangi yozuvlar o'qiladi.
+    Indeks faqat tezlashtiradi: uni hali ko'rmagan token revoke() dagi unique
+    INSERT da baribir rad etiladi, shuning uchun noto'g'ri "bekor qilinmagan" javob bo'lmaydi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._expires = {}
+            self._last_id = 0
+            self._next_sync = 0.0
+            self._pruned_at = time.monotonic()
+
+    @property
+    def sync_interval(self):
+        return getattr(settings, 'REVOKED_TOKEN_SYNC_INTERVAL', 5)
+
+    @property
+    def prune_interval(self):
+        return getattr(settings, 'REVOKED_TOKEN_PRUNE_INTERVAL', 60 * 60)
+
+    def __contains__(self, jti):
+        return jti in self._expires
+
+    def __len__(self):
+        return len(self._expires)
+
+    def is_revoked(self, jti):
+        # Tez yo'l: bitta monotonic() va dict qidiruvi
+        if time.monotonic() >= self._next_sync:
+            self.sync()
+        return jti in self._expires
+
+    def add(self, jti, expires_at):
+        self._expires[jti] = expires_at
+
+    def sync(self):
+        with self._lock:
+            rows = RevokedToken.objects.filter(id__gt=self._last_id).order_by('id').values_list(
+                'id', 'jti', 'expires_at')
+            if self._last_id == 0:
+                rows = rows.filter(expires_at__gt=timezone.now())
+            for row_id, jti, expires_at in rows:
+                self._expires[jti] = expires_at.timestamp()
+                self._last_id = row_id
+            synced_at = time.monotonic()
+            self._next_sync = synced_at + self.sync_interval
+            if synced_at - self._pruned_at >= self.prune_interval:
+                self._prune()
+
+    def _prune(self):
+        now = time.time()
+        self._expires = {jti: expires for jti, expires in self._expires.items() if expires > now}
+        self._pruned_at = time.monotonic()
+        prune_expired()
+
+
+def prune_expired(now=None):
+    # Muddati o'tgan token imzo tekshiruvida rad etiladi, uning yozuvi endi kerak emas
+    return RevokedToken.objects.filter(expires_at__lte=now or timezone.now()).delete()[0]
+
+
+revoked_tokens = RevocationIndex()
+
+
+def revoke(token):
+    """Tokenni bekor qiladi; u allaqachon bekor qilingan bo'lsa TokenReused."""
+    jti, exp = token['jti'], token['exp']
+    if revoked_tokens.is_revoked(jti):
+        raise TokenReused(jti)
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc))
+    except IntegrityError:
+        revoked_tokens.add(jti, exp)
+        raise TokenReused(jti)
+    revoked_tokens.add(jti, exp)
+
+
+def rotate(token):
+    """Refresh tokenni bekor qilib, foydalanuvchining bazadagi holatidan yangi token qaytaradi.
+
+    Claimlar eski tokendan ko'chirilmaydi: huquqi olingan foydalanuvchi ularni qayta olmaydi.
+    Foydalanuvchi o'chirilgan yoki faol bo'lmasa InactiveUser.
+    """
+    revoke(token)
+    user = User.objects.filter(**{api_settings.USER_ID_FIELD: token.get(api_settings.USER_ID_CLAIM)}).first()
+    if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+        raise InactiveUser(token.get(api_settings.USER_ID_CLAIM))
+    return type(token).for_user(user)
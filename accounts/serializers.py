@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts.authentication import ClaimsRefreshToken
 from accounts.models import User
+from accounts.revocation import TokenReused, InactiveUser, rotate
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -30,8 +31,16 @@ class RefreshTokenSerializer(serializers.Serializer):
     def validate(self, attrs):
         refresh_token = attrs.get("refresh")
         try:
-            token = RefreshToken(refresh_token)
-            attrs["access"] = str(token.access_token)
+            token = ClaimsRefreshToken(refresh_token)
         except TokenError:
             raise serializers.ValidationError("Invalid refresh token.")
+        try:
+            # Har bir refresh token faqat bir marta ishlatiladi
+            token = rotate(token)
+        except TokenReused:
+            raise serializers.ValidationError("Refresh token has already been used.")
+        except InactiveUser:
+            raise serializers.ValidationError("User is inactive or does not exist.")
+        attrs["access"] = str(token.access_token)
+        attrs["refresh"] = str(token)
         return attrs
\ No newline at end of file
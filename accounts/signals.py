@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.authentication import user_states
+from accounts.models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_state(sender, instance, **kwargs):
+    user_states.invalidate(instance.pk)
@@ -1,3 +1,216 @@
-from django.test import TestCase
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.authentication import ClaimsRefreshToken, user_states
+from accounts.models import User, RevokedToken
+from accounts.revocation import revoked_tokens
+
+
+class StatelessAuthenticationTests(TestCase):
+    def setUp(self):
+        user_states.clear()
+        self.user = User.objects.create_user(username='buyer', password='secret-pass-123', user_type='user')
+
+    def client_for(self, user, device_id=None):
+        client = APIClient()
+        token = ClaimsRefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}', **({'HTTP_DEVICE_ID': device_id} if device_id else {}))
+        return client
+
+    def test_login_token_carries_claims(self):
+        response = self.client.post('/auth/login/', {'username': 'buyer', 'password': 'secret-pass-123'})
+        self.assertEqual(response.status_code, 200)
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access_token']}")
+        self.assertEqual(client.get('/seller/orders/').status_code, 200)
+        # Holat keshda: foydalanuvchi bazadan yuklanmaydi
+        with self.assertNumQueries(1):
+            self.assertEqual(client.get('/seller/orders/').status_code, 200)
+
+    def test_registered_device_is_checked_without_queries(self):
+        self.user.first_registered_device = 'phone-1'
+        self.user.save()
+
+        self.assertEqual(self.client_for(self.user, 'phone-1').get('/auth/test/').status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client_for(self.user, 'phone-1').get('/auth/test/').status_code, 200)
+            self.assertEqual(self.client_for(self.user, 'phone-2').get('/auth/test/').status_code, 403)
+
+    def test_first_device_is_registered_once(self):
+        first = self.client_for(self.user, 'phone-1')
+        self.assertEqual(first.get('/auth/test/').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.first_registered_device, 'phone-1')
+
+        # Token qurilma yozilishidan oldin berilgan, holat keshidan tekshiriladi
+        self.assertEqual(first.get('/auth/test/').status_code, 200)
+        self.assertEqual(self.client_for(User(pk=self.user.pk, user_type='user'), 'phone-2')
+                         .get('/auth/test/').status_code, 403)
+
+    def test_state_cache_is_bounded(self):
+        from accounts.authentication import UserStateCache
+
+        states = UserStateCache(ttl=30, maxsize=2)
+        others = [User.objects.create_user(username=f'user{n}', password='pass', user_type='user') for n in range(2)]
+        states.get(self.user.pk)
+        states.get(others[0].pk)
+        states.get(self.user.pk)
+        states.get(others[1].pk)
+        self.assertEqual(list(states._data), [self.user.pk, others[1].pk])
+
+        # Muddati o'tgan yozuv o'qishda tashlanadi va qayta yuklanadi
+        User.objects.filter(pk=self.user.pk).update(user_type='vendor')
+        with mock.patch('accounts.authentication.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(states.get(self.user.pk)['user_type'], 'vendor')
+        self.assertEqual(len(states), 2)
+
+    def test_deactivated_and_demoted_users_lose_access_before_token_expiry(self):
+        self.user.is_staff = True
+        self.user.save()
+        client = self.client_for(self.user)
+        self.assertEqual(client.get('/seller/cache/stats/').status_code, 200)
+
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(client.get('/seller/cache/stats/').status_code, 403)
+
+        # Boshqa jarayondagi o'zgarish: bu jarayon keshi USER_STATE_CACHE_TTL o'tgach yangilanadi
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(client.get('/seller/orders/').status_code, 200)
+        with mock.patch('accounts.authentication.time.monotonic', return_value=time.monotonic() + 31):
+            self.assertEqual(client.get('/seller/orders/').status_code, 401)
+            self.assertEqual(client.get('/seller/async/orders/').status_code, 401)
+
+
+LOCAL_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login-tests'},
+    'ratelimit': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'login-tests-ratelimit'},
+}
+
+
+@override_settings(CACHES=LOCAL_CACHE, LOGIN_RATE_LIMITS={'ip': (100, 60), 'username': (3, 300)})
+class LoginTests(TestCase):
+    def setUp(self):
+        caches['ratelimit'].clear()
+        self.user = User.objects.create_user(username='buyer', password='secret-pass-123', user_type='user')
+
+    def login(self, password, username='buyer', **extra):
+        return self.client.post('/auth/login/', {'username': username, 'password': password}, **extra)
+
+    def test_new_passwords_use_scrypt(self):
+        self.assertTrue(self.user.password.startswith('scrypt$16384$'))
+
+    def test_old_hash_is_upgraded_on_login(self):
+        User.objects.filter(pk=self.user.pk).update(
+            password=make_password('secret-pass-123', hasher='pbkdf2_sha256'))
+        self.assertEqual(self.login('secret-pass-123').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+        with self.settings(PASSWORD_SCRYPT_WORK_FACTOR=2 ** 15):
+            self.assertEqual(self.login('secret-pass-123').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$32768$'))
+
+    def test_attempts_over_the_limit_are_rejected_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login('wrong-password').status_code, 401)
+
+        with self.assertNumQueries(0):
+            response = self.login('secret-pass-123')
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Boshqa foydalanuvchi nomi bilan shu IP dan urinish mumkin
+        self.assertEqual(self.login('wrong-password', username='other').status_code, 401)
+
+    def test_successful_login_resets_username_counter(self):
+        for _ in range(2):
+            self.login('wrong-password')
+        self.assertEqual(self.login('secret-pass-123').status_code, 200)
+        for _ in range(2):
+            self.assertEqual(self.login('wrong-password').status_code, 401)
+
+    @override_settings(LOGIN_RATE_LIMITS={'ip': (2, 60), 'username': (100, 300)})
+    def test_ip_limit_covers_all_usernames(self):
+        self.login('wrong-password', username='a')
+        self.login('wrong-password', username='b')
+        self.assertEqual(self.login('wrong-password', username='c').status_code, 429)
+        # X-Forwarded-For ga ishonilmaydi (NUM_PROXIES=0)
+        self.assertEqual(self.login('wrong-password', username='c', HTTP_X_FORWARDED_FOR='10.0.0.3').status_code, 429)
+        self.assertEqual(self.login('wrong-password', username='c', REMOTE_ADDR='10.0.0.2').status_code, 401)
+
+
+class RefreshRotationTests(TestCase):
+    def setUp(self):
+        revoked_tokens.clear()
+        user_states.clear()
+        self.user = User.objects.create_user(username='buyer', password='secret-pass-123', user_type='user')
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+
+    def rotate(self, refresh):
+        return self.client.post('/auth/token/refresh/', {'refresh': refresh})
+
+    def test_refresh_token_is_rotated_once(self):
+        response = self.rotate(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = response.json()['refresh']
+        self.assertNotEqual(rotated, self.refresh)
+        self.assertEqual(ClaimsRefreshToken(rotated)['user_type'], 'user')
+
+        # Indeks tokenni biladi: rad etish DB ga murojaatsiz
+        with self.assertNumQueries(0):
+            self.assertEqual(self.rotate(self.refresh).status_code, 400)
+        self.assertEqual(self.rotate(rotated).status_code, 200)
+
+    def test_rotation_reads_claims_from_the_database(self):
+        staff = User.objects.create_user(username='admin', password='secret-pass-123', user_type='admin', is_staff=True)
+        refresh = str(ClaimsRefreshToken.for_user(staff))
+        User.objects.filter(pk=staff.pk).update(is_staff=False, user_type='user')
+
+        response = self.rotate(refresh)
+        self.assertEqual(response.status_code, 200)
+        rotated = ClaimsRefreshToken(response.json()['refresh'])
+        self.assertEqual((rotated['is_staff'], rotated['user_type']), (False, 'user'))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.json()['access']}")
+        self.assertEqual(client.get('/seller/cache/stats/').status_code, 403)
+
+        User.objects.filter(pk=staff.pk).update(is_active=False)
+        self.assertEqual(self.rotate(response.json()['refresh']).status_code, 400)
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.rotate(self.refresh).status_code, 400)
+
+    def test_reuse_is_rejected_when_the_index_has_not_seen_it(self):
+        jti = ClaimsRefreshToken(self.refresh)['jti']
+        with self.settings(REVOKED_TOKEN_SYNC_INTERVAL=3600):
+            revoked_tokens.sync()
+            # Boshqa jarayon tokenni almashtirgan, bu jarayon indeksi hali sinxronlanmagan
+            RevokedToken.objects.create(jti=jti, expires_at=timezone.now() + timedelta(days=1))
+            self.assertNotIn(jti, revoked_tokens)
+            self.assertEqual(self.rotate(self.refresh).status_code, 400)
+        self.assertIn(jti, revoked_tokens)
+
+    def test_index_loads_change_log_and_prunes_expired_entries(self):
+        now = timezone.now()
+        RevokedToken.objects.create(jti='live', expires_at=now + timedelta(days=1))
+        RevokedToken.objects.create(jti='expired', expires_at=now - timedelta(seconds=1))
+        self.assertTrue(revoked_tokens.is_revoked('live'))
+        self.assertFalse(revoked_tokens.is_revoked('expired'))
+
+        RevokedToken.objects.create(jti='later', expires_at=now + timedelta(days=1))
+        revoked_tokens.sync()
+        self.assertIn('later', revoked_tokens)
+
+        with self.settings(REVOKED_TOKEN_PRUNE_INTERVAL=0):
+            revoked_tokens.add('stale', time.time() - 1)
+            revoked_tokens.sync()
+        self.assertNotIn('stale', revoked_tokens)
+        self.assertFalse(RevokedToken.objects.filter(jti='expired').exists())
@@ -0,0 +1,99 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def counters():
+    # Atomik incr li kesh (settings dagi CACHES['ratelimit'] izohiga qarang)
+    return caches['ratelimit']
+
+
+class SlidingWindowLimiter:
+    """'ratelimit' keshidagi sirpanuvchi oyna hisoblagichi.
+
+    Har bir oyna uchun bitta hisoblagich saqlanadi. Joriy qiymat oldingi oyna
+    hisobining oynadan qolgan ulushi va joriy oyna hisobining yig'indisi sifatida baholanadi.
+    """
+
+    def __init__(self, scope, limit, window):
+        self.scope = scope
+        self.limit = limit
+        self.window = window
+
+    def keys(self, ident, now):
+        index = int(now // self.window)
+        return f'ratelimit:{self.scope}:{ident}:{index}', f'ratelimit:{self.scope}:{ident}:{index - 1}'
+
+    def estimate(self, counts, ident, now):
+        current, previous = self.keys(ident, now)
+        elapsed = (now % self.window) / self.window
+        return counts.get(current, 0) + counts.get(previous, 0) * (1 - elapsed)
+
+    def retry_after(self, counts, ident, now):
+        current, previous = self.keys(ident, now)
+        # Oldingi oyna hissasi limitdan pastga tushguncha kutiladi
+        excess = counts.get(current, 0) + counts.get(previous, 0) - self.limit + 1
+        if not counts.get(previous) or excess > counts[previous]:
+            return self.window - now % self.window
+        return max(1, math.ceil(excess / counts[previous] * self.window - now % self.window))
+
+    def hit(self, ident, now):
+        current, _ = self.keys(ident, now)
+        store = counters()
+        store.add(current, 0, timeout=2 * self.window)
+        try:
+            store.incr(current)
+        except ValueError:
+            # Kalit add va incr orasida muddati tugab o'chgan
+            store.set(current, 1, timeout=2 * self.window)
+
+    def clear(self, ident, now):
+        counters().delete_many(self.keys(ident, now))
+
+
+def login_limiters():
+    return [SlidingWindowLimiter(scope, *settings.LOGIN_RATE_LIMITS[scope]) for scope in ('ip', 'username')]
+
+
+def username_ident(username):
+    return hashlib.sha256(str(username or '').strip().lower().encode()).hexdigest()[:32]
+
+
+class LoginThrottle(BaseThrottle):
+    """Login urinishlarini IP va foydalanuvchi nomi bo'yicha cheklaydi; parol xeshlanishidan oldin ishlaydi.
+
+    Hisoblagichlar bitta get_many bilan o'qiladi. Muvaffaqiyatli kirishdan keyin
+    foydalanuvchi nomi hisoblagichi tozalanadi (``reset``).
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def idents(self, request):
+        return {'ip': self.get_ident(request), 'username': username_ident(request.data.get('username'))}
+
+    def allow_request(self, request, view):
+        now = time.time()
+        idents = self.idents(request)
+        limiters = login_limiters()
+        counts = counters().get_many([key for limiter in limiters for key in limiter.keys(idents[limiter.scope], now)])
+        for limiter in limiters:
+            if limiter.estimate(counts, idents[limiter.scope], now) >= limiter.limit:
+                self.wait_seconds = limiter.retry_after(counts, idents[limiter.scope], now)
+                return False
+        for limiter in limiters:
+            limiter.hit(idents[limiter.scope], now)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+    def reset(self, request):
+        now = time.time()
+        for limiter in login_limiters():
+            if limiter.scope == 'username':
+                limiter.clear(self.idents(request)['username'], now)
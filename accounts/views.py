@@ -4,10 +4,11 @@ from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
+from accounts.authentication import ClaimsRefreshToken
 from accounts.permissions import IsUsingRegisteredDevice
 from accounts.serializers import RegisterSerializer, LoginSerializer, RefreshTokenSerializer
+from accounts.throttling import LoginThrottle
 
 
 class RegisterAPIView(APIView):
@@ -30,7 +31,7 @@ class RegisterAPIView(APIView):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = ClaimsRefreshToken.for_user(user)
             return Response({
                 "user": serializer.data,
                 "access_token": str(refresh.access_token),
@@ -40,6 +41,8 @@ class RegisterAPIView(APIView):
 
 
 class LoginAPIView(APIView):
+    throttle_classes = [LoginThrottle]
+
     @extend_schema(
         tags=["auth"],
         request=LoginSerializer,
@@ -63,7 +66,8 @@ class LoginAPIView(APIView):
             if user:
                 if not user.is_active:
                     return Response({"error": "User account is inactive."}, status=status.HTTP_401_UNAUTHORIZED)
-                refresh = RefreshToken.for_user(user)
+                LoginThrottle().reset(request)
+                refresh = ClaimsRefreshToken.for_user(user)
                 return Response({
                     "access_token": str(refresh.access_token),
                     "refresh_token": str(refresh),
@@ -90,7 +94,8 @@ class RefreshTokenAPIView(APIView):
         serializer = RefreshTokenSerializer(data=request.data)
         if serializer.is_valid():
             return Response({
-                "access": serializer.validated_data["access"]
+                "access": serializer.validated_data["access"],
+                "refresh": serializer.validated_data["refresh"],
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
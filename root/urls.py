@@ -4,12 +4,15 @@ from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
+from seller.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('auth/', include('accounts.urls')),
     path('seller/', include('seller.urls')),
+    path('metrics/', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,10 @@
-from django.contrib import admin
+import re
 
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
 
 from seller.models.products import Product, ProductVariant, KeywordsProduct, PhotoProducts, VideoProducts, \
     CharacteristicsProduct, BulkPrice
@@ -8,29 +13,125 @@ from seller.models import Category
 from seller.models.products import Review
 from seller.models.orders import Order, OrderItem
 from seller.models.shop import Shop
+from seller.search import search_available, search_products
+
+ARTICUL = re.compile(r'^\d{8}$')
+
+
+def estimate_rows(model):
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        elif connection.vendor == 'sqlite':
+            # rowid indeksdan o'qiladi; o'chirilgan qatorlar hisobiga biroz ko'proq chiqishi mumkin
+            cursor.execute(f'SELECT MAX(rowid) FROM {table}')
+        else:
+            return None
+        row = cursor.fetchone()
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class ApproximateCountPaginator(Paginator):
+    """Filtrsiz katta jadvalda COUNT(*) o'rniga statistikadagi taxminiy qator sonini qaytaradi."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimate_rows(self.object_list.model)
+            if estimate is not None and estimate >= settings.ADMIN_APPROXIMATE_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    # "N total" uchun ikkinchi COUNT(*) yuborilmaydi
+    show_full_result_count = False
+
+
+class IndexedProductSearchMixin:
+    """Mahsulotni artikul bo'yicha unique indeksdan, nomlar bo'yicha to'liq matnli indeksdan qidiradi.
+
+    product_path: modeldan mahsulotgacha bo'lgan yo'l ('' yoki 'product__').
+    """
+
+    product_path = ''
 
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if ARTICUL.match(term):
+            return queryset.filter(**{f'{self.product_path}articul': term}), False
+        if search_available():
+            ids = search_products(term, limit=settings.ADMIN_SEARCH_LIMIT)
+            return queryset.filter(**{f'{self.product_path}pk__in': ids}), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("ru_name", "uz_name")
+    search_fields = ("ru_name", "uz_name")
+
+
+@admin.register(Shop)
+class ShopAdmin(admin.ModelAdmin):
+    list_display = ("name", "owner")
+    list_select_related = ("owner",)
+    search_fields = ("name",)
+    autocomplete_fields = ("owner",)
+
+
+@admin.register(Order)
+class OrderAdmin(ScalableAdmin):
+    list_display = ("id", "customer", "total_price", "created_at")
+    list_select_related = ("customer",)
+    autocomplete_fields = ("customer",)
+
+
+@admin.register(OrderItem)
+class OrderItemAdmin(ScalableAdmin):
+    list_display = ("id", "order", "product", "product_quantity", "price_per_unit")
+    list_select_related = ("order__customer", "product__shop")
+    raw_id_fields = ("order",)
+    autocomplete_fields = ("product",)
+
+
+@admin.register(Review)
+class ReviewAdmin(ScalableAdmin):
+    list_display = ("product", "user", "rating", "created_at")
+    list_select_related = ("product__shop", "user")
+    autocomplete_fields = ("product", "user")
 
-admin.site.register(Order)
-admin.site.register(OrderItem)
-admin.site.register(Category)
-admin.site.register(Shop)
-admin.site.register(Review)
 
 class PhotoProductsInline(admin.TabularInline):
     model = PhotoProducts
     extra = 1
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
 
 class VideoProductsInline(admin.TabularInline):
     model = VideoProducts
     extra = 1
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
 
 class ProductVariantInline(admin.TabularInline):
     model = ProductVariant
     extra = 1
 
+    def get_queryset(self, request):
+        # Qator sarlavhasi (__str__) mahsulot nomini o'qiydi
+        return super().get_queryset(request).select_related("product")
+
 class KeywordsInline(admin.TabularInline):
     model = KeywordsProduct
     extra = 1
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
 
 class CharacteriticsInline(admin.TabularInline):
     model = CharacteristicsProduct
@@ -41,46 +142,56 @@ class BulkPriceInline(admin.TabularInline):
     extra = 1
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name_ru", "name_uz", "amount")
-    search_fields = ("name_ru", "name_uz")
+class ProductAdmin(IndexedProductSearchMixin, ScalableAdmin):
+    list_display = ("articul", "name_ru", "name_uz", "shop", "category", "price", "amount")
+    list_select_related = ("shop__owner", "category")
+    search_fields = ("articul", "name_ru", "name_uz")
+    search_help_text = "Articul (8 digits) or name"
+    autocomplete_fields = ("shop", "category")
     inlines = [PhotoProductsInline, VideoProductsInline, ProductVariantInline, KeywordsInline, CharacteriticsInline, BulkPriceInline]
 
 
 @admin.register(ProductVariant)
-class ProductVariantAdmin(admin.ModelAdmin):
-    list_display = ("get_name_ru", "get_name_uz", "get_sold", "get_amount")
-    search_fields = ("product__name_ru", "product__name_uz", "optom_product__name_ru", "optom_product__name_uz")
+class ProductVariantAdmin(IndexedProductSearchMixin, ScalableAdmin):
+    list_display = ("get_name_ru", "get_name_uz", "color", "size", "stock", "get_amount")
+    list_select_related = ("product",)
+    search_fields = ("product__articul", "product__name_ru", "product__name_uz")
+    product_path = 'product__'
+    autocomplete_fields = ("product",)
 
     inlines = [PhotoProductsInline, VideoProductsInline, KeywordsInline]
 
+    @admin.display(description="Name RU", ordering="product__name_ru")
     def get_name_ru(self, obj):
-        return obj.product.name_ru if obj.product else obj.optom_product.name_ru if obj.optom_product else "-"
+        return obj.product.name_ru if obj.product else "-"
 
+    @admin.display(description="Name UZ", ordering="product__name_uz")
     def get_name_uz(self, obj):
-        return obj.product.name_uz if obj.product else obj.optom_product.name_uz if obj.optom_product else "-"
-
-    def get_sold(self, obj):
-        return obj.product.sold if obj.product else obj.optom_product.sold if obj.optom_product else False
+        return obj.product.name_uz if obj.product else "-"
 
+    @admin.display(description="Amount", ordering="product__amount")
     def get_amount(self, obj):
-        return obj.product.amount if obj.product else obj.optom_product.amount if obj.optom_product else 0
-
-    get_name_ru.short_description = "Name RU"
-    get_name_uz.short_description = "Name UZ"
-    get_sold.short_description = "Sold"
-    get_amount.short_description = "Amount"
+        return obj.product.amount if obj.product else 0
 
 
 
 @admin.register(KeywordsProduct)
-class KeywordsProductAdmin(admin.ModelAdmin):
+class KeywordsProductAdmin(ScalableAdmin):
     list_display = ("keyword", "product")
+    list_select_related = ("product__shop",)
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
 
 @admin.register(PhotoProducts)
-class PhotoProductsAdmin(admin.ModelAdmin):
+class PhotoProductsAdmin(ScalableAdmin):
     list_display = ("product", "image")
+    list_select_related = ("product__shop",)
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
 
 @admin.register(VideoProducts)
-class VideoProductsAdmin(admin.ModelAdmin):
+class VideoProductsAdmin(ScalableAdmin):
     list_display = ("product", "video")
+    list_select_related = ("product__shop",)
+    autocomplete_fields = ("product",)
+    raw_id_fields = ("product_variants",)
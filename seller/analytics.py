@@ -0,0 +1,156 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum, Count, Exists
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from seller.models.analytics import DailySales, DailySalesCustomer
+from seller.models.orders import OrderItem
+from seller.models.products import Product
+
+LINE_TOTAL = Sum(F('price_per_unit') * F('product_quantity'))
+
+
+def sale_date(order):
+    return timezone.localdate(order.created_at)
+
+
+def sale_line(order, product_id, units, revenue):
+    return sale_date(order), product_id, order.customer_id, units, revenue
+
+
+def day_bounds(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+def _aggregate(items, day_expression):
+    # Natija (kun, mahsulot) bo'yicha guruhlanadi
+    items = items.annotate(day=day_expression).order_by()
+    keys = ('day', 'product_id', 'product__shop_id', 'product__category_id')
+    totals = items.values(*keys).annotate(units=Sum('product_quantity'), revenue=LINE_TOTAL)
+    customers = items.values_list(*keys, 'order__customer_id').distinct()
+    sales = [
+        DailySales(date=row['day'], product_id=row['product_id'], shop_id=row['product__shop_id'],
+                   category_id=row['product__category_id'], units=row['units'] or 0, revenue=row['revenue'] or 0)
+        for row in totals
+    ]
+    buyers = [
+        DailySalesCustomer(date=day, product_id=product_id, shop_id=shop_id, category_id=category_id,
+                           customer_id=customer_id)
+        for day, product_id, shop_id, category_id, customer_id in customers
+    ]
+    return sales, buyers
+
+
+def _totals(lines):
+    totals = defaultdict(lambda: [0, Decimal('0')])
+    for day, product_id, _, units, revenue in lines:
+        total = totals[day, product_id]
+        total[0] += units
+        total[1] += revenue
+    return totals
+
+
+def _day_items(day, product_id, **filters):
+    start, end = day_bounds(day)
+    return OrderItem.objects.filter(product_id=product_id, order__created_at__gte=start, order__created_at__lt=end,
+                                    **filters)
+
+
+def add_sales(lines):
+    """(kun, mahsulot, xaridor, dona, summa) qatorlarini rollup ga qo'shadi.
+
+    O'zgarish bilan bir tranzaksiyada chaqiriladi: qator bo'lmasa ignore_conflicts bilan
+    yaratiladi, keyin F() bilan oshiriladi, shuning uchun parallel yozuvlar unique cheklovga urilmaydi.
+    """
+    lines = list(lines)
+    if not lines:
+        return
+    totals = _totals(lines)
+    owners = {
+        product_id: (shop_id, category_id)
+        for product_id, shop_id, category_id in Product.objects.filter(
+            pk__in={product_id for _, product_id in totals}).values_list('pk', 'shop_id', 'category_id')
+    }
+    DailySales.objects.bulk_create([
+        DailySales(date=day, product_id=product_id, shop_id=owners[product_id][0], category_id=owners[product_id][1])
+        for day, product_id in totals
+    ], ignore_conflicts=True)
+    DailySalesCustomer.objects.bulk_create([
+        DailySalesCustomer(date=day, product_id=product_id, shop_id=owners[product_id][0],
+                           category_id=owners[product_id][1], customer_id=customer_id)
+        for day, product_id, customer_id in {line[:3] for line in lines}
+    ], ignore_conflicts=True)
+    for (day, product_id), (units, revenue) in totals.items():
+        DailySales.objects.filter(date=day, product_id=product_id).update(
+            units=F('units') + units, revenue=F('revenue') + revenue)
+
+
+def remove_sales(lines):
+    """add_sales ning teskarisi; OrderItem o'chirilgan yoki o'zgartirilgandan keyin chaqiriladi.
+
+    Kun va mahsulot (yoki xaridor) bo'yicha boshqa qator qolmagan bo'lsa rollup qatori o'chiriladi.
+    """
+    lines = list(lines)
+    for (day, product_id), (units, revenue) in _totals(lines).items():
+        rows = DailySales.objects.filter(date=day, product_id=product_id)
+        rows.update(units=F('units') - units, revenue=F('revenue') - revenue)
+        rows.filter(~Exists(_day_items(day, product_id))).delete()
+    for day, product_id, customer_id in {line[:3] for line in lines}:
+        DailySalesCustomer.objects.filter(date=day, product_id=product_id, customer_id=customer_id).filter(
+            ~Exists(_day_items(day, product_id, order__customer_id=customer_id))).delete()
+
+
+def rebuild_sales(start=None, end=None, batch_size=1000):
+    items = OrderItem.objects.all()
+    sales = DailySales.objects.all()
+    buyers = DailySalesCustomer.objects.all()
+    if start is not None:
+        items = items.filter(order__created_at__gte=day_bounds(start)[0])
+        sales, buyers = sales.filter(date__gte=start), buyers.filter(date__gte=start)
+    if end is not None:
+        items = items.filter(order__created_at__lt=day_bounds(end)[1])
+        sales, buyers = sales.filter(date__lte=end), buyers.filter(date__lte=end)
+
+    new_sales, new_buyers = _aggregate(items, TruncDate('order__created_at'))
+    with transaction.atomic():
+        sales.delete()
+        buyers.delete()
+        DailySales.objects.bulk_create(new_sales, batch_size=batch_size)
+        DailySalesCustomer.objects.bulk_create(new_buyers, batch_size=batch_size)
+    return len(new_sales)
+
+
+def sales_series(start, end, **filters):
+    rows = DailySales.objects.filter(date__range=(start, end), **filters).values('date').order_by('date').annotate(
+        units=Sum('units'), revenue=Sum('revenue'))
+    buyers = DailySalesCustomer.objects.filter(date__range=(start, end), **filters)
+    daily_customers = dict(buyers.values('date').order_by().annotate(
+        customers=Count('customer_id', distinct=True)).values_list('date', 'customers'))
+
+    series = [
+        {'date': row['date'], 'units': row['units'], 'revenue': row['revenue'],
+         'customers': daily_customers.get(row['date'], 0)}
+        for row in rows
+    ]
+    return {
+        'units': sum(point['units'] for point in series),
+        'revenue': sum((point['revenue'] for point in series), 0),
+        'customers': buyers.values('customer_id').distinct().count(),
+        'series': series,
+    }
+
+
+def top_products(start, end, limit=10, **filters):
+    rows = list(DailySales.objects.filter(date__range=(start, end), **filters).values('product_id').order_by().annotate(
+        units=Sum('units'), revenue=Sum('revenue')).order_by('-revenue', 'product_id')[:limit])
+    names = Product.objects.only('name_ru', 'name_uz').in_bulk([row['product_id'] for row in rows])
+    return [
+        {'product': row['product_id'], 'name_ru': names[row['product_id']].name_ru,
+         'name_uz': names[row['product_id']].name_uz, 'units': row['units'], 'revenue': row['revenue']}
+        for row in rows if row['product_id'] in names
+    ]
@@ -5,3 +5,11 @@ class CommerceConfig(AppConfig):
     app_label = "seller"
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seller'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from seller import signals  # noqa: F401
+        from seller.instrumentation import install_query_recorder
+
+        connection_created.connect(install_query_recorder, dispatch_uid='seller_query_recorder')
@@ -0,0 +1,142 @@
+import hashlib
+import math
+import threading
+from collections import deque
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction, connection, connections
+from django.db.models import F
+
+from seller.models.articul import ArticulSequence
+
+ARTICUL_MIN = 10000000
+ARTICUL_SPACE = 90000000
+
+
+class ArticulSpaceExhausted(Exception):
+    pass
+
+
+class FeistelPermutation:
+    """[0, domain) oralig'idagi sonlarni takrorlanmas tarzda aralashtiradi.
+
+    Muvozanatli Feistel tarmog'i [0, half**2) ustida ishlaydi, domain dan
+    tashqariga chiqqan qiymatlar qayta shifrlanadi (cycle walking).
+    """
+
+    def __init__(self, domain, key, rounds=4):
+        self.domain = domain
+        self.half = math.isqrt(domain - 1) + 1
+        self.key = hashlib.sha256(key.encode()).digest()
+        self.rounds = rounds
+
+    def _round(self, index, value):
+        digest = hashlib.blake2b(value.to_bytes(8, 'big'), digest_size=8, key=self.key, salt=bytes([index]) * 16).digest()
+        return int.from_bytes(digest, 'big') % self.half
+
+    def permute(self, value):
+        if not 0 <= value < self.domain:
+            raise ValueError(f'{value} is outside of [0, {self.domain}).')
+        while True:
+            left, right = divmod(value, self.half)
+            for index in range(self.rounds):
+                left, right = right, (left + self._round(index, right)) % self.half
+            value = left * self.half + right
+            if value < self.domain:
+                return value
+
+
+class ArticulAllocator:
+    """Artikullarni DB dagi hisoblagichdan bloklab oladi.
+
+    Har bir hisoblagich qiymati Feistel orqali 8 xonali songa aylantiriladi,
+    shuning uchun qiymatlar takrorlanmaydi va ketma-ket ko'rinmaydi. Chaqiruvchi
+    tranzaksiya ichida bo'lsa, blok alohida autocommit ulanishda olinadi: hisoblagich
+    qatori qulfi tashqi commit gacha ushlanmaydi. SQLite da yozuvchi baribir bitta,
+    shuning uchun blok joriy tranzaksiyada olinadi va ortig'i faqat commit dan keyin
+    xotiraga qo'shiladi (rollback bo'lsa hisoblagich bilan birga bekor bo'ladi).
+    """
+
+    def __init__(self, sequence='product', block_size=None, domain=ARTICUL_SPACE, offset=ARTICUL_MIN):
+        self.sequence = sequence
+        self.block_size = block_size or getattr(settings, 'ARTICUL_BLOCK_SIZE', 100)
+        self.offset = offset
+        self.width = len(str(offset + domain - 1))
+        self.permutation = FeistelPermutation(domain, getattr(settings, 'ARTICUL_PERMUTATION_KEY', 'optomol-articul'))
+        self._pending = deque()
+        self._lock = threading.Lock()
+
+    def allocate(self, count=1):
+        with self._lock:
+            articuls = []
+            while len(articuls) < count:
+                # Blok to'liq eski artikullar bilan to'qnashsa _reserve bo'sh ro'yxat qaytaradi: keyingisi olinadi.
+                # Hisoblagich oraliq oxiriga yetganda _reserve ArticulSpaceExhausted beradi
+                while not self._pending:
+                    self._pending.extend(self._reserve(count - len(articuls)))
+                articuls.append(self._pending.popleft())
+            return articuls
+
+    def reset(self):
+        with self._lock:
+            self._pending.clear()
+
+    def _reserve(self, needed):
+        size = max(needed, self.block_size)
+        deferred = False
+        if not connection.in_atomic_block:
+            start = self._bump(size)
+        elif connection.vendor == 'sqlite':
+            start = self._bump(size)
+            deferred = True
+        else:
+            start = self._bump_independent(size)
+        size = min(size, self.permutation.domain - start)
+        if size <= 0:
+            raise ArticulSpaceExhausted(f'Articul sequence {self.sequence!r} is exhausted.')
+
+        values = [str(self.offset + self.permutation.permute(n)).zfill(self.width) for n in range(start, start + size)]
+        # Eski tasodifiy artikullar bilan to'qnashuvni bitta so'rovda tekshiramiz
+        product_model = apps.get_model('seller', 'Product')
+        taken = set(product_model.objects.filter(articul__in=values).values_list('articul', flat=True))
+        values = [value for value in values if value not in taken]
+        if deferred:
+            extra = values[needed:]
+            transaction.on_commit(lambda: self._release(extra))
+            values = values[:needed]
+        return values
+
+    def _release(self, values):
+        with self._lock:
+            self._pending.extend(values)
+
+    def _bump(self, size):
+        with transaction.atomic():
+            updated = ArticulSequence.objects.filter(name=self.sequence).update(next_value=F('next_value') + size)
+            if not updated:
+                ArticulSequence.objects.get_or_create(name=self.sequence)
+                ArticulSequence.objects.filter(name=self.sequence).update(next_value=F('next_value') + size)
+            end = ArticulSequence.objects.filter(name=self.sequence).values_list('next_value', flat=True).get()
+        return end - size
+
+    def _bump_independent(self, size):
+        # Alohida ulanish autocommit rejimida: UPDATE darhol commit bo'ladi va qulf bo'shaydi
+        other = connections.create_connection(connection.alias)
+        table = other.ops.quote_name(ArticulSequence._meta.db_table)
+        update = f'UPDATE {table} SET next_value = next_value + %s WHERE name = %s RETURNING next_value'
+        try:
+            with other.cursor() as cursor:
+                cursor.execute(update, [size, self.sequence])
+                row = cursor.fetchone()
+                if row is None:
+                    cursor.execute(f'INSERT INTO {table} (name, next_value) VALUES (%s, 0) '
+                                   f'ON CONFLICT (name) DO NOTHING', [self.sequence])
+                    cursor.execute(update, [size, self.sequence])
+                    row = cursor.fetchone()
+        finally:
+            other.close()
+        return row[0] - size
+
+
+articul_allocator = ArticulAllocator()
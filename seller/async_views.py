@@ -0,0 +1,68 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+
+from accounts.authentication import ClaimsAuthentication
+from seller.facets import filter_products, parse_selection
+from seller.models.orders import Order
+from seller.models.products import Review
+from seller.pagination import keyset_page
+from seller.serializers import ProductsSerializer, OrderSerializer, ReviewSerializer
+from seller.views import product_catalog_queryset
+
+# Foydalanuvchi bazadan yuklanmaydi, holati user_states keshidan tekshiriladi
+authentication = ClaimsAuthentication()
+
+
+async def authenticate(request):
+    try:
+        result = await sync_to_async(authentication.authenticate)(request)
+    except AuthenticationFailed as exc:
+        return None, JsonResponse({'detail': str(exc.detail)}, status=401)
+    if result is None:
+        return None, JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    return result[0], None
+
+
+def page_response(serializer_class, rows, next_url, request):
+    # Ma'lumotlar oldindan yuklangan, serializer bazaga murojaat qilmaydi
+    return JsonResponse({
+        'next': next_url,
+        'results': serializer_class(rows, many=True, context={'request': request}).data,
+    })
+
+
+def invalid_cursor(exc):
+    return JsonResponse({'detail': str(exc)}, status=404)
+
+
+async def product_list(request):
+    queryset = filter_products(product_catalog_queryset(), parse_selection(request.GET))
+    try:
+        rows, next_url = await keyset_page(request, queryset, ('created_at', 'id'))
+    except ValueError as exc:
+        return invalid_cursor(exc)
+    return page_response(ProductsSerializer, rows, next_url, request)
+
+
+async def order_history(request):
+    user, error = await authenticate(request)
+    if error is not None:
+        return error
+    queryset = Order.objects.filter(customer_id=user.id).prefetch_related('order_items')
+    try:
+        rows, next_url = await keyset_page(request, queryset, ('id',))
+    except ValueError as exc:
+        return invalid_cursor(exc)
+    return page_response(OrderSerializer, rows, next_url, request)
+
+
+async def review_list(request):
+    queryset = Review.objects.all()
+    if request.GET.get('product', '').isdigit():
+        queryset = queryset.filter(product_id=int(request.GET['product']))
+    try:
+        rows, next_url = await keyset_page(request, queryset, ('id',))
+    except ValueError as exc:
+        return invalid_cursor(exc)
+    return page_response(ReviewSerializer, rows, next_url, request)
@@ -0,0 +1,41 @@
+import threading
+
+from django.db import transaction
+
+_pending = threading.local()
+
+
+class _Batch:
+    def __init__(self, func, key, registry):
+        self.func = func
+        self.key = key
+        self.registry = registry
+        self.items = set()
+        # Har murojaatda yangi bound method yaratiladi: run_on_commit da shu obyekt qidiriladi
+        self.callback = self.flush
+
+    def flush(self):
+        if self.registry.get(self.key) is self:
+            del self.registry[self.key]
+        self.func(self.items)
+
+
+def on_commit_batched(func, item, using=None):
+    """func(items) ni tranzaksiya commit bo'lgandan keyin bir marta, yig'ilgan elementlar bilan chaqiradi.
+
+    Tranzaksiyadan tashqarida darhol chaqiriladi. Tranzaksiya bekor qilinsa
+    yig'ilgan elementlar ham tashlab yuboriladi.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        func({item})
+        return
+
+    batches = _pending.__dict__.setdefault('batches', {})
+    key = (func, connection.alias)
+    batch = batches.get(key)
+    # Tranzaksiya yoki savepoint bekor qilingan bo'lsa callback ro'yxatdan chiqib ketgan
+    if batch is None or not any(callback is batch.callback for _, callback, _ in connection.run_on_commit):
+        batch = batches[key] = _Batch(func, key, batches)
+        transaction.on_commit(batch.callback, using=using)
+    batch.items.add(item)
@@ -0,0 +1,51 @@
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def benchmark_database(file_backed=False):
+    # Benchmarklar ishchi bazaga tegmasligi uchun vaqtinchalik test bazasida ishlaydi.
+    # Ko'p oqimli sinovlar uchun SQLite xotiradagi emas, fayldagi bazada ochiladi.
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    previous_name = test_settings.get('NAME')
+    if file_backed and connection.vendor == 'sqlite' and not previous_name:
+        test_settings['NAME'] = os.path.join(tempfile.gettempdir(), f'optomol_bench_{os.getpid()}.sqlite3')
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings['NAME'] = previous_name
+
+
+@contextmanager
+def timer(samples):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - started)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p90_ms': percentile(samples, 90) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
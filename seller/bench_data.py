@@ -0,0 +1,127 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import User
+from seller.analytics import rebuild_sales
+from seller.facets import rebuild_facets
+from seller.models import Category, Shop
+from seller.models.orders import Order, OrderItem, OrderMonthlySummary
+from seller.models.products import Product, ProductVariant, BulkPrice, KeywordsProduct, Review
+from seller.search import index_products, search_available
+
+BENCH_PASSWORD = 'bench-pass-123'
+
+SCALES = {
+    'small': {'customers': 50, 'vendors': 5, 'shops': 10, 'categories': 10, 'products': 500, 'variants': 2,
+              'bulk_prices': 2, 'orders': 200, 'items_per_order': 3, 'reviews': 300},
+    'medium': {'customers': 500, 'vendors': 20, 'shops': 50, 'categories': 30, 'products': 5000, 'variants': 3,
+               'bulk_prices': 3, 'orders': 2000, 'items_per_order': 4, 'reviews': 3000},
+    'large': {'customers': 5000, 'vendors': 100, 'shops': 300, 'categories': 60, 'products': 50000, 'variants': 3,
+              'bulk_prices': 3, 'orders': 20000, 'items_per_order': 5, 'reviews': 30000},
+}
+
+WORDS = ['choy', 'qahva', 'shakar', 'guruch', 'un', 'yog', 'sovun', 'shampun', 'daftar', 'ruchka', 'telefon',
+         'kabel', 'ko\'ylak', 'shim', 'poyabzal', 'sumka', 'idish', 'piyola', 'choynak', 'gilam']
+RU_WORDS = ['чай', 'кофе', 'сахар', 'рис', 'мука', 'масло', 'мыло', 'шампунь', 'тетрадь', 'ручка', 'телефон',
+            'кабель', 'рубашка', 'брюки', 'обувь', 'сумка', 'посуда', 'пиала', 'чайник', 'ковер']
+COLORS = ['red', 'blue', 'green', 'black', 'white']
+SIZES = ['s', 'm', 'l', 'xl']
+
+
+def generate(scale='small', seed=0, batch_size=1000, **overrides):
+    """Benchmark uchun sintetik ma'lumot yaratadi; bir xil seed bir xil ma'lumot beradi.
+
+    Barcha yozuvlar bulk_create bilan yoziladi, signallar chaqirilmaydi, shuning
+    uchun qidiruv indeksi, facetlar va reyting/summa yig'indilari oxirida
+    bir marta qayta hisoblanadi.
+    """
+    sizes = {**SCALES[scale], **{key: value for key, value in overrides.items() if value is not None}}
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)
+
+    with transaction.atomic():
+        customers = User.objects.bulk_create([
+            User(username=f'bench-customer-{n}', password=password, user_type='user') for n in range(sizes['customers'])
+        ], batch_size=batch_size)
+        vendors = User.objects.bulk_create([
+            User(username=f'bench-vendor-{n}', password=password, user_type='vendor') for n in range(sizes['vendors'])
+        ], batch_size=batch_size)
+        categories = Category.objects.bulk_create([
+            Category(image='images/category/bench.png', ru_name=f'Категория {n}', uz_name=f'Kategoriya {n}')
+            for n in range(sizes['categories'])
+        ], batch_size=batch_size)
+        shops = Shop.objects.bulk_create([
+            Shop(owner=vendors[n % len(vendors)], name=f'Shop {n}', description='Bench', image='images/shop/bench.png')
+            for n in range(sizes['shops'])
+        ], batch_size=batch_size)
+
+        products = []
+        for articul in Product.generate_articuls(sizes['products']):
+            word = rng.randrange(len(WORDS))
+            products.append(Product(
+                shop=rng.choice(shops), category=rng.choice(categories), articul=articul,
+                name_uz=f'{WORDS[word]} {rng.randint(1, 999)}', name_ru=f'{RU_WORDS[word]} {rng.randint(1, 999)}',
+                description_uz=' '.join(rng.sample(WORDS, 5)), description_ru=' '.join(rng.sample(RU_WORDS, 5)),
+                price=rng.randint(1000, 200000), amount=10 ** 6,
+            ))
+        Product.objects.bulk_create(products, batch_size=batch_size)
+
+        ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, color=rng.choice(COLORS), size=rng.choice(SIZES), stock=10 ** 6,
+                           price=product.price)
+            for product in products for _ in range(sizes['variants'])
+        ], batch_size=batch_size)
+        BulkPrice.objects.bulk_create([
+            BulkPrice(product=product, min_quantity=10 ** (tier + 1),
+                      price_per_unit=Decimal(product.price) * (Decimal('0.95') - Decimal('0.05') * tier))
+            for product in products for tier in range(sizes['bulk_prices'])
+        ], batch_size=batch_size)
+        KeywordsProduct.objects.bulk_create([
+            KeywordsProduct(product=product, keyword=rng.choice(WORDS)) for product in products
+        ], batch_size=batch_size)
+
+        # Buyurtmalar oxirgi 90 kunga tarqatiladi, analitika va oylik yig'indilar bo'sh qolmasligi uchun
+        now = timezone.now()
+        orders = Order.objects.bulk_create([
+            Order(customer=rng.choice(customers), created_at=now - timedelta(minutes=rng.randint(0, 90 * 24 * 60)))
+            for _ in range(sizes['orders'])
+        ], batch_size=batch_size)
+        items = []
+        purchased = set()
+        for order in orders:
+            order.total_price = Decimal('0')
+            for product in rng.sample(products, min(sizes['items_per_order'], len(products))):
+                quantity = rng.randint(1, 10)
+                items.append(OrderItem(order=order, product=product, product_quantity=quantity,
+                                       price_per_unit=product.price))
+                order.total_price += product.price * quantity
+                purchased.add((order.customer_id, product.id))
+        OrderItem.objects.bulk_create(items, batch_size=batch_size)
+        Order.objects.bulk_update(orders, ['total_price'], batch_size=batch_size)
+
+        reviews = rng.sample(sorted(purchased), min(sizes['reviews'], len(purchased)))
+        Review.objects.bulk_create([
+            Review(user_id=user_id, product_id=product_id, rating=rng.randint(1, 5), comment='Bench')
+            for user_id, product_id in reviews
+        ], batch_size=batch_size)
+
+        OrderMonthlySummary.rebuild()
+        rebuild_sales(batch_size=batch_size)
+        Product.recompute_ratings(batch_size=batch_size)
+        rebuild_facets(batch_size=batch_size)
+        if search_available():
+            index_products([product.id for product in products])
+
+    return {
+        'sizes': sizes,
+        'customers': [user.id for user in customers],
+        'vendors': [user.id for user in vendors],
+        'products': [product.id for product in products],
+        'purchased': sorted(purchased - set(reviews)),
+        'words': WORDS,
+    }
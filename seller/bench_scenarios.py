@@ -0,0 +1,153 @@
+import time
+from collections import defaultdict
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.authentication import ClaimsRefreshToken
+from accounts.models import User
+from seller.bench import summarize
+from seller.bench_data import BENCH_PASSWORD
+
+
+class Recorder:
+    """Har bir endpoint uchun javob vaqti, SQL so'rovlar soni va xatolarni yig'adi."""
+
+    def __init__(self):
+        self.client = APIClient()
+        self.samples = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def request(self, method, label, path, data=None, token=None, expect=(200, 201)):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(self.client, method)(path, data, format='json' if method != 'get' else None, **headers)
+            self.samples[label].append(time.perf_counter() - started)
+        self.queries[label].append(len(queries))
+        if response.status_code not in expect:
+            self.errors[label] += 1
+        return response
+
+    def report(self, elapsed):
+        samples = [sample for values in self.samples.values() for sample in values]
+        queries = [count for values in self.queries.values() for count in values]
+        return {
+            'requests': len(samples),
+            'errors': sum(self.errors.values()),
+            'requests_per_second': len(samples) / elapsed if elapsed else 0.0,
+            'latency': summarize(samples),
+            'queries_mean': sum(queries) / len(queries) if queries else 0.0,
+            'queries_max': max(queries, default=0),
+            'endpoints': {
+                label: {
+                    **summarize(values),
+                    'errors': self.errors[label],
+                    'queries_mean': sum(self.queries[label]) / len(values),
+                    'queries_max': max(self.queries[label]),
+                }
+                for label, values in sorted(self.samples.items())
+            },
+        }
+
+
+class Context:
+    def __init__(self, data, rng):
+        self.data = data
+        self.rng = rng
+        self.tokens = {}
+        self.registered = 0
+        # Token yaratishdagi SELECT o'lchovga kirmasligi uchun foydalanuvchilar oldindan yuklanadi
+        self.users = User.objects.in_bulk(data['customers'])
+
+    def token(self, user_id):
+        if user_id not in self.tokens:
+            self.tokens[user_id] = str(ClaimsRefreshToken.for_user(self.users[user_id]).access_token)
+        return self.tokens[user_id]
+
+    def customer(self):
+        return self.rng.choice(self.data['customers'])
+
+    def product(self):
+        return self.rng.choice(self.data['products'])
+
+
+def browse(recorder, ctx):
+    response = recorder.request('get', 'GET /seller/product/', '/seller/product/')
+    next_url = response.json().get('next') if response.status_code == 200 else None
+    if next_url:
+        recorder.request('get', 'GET /seller/product/?cursor', next_url)
+    recorder.request('get', 'GET /seller/category/', '/seller/category/')
+    product_id = ctx.product()
+    response = recorder.request('get', 'GET /seller/product/<pk>/', f'/seller/product/{product_id}/')
+    if response.status_code == 200:
+        body = response.json()
+        recorder.request('get', 'GET /seller/product/facets/', '/seller/product/facets/',
+                         {'category': body['category']})
+        recorder.request('get', 'GET /seller/shop/<pk>/', f'/seller/shop/{body["shop"]}/')
+    recorder.request('get', 'GET /seller/async/reviews/', '/seller/async/reviews/', {'product': product_id})
+
+
+def search(recorder, ctx):
+    query = ctx.rng.choice(ctx.data['words'])
+    recorder.request('get', 'GET /seller/product/search/', '/seller/product/search/', {'q': query})
+    recorder.request('get', 'GET /seller/product/search/?offset', '/seller/product/search/',
+                     {'q': query, 'offset': 20})
+
+
+def add_to_order(recorder, ctx):
+    customer = ctx.customer()
+    token = ctx.token(customer)
+    response = recorder.request('post', 'POST /seller/orders/', '/seller/orders/', {'customer': customer}, token=token)
+    if response.status_code != 201:
+        return
+    items = [{'product': product_id, 'product_quantity': ctx.rng.randint(1, 50)}
+             for product_id in ctx.rng.sample(ctx.data['products'], min(3, len(ctx.data['products'])))]
+    recorder.request('post', 'POST /seller/orders/add-items/', '/seller/orders/add-items/',
+                     {'order': response.json()['id'], 'items': items}, token=token)
+    recorder.request('get', 'GET /seller/orders/', '/seller/orders/', token=token)
+    recorder.request('get', 'GET /seller/orders/summary/', '/seller/orders/summary/', token=token)
+
+
+def review(recorder, ctx):
+    if not ctx.data['purchased']:
+        return
+    # Har bir (mijoz, mahsulot) juftligiga bitta sharh yoziladi
+    user_id, product_id = ctx.data['purchased'].pop()
+    recorder.request('post', 'POST /seller/reviews/', '/seller/reviews/',
+                     {'product': product_id, 'rating': ctx.rng.randint(1, 5), 'comment': 'Bench'},
+                     token=ctx.token(user_id))
+    recorder.request('get', 'GET /seller/product/<pk>/', f'/seller/product/{product_id}/')
+
+
+def auth(recorder, ctx):
+    ctx.registered += 1
+    username = f'bench-new-{ctx.registered}'
+    recorder.request('post', 'POST /auth/register/', '/auth/register/',
+                     {'username': username, 'password': BENCH_PASSWORD, 'phone': 900000000 + ctx.registered,
+                      'payment_method': 'card'})
+    recorder.request('post', 'POST /auth/login/', '/auth/login/',
+                     {'username': f'bench-customer-{ctx.rng.randrange(ctx.data["sizes"]["customers"])}',
+                      'password': BENCH_PASSWORD})
+
+
+SCENARIOS = {
+    'browse': browse,
+    'search': search,
+    'add-to-order': add_to_order,
+    'review': review,
+    'auth': auth,
+}
+
+
+def run_scenario(name, ctx, iterations, warmup=0):
+    scenario = SCENARIOS[name]
+    for _ in range(warmup):
+        scenario(Recorder(), ctx)
+    recorder = Recorder()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        scenario(recorder, ctx)
+    return recorder.report(time.perf_counter() - started)
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+
+from seller.batching import on_commit_batched
+
+registry = {}
+
+
+class LRUCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [key for key in self._data if key[:len(prefix)] == prefix]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TieredCache:
+    """Jarayon ichidagi LRU va umumiy Django keshidan iborat ikki qavatli kesh.
+
+    Umumiy keshdagi kalitlar obyekt versiyasini o'z ichiga oladi. Bekor qilishda
+    versiya oshiriladi, shuning uchun eski ma'lumotni o'qib ulgurgan so'rov uni
+    yangi kalit ostiga yozib qo'ya olmaydi. Lokal nusxa ham versiya bilan tekshiriladi,
+    u faqat umumiy keshdan qiymatni o'qish va yuklashni tejaydi.
+    """
+
+    def __init__(self, name, local_size=1024, local_ttl=5, timeout=300, alias='default'):
+        self.name = name
+        self.timeout = timeout
+        self.alias = alias
+        self.local = LRUCache(local_size, local_ttl)
+        self.counters = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'invalidations': 0}
+        self._counter_lock = threading.Lock()
+        registry[name] = self
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def _count(self, counter):
+        with self._counter_lock:
+            self.counters[counter] += 1
+
+    def _version_key(self, pk):
+        return f'{self.name}:version:{pk}'
+
+    def _version(self, pk):
+        version_key = self._version_key(pk)
+        version = self.shared.get(version_key)
+        if version is None:
+            # Versiya kaliti keshdan siqib chiqarilgan bo'lsa, eski kalitlar qayta tirilmasligi uchun yangi qiymatdan boshlanadi
+            self.shared.add(version_key, time.time_ns(), None)
+            version = self.shared.get(version_key)
+        return version
+
+    def get_or_set(self, pk, loader, variant=''):
+        local_key = (pk, variant)
+        cached = self.local.get(local_key)
+        # Lokal nusxa faqat versiyasi umumiy keshdagi bilan bir xil bo'lsa ishlatiladi:
+        # boshqa jarayondagi invalidate local_ttl kutmasdan ko'rinadi
+        version = self._version(pk)
+        if cached is not None and cached[0] == version:
+            self._count('local_hits')
+            return cached[1]
+
+        shared_key = f'{self.name}:{pk}:{version}:{variant}'
+        value = self.shared.get(shared_key)
+        if value is not None:
+            self._count('shared_hits')
+        else:
+            self._count('misses')
+            value = loader()
+            self.shared.set(shared_key, value, self.timeout)
+        self.local.set(local_key, (version, value))
+        return value
+
+    def invalidate(self, pk):
+        version_key = self._version_key(pk)
+        version = self.shared.get(version_key)
+        self.shared.set(version_key, max(version or 0, time.time_ns()) + 1, None)
+        self.local.delete_prefix((pk,))
+        self._count('invalidations')
+
+    def clear_local(self):
+        self.local.clear()
+
+    def stats(self):
+        with self._counter_lock:
+            stats = dict(self.counters)
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats.update({
+            'local_evictions': self.local.evictions,
+            'local_size': len(self.local),
+            'hit_ratio': (stats['local_hits'] + stats['shared_hits']) / lookups if lookups else 0.0,
+        })
+        return stats
+
+
+product_cache = TieredCache('product')
+category_cache = TieredCache('category', local_size=256, local_ttl=30, timeout=3600)
+shop_cache = TieredCache('shop', local_size=256, local_ttl=30, timeout=3600)
+
+
+def invalidate_products(product_ids):
+    for product_id in product_ids:
+        product_cache.invalidate(product_id)
+
+
+def schedule_product_invalidation(product_id):
+    # Darhol va commitdan keyin yana bir marta: tranzaksiya davomida eski ma'lumotni
+    # o'qib keshga yozgan parallel so'rov natijasi ham yaroqsiz bo'ladi
+    product_cache.invalidate(product_id)
+    on_commit_batched(invalidate_products, product_id)
+
+
+def cache_stats():
+    return {name: tiered.stats() for name, tiered in registry.items()}
@@ -0,0 +1,275 @@
+import codecs
+import csv
+import json
+import re
+import zipfile
+import zlib
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Sum, OuterRef, Subquery
+
+from seller.models.orders import OrderItem
+from seller.models.products import Product, ProductVariant, BulkPrice, KeywordsProduct, CharacteristicsProduct, \
+    PhotoProducts, VideoProducts
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Ustunlar import formati bilan bir xil: eksport qilingan CSV ni qayta import qilish mumkin
+PRODUCT_COLUMNS = ['id', 'articul', 'shop', 'category', 'name_ru', 'name_uz', 'description_ru', 'description_uz',
+                   'price', 'amount', 'min_sell', 'rating', 'rating_count', 'created_at', 'updated_at',
+                   'variants', 'bulk_prices', 'product_keywords', 'characteristics', 'photos', 'videos']
+ORDER_COLUMNS = ['order', 'created_at', 'customer', 'customer_username', 'order_total', 'item', 'product',
+                 'articul', 'shop', 'name_ru', 'name_uz', 'product_quantity', 'price_per_unit', 'line_total']
+
+
+# Ichki jadvallar: (model, eksport qilinadigan maydonlar, tartib)
+NESTED = {
+    'variants': (ProductVariant, ('id', 'color', 'size', 'stock', 'price', 'discount'), 'id'),
+    'bulk_prices': (BulkPrice, ('min_quantity', 'price_per_unit'), 'min_quantity'),
+    'product_keywords': (KeywordsProduct, ('keyword',), 'id'),
+    'characteristics': (CharacteristicsProduct, ('title_uz', 'title_ru', 'info_uz', 'info_ru'), 'id'),
+}
+PRODUCT_FIELDS = ('id', 'articul', 'shop_id', 'category_id', 'name_ru', 'name_uz', 'description_ru', 'description_uz',
+                  'price', 'amount', 'min_sell', 'rating', 'rating_count', 'created_at', 'updated_at')
+
+
+def _grouped(model, product_ids, fields, ordering):
+    groups = defaultdict(list)
+    for row in model.objects.filter(product_id__in=product_ids).order_by(ordering).values('product_id', *fields):
+        groups[row.pop('product_id')].append(row)
+    return groups
+
+
+def _file_names(model, field, product_ids):
+    groups = defaultdict(list)
+    rows = model.objects.filter(product_id__in=product_ids).exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+    for product_id, name in rows.order_by('id').values_list('product_id', field):
+        groups[product_id].append(name)
+    return groups
+
+
+def product_rows(shop_id=None, start=None, end=None, chunk_size=None):
+    """Mahsulotlarni ichki ma'lumotlari bilan satrma-satr qaytaradi.
+
+    Har bo'lak uchun ichki jadvallar bittadan so'rov bilan o'qiladi (prefetch_related
+    har bir obyekt uchun queryset yaratadi va ancha sekin), xotirada bir vaqtda bitta bo'lak turadi.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    products = Product.objects.order_by('id')
+    if shop_id is not None:
+        products = products.filter(shop_id=shop_id)
+    if start is not None:
+        products = products.filter(created_at__gte=start)
+    if end is not None:
+        products = products.filter(created_at__lt=end)
+
+    yield PRODUCT_COLUMNS
+    for chunk in _batches(products.values_list(*PRODUCT_FIELDS).iterator(chunk_size=chunk_size), chunk_size):
+        ids = [row[0] for row in chunk]
+        nested = [_grouped(model, ids, fields, ordering) for model, fields, ordering in NESTED.values()]
+        photos = _file_names(PhotoProducts, 'image', ids)
+        videos = _file_names(VideoProducts, 'video', ids)
+        for row in chunk:
+            yield [
+                *row,
+                *(json.dumps(groups.get(row[0], []), cls=DjangoJSONEncoder, ensure_ascii=False) for groups in nested),
+                json.dumps(photos.get(row[0], []), ensure_ascii=False),
+                json.dumps(videos.get(row[0], []), ensure_ascii=False),
+            ]
+
+
+def order_rows(shop_id=None, start=None, end=None, chunk_size=None):
+    """Buyurtma qatorlarini (har bir OrderItem bitta satr) buyurtma sanasi bo'yicha qaytaradi.
+
+    Do'kon berilganda order_total faqat shu do'kon qatorlaridan hisoblanadi: boshqa
+    do'konlarning tushumi eksportga chiqmaydi.
+    """
+    items = OrderItem.objects.order_by('order_id', 'id')
+    order_total = F('order__total_price')
+    if shop_id is not None:
+        items = items.filter(product__shop_id=shop_id)
+        order_total = Subquery(
+            OrderItem.objects.filter(order_id=OuterRef('order_id'), product__shop_id=shop_id)
+            .values('order_id').annotate(total=Sum(F('price_per_unit') * F('product_quantity'))).values('total')
+        )
+    if start is not None:
+        items = items.filter(order__created_at__gte=start)
+    if end is not None:
+        items = items.filter(order__created_at__lt=end)
+    items = items.annotate(order_total=order_total, line_total=F('price_per_unit') * F('product_quantity')).values_list(
+        'order_id', 'order__created_at', 'order__customer_id', 'order__customer__username', 'order_total',
+        'id', 'product_id', 'product__articul', 'product__shop_id', 'product__name_ru', 'product__name_uz',
+        'product_quantity', 'price_per_unit', 'line_total',
+    )
+
+    yield ORDER_COLUMNS
+    yield from items.iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class _Buffer:
+    """csv.writer va zipfile yozgan baytlarni yig'ib, generator ularni bo'lak qilib beradi."""
+
+    def __init__(self):
+        self.parts = []
+
+    def write(self, data):
+        self.parts.append(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(part.encode() if isinstance(part, str) else part for part in self.parts)
+        self.parts = []
+        return data
+
+
+def csv_chunks(rows, batch_size=500):
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    # Excel UTF-8 ni BOM orqali taniydi
+    yield codecs.BOM_UTF8
+    for batch in _batches(rows, batch_size):
+        writer.writerows([_cell(value) for value in row] for row in batch)
+        yield buffer.drain()
+
+
+# XML 1.0 da ruxsat etilmagan boshqaruv belgilari
+INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Export" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _column_letter(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xml_text(value):
+    value = INVALID_XML.sub('', str(value))
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _xlsx_row(number, row, columns):
+    cells = []
+    for column, value in zip(columns, row):
+        if value is None or value == '':
+            continue
+        ref = f'{column}{number}'
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        else:
+            # Decimal ham matn sifatida yoziladi: float ga o'tkazilsa tiyinlar yo'qolishi mumkin
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">'
+                         f'{_xml_text(_cell(value))}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+def xlsx_chunks(rows, batch_size=500):
+    """Bitta varaqli XLSX ni oqim sifatida yozadi.
+
+    zipfile chiqish oqimi seek qilinmasa data descriptor bilan yozadi, shuning uchun
+    fayl xotirada yig'ilmaydi; qatorlar inline satr sifatida, sharedStrings jadvalisiz yoziladi.
+    """
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+            columns = []
+            number = 0
+            for batch in _batches(rows, batch_size):
+                if not columns:
+                    columns = [_column_letter(index) for index in range(len(batch[0]))]
+                parts = []
+                for row in batch:
+                    number += 1
+                    parts.append(_xlsx_row(number, row, columns))
+                sheet.write(''.join(parts).encode())
+                yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield buffer.drain()
+
+
+def gzip_chunks(chunks, level=6):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_chunks(rows, file_format, compress=False):
+    chunks = csv_chunks(rows) if file_format == 'csv' else xlsx_chunks(rows)
+    # Bo'sh bo'laklar StreamingHttpResponse da keraksiz write() chaqiruvlari bo'ladi
+    chunks = (chunk for chunk in chunks if chunk)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(kind, file_format, compress=False):
+    return f'{kind}.{file_format}' + ('.gz' if compress else '')
@@ -0,0 +1,170 @@
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Count
+
+from seller.batching import on_commit_batched
+from seller.models.facets import ProductFacet, FacetCount
+from seller.models.products import Product, ProductVariant
+
+FACETS = ('category', 'shop', 'price', 'rating', 'color', 'size')
+
+
+def price_bucket(price):
+    bounds = getattr(settings, 'FACET_PRICE_BUCKETS', [0, 10000, 50000, 100000, 500000, 1000000])
+    lower = bounds[0]
+    for upper in bounds[1:]:
+        if price < upper:
+            return f'{lower}-{upper}'
+        lower = upper
+    return f'{lower}+'
+
+
+def compute_facets(product_ids):
+    """Mahsulotlar uchun kerakli (facet, value) juftliklarini ikki so'rovda hisoblaydi."""
+    facets = {}
+    for row in Product.objects.filter(id__in=product_ids).values('id', 'category_id', 'shop_id', 'price', 'rating'):
+        facets[row['id']] = {
+            ('category', str(row['category_id'])),
+            ('shop', str(row['shop_id'])),
+            ('price', price_bucket(row['price'])),
+            ('rating', str(int(row['rating']))),
+        }
+    for product_id, color, size in ProductVariant.objects.filter(product_id__in=facets).values_list(
+            'product_id', 'color', 'size'):
+        if color and color.strip():
+            facets[product_id].add(('color', color.strip().lower()[:100]))
+        if size and size.strip():
+            facets[product_id].add(('size', size.strip().lower()[:100]))
+    return facets
+
+
+def _apply_count_deltas(deltas):
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    FacetCount.objects.bulk_create(
+        [FacetCount(facet=facet, value=value, count=0) for facet, value in deltas],
+        ignore_conflicts=True,
+    )
+    for (facet, value), delta in deltas.items():
+        FacetCount.objects.filter(facet=facet, value=value).update(count=F('count') + delta)
+
+
+def _lock_products(product_ids):
+    # Bir mahsulotni ikki parallel commit yangilasa, o'qish-farq-yozish navbat bilan bajariladi:
+    # aks holda ikkalasi bir xil qatorni qo'shib product_facet_unique ga uriladi yoki farqni ikki marta qo'shadi.
+    # Qulflar pk tartibida olinadi (deadlock bo'lmasligi uchun); SQLite da yozuvchi baribir bitta
+    return set(Product.objects.select_for_update().filter(id__in=product_ids).order_by('pk')
+               .values_list('pk', flat=True))
+
+
+def refresh_product_facets(product_ids):
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    with transaction.atomic():
+        # O'chirilgan mahsulotlarning facetlarini remove_product_facets olib tashlagan
+        product_ids = _lock_products(product_ids)
+        desired = compute_facets(product_ids)
+        existing = defaultdict(dict)
+        for pk, product_id, facet, value in ProductFacet.objects.filter(product_id__in=product_ids).values_list(
+                'pk', 'product_id', 'facet', 'value'):
+            existing[product_id][(facet, value)] = pk
+
+        deltas = Counter()
+        removed, added = [], []
+        for product_id in product_ids:
+            current = existing.get(product_id, {})
+            wanted = desired.get(product_id, set())
+            for key in current.keys() - wanted:
+                removed.append(current[key])
+                deltas[key] -= 1
+            for facet, value in wanted - current.keys():
+                added.append(ProductFacet(product_id=product_id, facet=facet, value=value))
+                deltas[(facet, value)] += 1
+
+        if removed:
+            ProductFacet.objects.filter(pk__in=removed).delete()
+        if added:
+            ProductFacet.objects.bulk_create(added)
+        _apply_count_deltas(deltas)
+
+
+def remove_product_facets(product_ids):
+    rows = ProductFacet.objects.filter(product_id__in=product_ids)
+    with transaction.atomic():
+        _lock_products(product_ids)
+        deltas = Counter({key: -count for key, count in Counter(rows.values_list('facet', 'value')).items()})
+        rows.delete()
+        _apply_count_deltas(deltas)
+
+
+def schedule_facet_refresh(product_id):
+    on_commit_batched(refresh_product_facets, product_id)
+
+
+def rebuild_facets(batch_size=1000):
+    with transaction.atomic():
+        ProductFacet.objects.all().delete()
+        FacetCount.objects.all().delete()
+        ids = list(Product.objects.order_by('pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), batch_size):
+            desired = compute_facets(ids[start:start + batch_size])
+            ProductFacet.objects.bulk_create(
+                [ProductFacet(product_id=product_id, facet=facet, value=value)
+                 for product_id, keys in desired.items() for facet, value in keys],
+                batch_size=batch_size,
+            )
+        FacetCount.objects.bulk_create(
+            [FacetCount(**row) for row in ProductFacet.objects.values('facet', 'value').order_by().annotate(
+                count=Count('product_id'))],
+            batch_size=batch_size,
+        )
+    return len(ids)
+
+
+def parse_selection(params):
+    return {facet: params.getlist(facet) for facet in FACETS if params.getlist(facet)}
+
+
+def _matching(selection):
+    return [
+        ProductFacet.objects.filter(facet=facet, value__in=values).values('product_id')
+        for facet, values in selection.items()
+    ]
+
+
+def filter_products(queryset, selection):
+    # Bir facet ichidagi qiymatlar OR, turli facetlar AND bilan birlashtiriladi
+    for subquery in _matching(selection):
+        queryset = queryset.filter(id__in=subquery)
+    return queryset
+
+
+def facet_counts(selection):
+    if not selection:
+        counts = defaultdict(list)
+        for facet, value, count in FacetCount.objects.filter(count__gt=0).order_by('facet', '-count', 'value') \
+                .values_list('facet', 'value', 'count'):
+            counts[facet].append({'value': value, 'count': count})
+        total = sum(item['count'] for item in counts.get('category', []))
+        return {'count': total, 'facets': {facet: counts.get(facet, []) for facet in FACETS}}
+
+    # Filtrlangan sonlar har so'rovda (facet, value, product) indeksi ustida hisoblanadi: tanlov
+    # kombinatsiyalari cheksiz, oldindan saqlash faqat filtrsiz ko'rinish (FacetCount) uchun
+    result = {}
+    for facet in FACETS:
+        # Facetning o'z tanlovi hisobga olinmaydi, shunda boshqa qiymatlar soni ham ko'rinadi
+        others = {key: values for key, values in selection.items() if key != facet}
+        rows = ProductFacet.objects.filter(facet=facet)
+        for subquery in _matching(others):
+            rows = rows.filter(product_id__in=subquery)
+        result[facet] = [
+            {'value': value, 'count': count}
+            for value, count in rows.values('value').order_by().annotate(count=Count('product_id'))
+            .order_by('-count', 'value').values_list('value', 'count')
+        ]
+    total = filter_products(Product.objects.all(), selection).count()
+    return {'count': total, 'facets': result}
@@ -0,0 +1,138 @@
+from collections import defaultdict
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from seller.images import rendition_urls
+from seller.instrumentation import serialization
+from seller.models.products import RATING_STARS
+from seller.serializers import ProductsSerializer, OrderSerializer, RenditionsField
+
+# Qiymati bazadagi bilan bir xil bo'lgan maydonlar: to_representation chaqirilmaydi
+PASSTHROUGH = (serializers.CharField, serializers.IntegerField, serializers.FloatField, serializers.BooleanField,
+               serializers.ChoiceField, serializers.PrimaryKeyRelatedField)
+# Formatlash kerak bo'lgan maydonlar: maydonning o'z to_representation i ishlatiladi
+FORMATTED = (serializers.DateTimeField, serializers.DateField, serializers.TimeField, serializers.DecimalField,
+             serializers.UUIDField)
+VALUE, FORMAT, FILE, RENDITIONS, NESTED, COMPUTED = 'value', 'format', 'file', 'renditions', 'nested', 'computed'
+
+
+class RowConverter:
+    """values() qatorlarini serializer.data bilan bir xil dict larga aylantiradi (faqat o'qish uchun).
+
+    Reja serializer maydonlaridan bir marta tuziladi: kalitlar tartibi va formatlash o'sha maydonlardan
+    olinadi, lekin har qator uchun serializer, maydon nusxalari va model obyektlari yaratilmaydi.
+    Ichki many=True ro'yxatlar har sahifa uchun bittadan values() so'rovi bilan o'qiladi.
+
+    computed: modelda ustun bo'lmagan maydonlar uchun {nomi: (ustunlar, funksiya(qator))}.
+    """
+
+    def __init__(self, serializer_class, computed=None):
+        self.serializer_class = serializer_class
+        self.computed = computed or {}
+        self._plan = None
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = self._compile(self.serializer_class())
+        return self._plan
+
+    @property
+    def columns(self):
+        return self.plan[0]
+
+    def _compile(self, serializer):
+        model = serializer.Meta.model
+        columns, steps, nested = ['pk'], [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in self.computed:
+                fields, function = self.computed[name]
+                columns += fields
+                steps.append((name, None, COMPUTED, function))
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                relation = model._meta.get_field(field.source)
+                nested.append((name, RowConverter(type(field.child)), relation.related_model, relation.field.attname))
+                steps.append((name, None, NESTED, None))
+                continue
+            if isinstance(field, RenditionsField):
+                steps.append((name, field.source, RENDITIONS, None))
+            elif isinstance(field, serializers.FileField) and getattr(field, 'use_url',
+                                                                      api_settings.UPLOADED_FILES_USE_URL):
+                steps.append((name, field.source, FILE, model._meta.get_field(field.source).storage))
+            elif isinstance(field, FORMATTED):
+                steps.append((name, field.source, FORMAT, field.to_representation))
+            elif isinstance(field, PASSTHROUGH):
+                steps.append((name, field.source, VALUE, None))
+            else:
+                raise ImproperlyConfigured(f'{serializer.__class__.__name__}.{name} has no fast representation.')
+            columns.append(field.source)
+        return list(dict.fromkeys(columns)), steps, nested
+
+    def _children(self, rows, request):
+        _, _, nested = self.plan
+        ids = [row['pk'] for row in rows]
+        children = {}
+        for name, child, model, parent in nested:
+            groups = defaultdict(list)
+            if ids:
+                # prefetch_related bilan bir xil tartib: model Meta.ordering, keyin pk
+                queryset = model.objects.filter(**{f'{parent}__in': ids}).order_by(*model._meta.ordering, 'pk')
+                child_rows = list(queryset.values(parent, *child.columns))
+                for row, data in zip(child_rows, child.convert(child_rows, request)):
+                    groups[row[parent]].append(data)
+            children[name] = groups
+        return children
+
+    def convert(self, rows, request=None):
+        with serialization():
+            return self._convert(rows, request)
+
+    def _convert(self, rows, request):
+        rows = list(rows)
+        _, steps, _ = self.plan
+        children = self._children(rows, request)
+        build_url = request.build_absolute_uri if request is not None else None
+
+        results = []
+        for row in rows:
+            data = {}
+            for name, column, kind, payload in steps:
+                if kind is VALUE:
+                    data[name] = row[column]
+                    continue
+                if kind is NESTED:
+                    data[name] = children[name].get(row['pk'], [])
+                    continue
+                if kind is COMPUTED:
+                    data[name] = payload(row)
+                    continue
+                value = row[column]
+                if value is None:
+                    data[name] = None
+                elif kind is FORMAT:
+                    data[name] = payload(value)
+                elif kind is RENDITIONS:
+                    data[name] = rendition_urls(value, request)
+                elif value:
+                    # FileField: nom bo'sh bo'lsa null, aks holda URL (so'rov bo'lsa to'liq)
+                    url = payload.url(value)
+                    data[name] = build_url(url) if build_url is not None else url
+                else:
+                    data[name] = None
+            results.append(data)
+        return results
+
+
+def rating_histogram(row):
+    return {str(star): row[f'rating_{star}_count'] for star in RATING_STARS}
+
+
+product_converter = RowConverter(ProductsSerializer, computed={
+    'rating_histogram': ([f'rating_{star}_count' for star in RATING_STARS], rating_histogram),
+})
+order_converter = RowConverter(OrderSerializer)
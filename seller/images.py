@@ -0,0 +1,160 @@
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import F
+from django.dispatch import Signal
+from django.utils import timezone
+
+from seller.models.images import ImageTask
+
+# Rendition yaratiladigan rasm maydonlari: "app_label.Model" -> maydon nomi
+RENDITION_FIELDS = {
+    'seller.PhotoProducts': 'image',
+    'seller.Category': 'image',
+    'seller.Shop': 'image',
+    'accounts.User': 'image',
+}
+
+# Worker modelni .update() bilan yangilaydi, post_save yuborilmaydi; keshlar shu signal orqali tozalanadi
+renditions_ready = Signal()
+
+
+def rendition_widths():
+    return sorted(getattr(settings, 'IMAGE_RENDITION_WIDTHS', [320, 640, 1280]))
+
+
+def model_label(model):
+    return model._meta.label
+
+
+def needs_renditions(instance):
+    field = RENDITION_FIELDS.get(model_label(type(instance)))
+    if field is None:
+        return False
+    name = getattr(instance, field).name
+    return bool(name) and (instance.renditions or {}).get('source') != name
+
+
+def enqueue_renditions(instances):
+    tasks = [
+        ImageTask(model=model_label(type(instance)), object_id=instance.pk,
+                  field=RENDITION_FIELDS[model_label(type(instance))],
+                  source=getattr(instance, RENDITION_FIELDS[model_label(type(instance))]).name)
+        for instance in instances if instance.pk is not None and needs_renditions(instance)
+    ]
+    if tasks:
+        ImageTask.objects.bulk_create(tasks, ignore_conflicts=True)
+    return len(tasks)
+
+
+def render_renditions(path, widths, quality):
+    """Bitta rasm uchun WebP renditionlarni yozadi; {kenglik: fayl yo'li} qaytaradi.
+
+    Django ga bog'liq emas, ProcessPoolExecutor ichida ishlatiladi.
+    """
+    from PIL import Image, ImageOps
+
+    root, _ = os.path.splitext(path)
+    directory = os.path.join(os.path.dirname(root), 'renditions')
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.basename(root)
+
+    written = {}
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        targets = [width for width in widths if width < image.width] or [image.width]
+        for width in targets:
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS) if width != image.width else image
+            target = os.path.join(directory, f'{stem}_{width}.webp')
+            resized.save(target, 'WEBP', quality=quality, method=4)
+            written[width] = target
+    return written
+
+
+def _render_task(task_id, path, widths, quality):
+    try:
+        return task_id, render_renditions(path, widths, quality), None
+    except Exception as exc:
+        return task_id, None, f'{type(exc).__name__}: {exc}'
+
+
+def claim_tasks(limit, stale_after=600):
+    worker = uuid.uuid4().hex
+    # Ishlayotganda to'xtab qolgan worker vazifalari navbatga qaytariladi
+    ImageTask.objects.filter(status='running', updated_at__lt=timezone.now() - timedelta(seconds=stale_after)).update(
+        status='pending', claimed_by='')
+    ids = list(ImageTask.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:limit])
+    # Bir nechta worker bir vaqtda ishlasa, shartli UPDATE har bir vazifani faqat bittasiga beradi
+    ImageTask.objects.filter(pk__in=ids, status='pending').update(
+        status='running', claimed_by=worker, attempts=F('attempts') + 1, updated_at=timezone.now())
+    return list(ImageTask.objects.filter(claimed_by=worker, status='running'))
+
+
+def _relative(path):
+    return os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+
+
+def _apply(task, written):
+    model = apps.get_model(task.model)
+    renditions = {'source': task.source, 'widths': {str(width): _relative(path) for width, path in written.items()}}
+    previous = model.objects.filter(pk=task.object_id).values_list('renditions', flat=True).first()
+    # Rasm bu orada almashtirilgan bo'lsa, eski rasm renditionlari yozilmaydi
+    updated = model.objects.filter(pk=task.object_id, **{task.field: task.source}).update(renditions=renditions)
+    if not updated:
+        for path in written.values():
+            default_storage.delete(_relative(path))
+        return
+    for name in set((previous or {}).get('widths', {}).values()) - set(renditions['widths'].values()):
+        default_storage.delete(name)
+    renditions_ready.send(sender=model, pks=[task.object_id])
+
+
+def process_tasks(limit=50, workers=None):
+    tasks = claim_tasks(limit)
+    if not tasks:
+        return {'done': 0, 'failed': 0}
+
+    widths = rendition_widths()
+    quality = getattr(settings, 'IMAGE_RENDITION_QUALITY', 80)
+    max_attempts = getattr(settings, 'IMAGE_TASK_MAX_ATTEMPTS', 3)
+    by_id = {task.pk: task for task in tasks}
+    jobs = [(task.pk, default_storage.path(task.source), widths, quality) for task in tasks]
+
+    if workers == 0:
+        results = [_render_task(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_render_task, *zip(*jobs)))
+
+    report = {'done': 0, 'failed': 0}
+    for task_id, written, error in results:
+        task = by_id[task_id]
+        if error is None:
+            _apply(task, written)
+            ImageTask.objects.filter(pk=task_id).update(status='done', error='', updated_at=timezone.now())
+            report['done'] += 1
+        else:
+            status = 'failed' if task.attempts >= max_attempts else 'pending'
+            # Qayta urinishda unique shart buzilmasligi uchun navbatda boshqa kutilayotgan vazifa bo'lsa bu yakunlanadi
+            if status == 'pending' and ImageTask.objects.filter(
+                    model=task.model, object_id=task.object_id, field=task.field, status='pending').exists():
+                status = 'failed'
+            ImageTask.objects.filter(pk=task_id).update(status=status, claimed_by='', error=error,
+                                                        updated_at=timezone.now())
+            report['failed'] += status == 'failed'
+    return report
+
+
+def rendition_urls(renditions, request=None):
+    urls = {}
+    for width, name in (renditions or {}).get('widths', {}).items():
+        url = default_storage.url(name)
+        urls[width] = request.build_absolute_uri(url) if request is not None else url
+    return urls
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from django.db import transaction, DatabaseError
+from rest_framework import serializers
+
+from seller.models import Category, Shop
+from seller.models.products import Product, PhotoProducts, VideoProducts, KeywordsProduct, CharacteristicsProduct, \
+    ProductVariant, BulkPrice
+from seller.facets import schedule_facet_refresh
+from seller.images import enqueue_renditions
+from seller.search import schedule_reindex
+from seller.serializers import KeywordsProductSerializer, CharacteristicsProductSerializer, ProductVariantSerializer, \
+    BulkPriceSerializer
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+NESTED_FIELDS = ('photos', 'videos', 'product_keywords', 'characteristics', 'variants', 'bulk_prices')
+
+
+class ProductImportRowSerializer(serializers.ModelSerializer):
+    shop = serializers.IntegerField(source='shop_id')
+    category = serializers.IntegerField(source='category_id')
+    photos = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    videos = serializers.ListField(child=serializers.CharField(max_length=100), required=False)
+    product_keywords = KeywordsProductSerializer(many=True, required=False)
+    characteristics = CharacteristicsProductSerializer(many=True, required=False)
+    variants = ProductVariantSerializer(many=True, required=False)
+    bulk_prices = BulkPriceSerializer(many=True, required=False)
+
+    class Meta:
+        model = Product
+        fields = ['shop', 'category', 'name_ru', 'name_uz', 'description_ru', 'description_uz', 'price', 'amount',
+                  'min_sell', *NESTED_FIELDS]
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'json':
+        extension = 'jsonl'
+    if extension not in IMPORT_FORMATS:
+        raise ValueError(f"Unsupported import format: {filename!r}. Expected one of {', '.join(IMPORT_FORMATS)}.")
+    return extension
+
+
+def read_rows(stream, file_format):
+    """Faylni satrma-satr o'qiydi, butun faylni xotiraga yuklamaydi.
+
+    Buzilgan satrlar uchun istisno obyekti qaytariladi, import to'xtamaydi.
+    """
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if file_format == 'csv':
+        for row in csv.DictReader(text):
+            try:
+                yield _parse_csv_row(row)
+            except ValueError as exc:
+                yield exc
+    elif file_format == 'jsonl':
+        for line in text:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield exc
+    else:
+        raise ValueError(f"Unsupported import format: {file_format!r}.")
+
+
+def _parse_csv_row(row):
+    parsed = {}
+    for key, value in row.items():
+        if key is None or value is None or value == '':
+            continue
+        if key in NESTED_FIELDS:
+            # Ichki ro'yxatlar CSV ustunida JSON massiv sifatida beriladi
+            value = json.loads(value)
+        parsed[key] = value
+    return parsed
+
+
+def _without_id(item):
+    return {key: value for key, value in item.items() if key != 'id'}
+
+
+class ProductImporter:
+    def __init__(self, chunk_size=500, shop_ids=None, max_errors=1000):
+        self.chunk_size = chunk_size
+        self.shop_ids = set(shop_ids) if shop_ids is not None else None
+        self.max_errors = max_errors
+        self.report = {'created': 0, 'failed': 0, 'errors': []}
+
+    def run(self, rows):
+        rows = enumerate(rows, start=1)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk)
+        return self.report
+
+    def _add_error(self, row_number, errors):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < self.max_errors:
+            self.report['errors'].append({'row': row_number, 'errors': errors})
+
+    def _import_chunk(self, chunk):
+        valid = []
+        for row_number, row in chunk:
+            if isinstance(row, Exception):
+                self._add_error(row_number, [f'Malformed row: {row}'])
+                continue
+            if not isinstance(row, dict):
+                self._add_error(row_number, ['Each row must be an object.'])
+                continue
+            serializer = ProductImportRowSerializer(data=row)
+            if serializer.is_valid():
+                valid.append((row_number, serializer.validated_data))
+            else:
+                self._add_error(row_number, serializer.errors)
+
+        valid = self._check_relations(valid)
+        if not valid:
+            return
+
+        try:
+            with transaction.atomic():
+                self._write(valid)
+        except DatabaseError as exc:
+            for row_number, _ in valid:
+                self._add_error(row_number, [f'Database error: {exc}'])
+        else:
+            self.report['created'] += len(valid)
+
+    def _check_relations(self, valid):
+        shop_ids = {data['shop_id'] for _, data in valid}
+        category_ids = {data['category_id'] for _, data in valid}
+        known_shops = set(Shop.objects.filter(id__in=shop_ids).values_list('id', flat=True))
+        known_categories = set(Category.objects.filter(id__in=category_ids).values_list('id', flat=True))
+        if self.shop_ids is not None:
+            known_shops &= self.shop_ids
+
+        checked = []
+        for row_number, data in valid:
+            errors = {}
+            if data['shop_id'] not in known_shops:
+                errors['shop'] = [f"Invalid shop id {data['shop_id']}."]
+            if data['category_id'] not in known_categories:
+                errors['category'] = [f"Invalid category id {data['category_id']}."]
+            if errors:
+                self._add_error(row_number, errors)
+            else:
+                checked.append((row_number, data))
+        return checked
+
+    def _write(self, valid):
+        nested = []
+        products = []
+        for articul, (_, data) in zip(Product.generate_articuls(len(valid)), valid):
+            nested.append({field: data.pop(field, []) for field in NESTED_FIELDS})
+            products.append(Product(articul=articul, **data))
+        Product.objects.bulk_create(products, batch_size=self.chunk_size)
+
+        photos, videos, keywords, characteristics, variants, bulk_prices = [], [], [], [], [], []
+        for product, children in zip(products, nested):
+            photos += [PhotoProducts(product=product, image=path) for path in children['photos']]
+            videos += [VideoProducts(product=product, video=path) for path in children['videos']]
+            keywords += [KeywordsProduct(product=product, **_without_id(item)) for item in children['product_keywords']]
+            characteristics += [CharacteristicsProduct(product=product, **_without_id(item))
+                                for item in children['characteristics']]
+            variants += [ProductVariant(product=product, **_without_id(item)) for item in children['variants']]
+            bulk_prices += [BulkPrice(product=product, **item) for item in children['bulk_prices']]
+
+        for product in products:
+            schedule_reindex(product.pk)
+            schedule_facet_refresh(product.pk)
+
+        for model, objects in ((PhotoProducts, photos), (VideoProducts, videos), (KeywordsProduct, keywords),
+                               (CharacteristicsProduct, characteristics), (ProductVariant, variants),
+                               (BulkPrice, bulk_prices)):
+            if objects:
+                model.objects.bulk_create(objects, batch_size=self.chunk_size)
+        enqueue_renditions(photos)
+        return products
@@ -0,0 +1,223 @@
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Tanlangan so'rovning o'lchovlari; sync_to_async oqimlariga ham o'tadi
+current = ContextVar('request_metrics', default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = Counter()
+        self.db_time = 0.0
+        self.render_started = None
+        self.render_time = 0.0
+        self.serialization_time = 0.0
+        self.serializing = False
+
+    def finish_render(self, response):
+        self.render_time += time.perf_counter() - self.render_started
+        return response
+
+
+class Registry:
+    """Jarayon ichidagi metrikalar. Har bir worker o'z qiymatlarini beradi."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = Counter()
+        self.sampled = Counter()
+        self.duplicates = Counter()
+        self.histograms = {}
+        self.reported = set()
+
+    def histogram(self, name, route, buckets):
+        key = (name, route)
+        if key not in self.histograms:
+            self.histograms[key] = Histogram(buckets)
+        return self.histograms[key]
+
+    def record(self, route, method, status, elapsed, metrics):
+        with self.lock:
+            self.requests[(route, method, f'{status // 100}xx')] += 1
+            self.histogram('http_request_duration_seconds', route, LATENCY_BUCKETS).observe(elapsed)
+            if metrics is None:
+                return
+            self.sampled[route] += 1
+            self.histogram('db_queries_per_request', route, QUERY_BUCKETS).observe(sum(metrics.queries.values()))
+            self.histogram('db_duration_seconds', route, LATENCY_BUCKETS).observe(metrics.db_time)
+            self.histogram('serialization_duration_seconds', route, LATENCY_BUCKETS).observe(
+                metrics.serialization_time)
+            self.histogram('render_duration_seconds', route, LATENCY_BUCKETS).observe(metrics.render_time)
+
+            threshold = getattr(settings, 'METRICS_DUPLICATE_QUERY_THRESHOLD', 5)
+            repeated = [(sql, count) for sql, count in metrics.queries.items() if count >= threshold]
+            if repeated:
+                self.duplicates[route] += 1
+            for sql, count in repeated:
+                # Har bir takrorlanuvchi so'rov shakli jarayonda bir marta loglanadi
+                if (route, sql) not in self.reported:
+                    self.reported.add((route, sql))
+                    logger.warning('%s ran the same query %d times in one request (possible N+1): %s',
+                                   route, count, sql[:500])
+
+    def render(self):
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self.lock:
+            header('http_requests_total', 'counter', 'Requests by URL name, method and status class.')
+            for (route, method, status), value in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} {value}')
+            header('http_sampled_requests_total', 'counter', 'Requests with recorded SQL queries.')
+            for route, value in sorted(self.sampled.items()):
+                lines.append(f'http_sampled_requests_total{{route="{route}"}} {value}')
+            header('db_duplicate_query_requests_total', 'counter',
+                   'Sampled requests that repeated one SQL statement at least the threshold number of times.')
+            for route, value in sorted(self.duplicates.items()):
+                lines.append(f'db_duplicate_query_requests_total{{route="{route}"}} {value}')
+
+            for name, description in (
+                    ('http_request_duration_seconds', 'Total time spent in the request.'),
+                    ('db_queries_per_request', 'SQL queries per sampled request.'),
+                    ('db_duration_seconds', 'Time spent in SQL per sampled request.'),
+                    ('serialization_duration_seconds', 'Time spent building serializer data.'),
+                    ('render_duration_seconds', 'Time spent rendering the response body.')):
+                header(name, 'histogram', description)
+                for (metric, route), histogram in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip((*histogram.buckets, '+Inf'), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{route="{route}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{route="{route}"}} {histogram.sum}')
+                    lines.append(f'{name}_count{{route="{route}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def record_query(execute, sql, params, many, context):
+    metrics = current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        # Parametrlar hisobga olinmaydi: bir xil shakldagi so'rovlar N+1 belgisi
+        metrics.queries[sql] += 1
+
+
+@contextmanager
+def serialization():
+    """Ichidagi vaqt serialization_duration_seconds ga qo'shiladi; ichma-ich chaqiruvlar bir marta hisoblanadi."""
+    metrics = current.get()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serialization_time += time.perf_counter() - started
+        metrics.serializing = False
+
+
+class TimedSerializerMixin:
+    # serializer.data view ichida hisoblanadi, render() esa faqat JSON kodlash
+    def to_representation(self, instance):
+        with serialization():
+            return super().to_representation(instance)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None and match.view_name else 'unresolved'
+
+
+class InstrumentationMiddleware:
+    """Har bir URL nomi bo'yicha umumiy vaqtni, tanlangan so'rovlar uchun esa SQL va render vaqtini yozadi."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self):
+        if random.random() >= getattr(settings, 'METRICS_SAMPLE_RATE', 0.1):
+            return None, None
+        metrics = RequestMetrics()
+        return metrics, current.set(metrics)
+
+    def finish(self, request, response, started, metrics, token):
+        if token is not None:
+            current.reset(token)
+        registry.record(route_name(request), request.method, response.status_code, time.perf_counter() - started,
+                        metrics)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        metrics, token = self.start()
+        response = self.get_response(request)
+        return self.finish(request, response, started, metrics, token)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        metrics, token = self.start()
+        response = await self.get_response(request)
+        return self.finish(request, response, started, metrics, token)
+
+    def process_template_response(self, request, response):
+        metrics = current.get()
+        if metrics is not None:
+            metrics.render_started = time.perf_counter()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
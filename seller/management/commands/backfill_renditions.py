@@ -0,0 +1,38 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from seller.images import RENDITION_FIELDS, enqueue_renditions, process_tasks
+
+
+class Command(BaseCommand):
+    help = 'Queue WebP renditions for existing images that have none for their current file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', choices=sorted(RENDITION_FIELDS),
+                            help='Only backfill this model (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--process', action='store_true', help='Render the queued images right away.')
+        parser.add_argument('--workers', type=int, default=None)
+
+    def handle(self, *args, **options):
+        queued = 0
+        for label in options['models'] or sorted(RENDITION_FIELDS):
+            model = apps.get_model(label)
+            field = RENDITION_FIELDS[label]
+            queryset = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).only(
+                'pk', field, 'renditions').order_by('pk')
+            batch = []
+            for instance in queryset.iterator(chunk_size=options['batch_size']):
+                batch.append(instance)
+                if len(batch) >= options['batch_size']:
+                    queued += enqueue_renditions(batch)
+                    batch = []
+            queued += enqueue_renditions(batch)
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} images.'))
+
+        if options['process']:
+            while True:
+                report = process_tasks(limit=options['batch_size'], workers=options['workers'])
+                if not report['done'] and not report['failed']:
+                    break
+                self.stdout.write(f"Rendered {report['done']} images, {report['failed']} failed.")
@@ -0,0 +1,61 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from seller.articul import ArticulAllocator, ARTICUL_MIN
+from seller.bench import benchmark_database, timer, summarize
+from seller.models import Category, Shop
+from seller.models.products import Product
+
+
+class Command(BaseCommand):
+    help = ('Compare product insert latency of random-probe articul generation and the block allocator '
+            'at several occupancy levels of a scaled-down articul space.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--space', type=int, default=20000, help='Size of the simulated articul space.')
+        parser.add_argument('--inserts', type=int, default=500)
+        parser.add_argument('--occupancy', type=int, nargs='+', default=[10, 50, 90])
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        space = options['space']
+
+        with benchmark_database():
+            owner = User.objects.create_user(username='bench', password='bench', user_type='vendor')
+            shop = Shop.objects.create(owner=owner, name='Bench', description='Bench', image='images/shop/bench.png')
+            category = Category.objects.create(image='images/category/bench.png', ru_name='Bench', uz_name='Bench')
+
+            def new_product(articul):
+                return Product(shop=shop, category=category, name_ru='Bench', name_uz='Bench', description_ru='Bench',
+                               description_uz='Bench', price=1, amount=1, articul=articul)
+
+            def random_probe():
+                while True:
+                    articul = str(ARTICUL_MIN + rng.randrange(space))
+                    if not Product.objects.filter(articul=articul).exists():
+                        return articul
+
+            self.stdout.write(f'{"occupancy":>9} {"strategy":>10} {"p50 ms":>8} {"p90 ms":>8} {"p99 ms":>8} '
+                              f'{"queries/insert":>15}')
+            for occupancy in options['occupancy']:
+                for strategy in ('random', 'allocator'):
+                    Product.objects.all().delete()
+                    filled = rng.sample(range(space), space * occupancy // 100)
+                    Product.objects.bulk_create([new_product(str(ARTICUL_MIN + n)) for n in filled], batch_size=500)
+
+                    allocator = ArticulAllocator(sequence=f'bench-{occupancy}', domain=space)
+                    samples = []
+                    with CaptureQueriesContext(connection) as ctx:
+                        for _ in range(options['inserts']):
+                            with timer(samples):
+                                articul = random_probe() if strategy == 'random' else allocator.allocate()[0]
+                                new_product(articul).save()
+
+                    stats = summarize(samples)
+                    self.stdout.write(f'{occupancy:>8}% {strategy:>10} {stats["p50_ms"]:>8.3f} {stats["p90_ms"]:>8.3f} '
+                                      f'{stats["p99_ms"]:>8.3f} {len(ctx) / options["inserts"]:>15.2f}')
@@ -0,0 +1,137 @@
+import random
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+from django.db.models.functions import Lower, Trim
+
+from accounts.models import User
+from seller.bench import benchmark_database, timer, summarize
+from seller.facets import FACETS, facet_counts, rebuild_facets
+from seller.models import Category, Shop
+from seller.models.products import Product, ProductVariant
+
+COLORS = ['red', 'blue', 'green', 'black', 'white', 'yellow', 'pink', 'gray', 'brown', 'orange', 'purple', 'beige']
+SIZES = ['xs', 's', 'm', 'l', 'xl', 'xxl']
+
+
+def naive_filter(queryset, selection):
+    for facet, values in selection.items():
+        if facet == 'category':
+            queryset = queryset.filter(category_id__in=values)
+        elif facet == 'shop':
+            queryset = queryset.filter(shop_id__in=values)
+        elif facet == 'price':
+            ranges = []
+            for value in values:
+                lower, _, upper = value.rstrip('+').partition('-')
+                ranges.append(Q(price__gte=int(lower), price__lt=int(upper)) if upper else Q(price__gte=int(lower)))
+            queryset = queryset.filter(reduce(or_, ranges))
+        elif facet == 'rating':
+            queryset = queryset.filter(reduce(or_, [Q(rating__gte=int(v), rating__lt=int(v) + 1) for v in values]))
+        else:
+            queryset = queryset.filter(id__in=ProductVariant.objects.annotate(
+                normalized=Lower(Trim(facet))).filter(normalized__in=values).values('product_id'))
+    return queryset
+
+
+def naive_facet_counts(selection):
+    result = {}
+    for facet in FACETS:
+        others = {key: values for key, values in selection.items() if key != facet}
+        products = naive_filter(Product.objects.all(), others)
+        if facet in ('color', 'size'):
+            rows = ProductVariant.objects.filter(product__in=products).exclude(**{f'{facet}__isnull': True}) \
+                .annotate(value=Lower(Trim(facet))).values('value').annotate(count=Count('product_id', distinct=True))
+            result[facet] = {row['value']: row['count'] for row in rows}
+        elif facet == 'price':
+            bounds = settings.FACET_PRICE_BUCKETS
+            result[facet] = {}
+            for lower, upper in zip(bounds, bounds[1:] + [None]):
+                bucket = products.filter(price__gte=lower, **({'price__lt': upper} if upper else {}))
+                count = bucket.count()
+                if count:
+                    result[facet][f'{lower}-{upper}' if upper else f'{lower}+'] = count
+        elif facet == 'rating':
+            result[facet] = {}
+            for star in range(6):
+                count = products.filter(rating__gte=star, rating__lt=star + 1).count()
+                if count:
+                    result[facet][str(star)] = count
+        else:
+            rows = products.values(f'{facet}_id').annotate(count=Count('id'))
+            result[facet] = {str(row[f'{facet}_id']): row['count'] for row in rows}
+    return {'count': naive_filter(Product.objects.all(), selection).count(), 'facets': result}
+
+
+class Command(BaseCommand):
+    help = 'Compare precomputed facet counts with naive ORM aggregation on a synthetic catalog.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=20000)
+        parser.add_argument('--variants', type=int, default=3, help='Variants per product.')
+        parser.add_argument('--queries', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with benchmark_database():
+            categories, shops = self._generate(rng, options)
+            self.stdout.write('Building facet tables...')
+            rebuild_facets()
+
+            selections = [{}]
+            for _ in range(options['queries'] - 1):
+                selection = {}
+                if rng.random() < 0.7:
+                    selection['category'] = [str(rng.choice(categories))]
+                if rng.random() < 0.3:
+                    selection['shop'] = [str(rng.choice(shops))]
+                if rng.random() < 0.5:
+                    selection['color'] = rng.sample(COLORS, rng.randint(1, 3))
+                if rng.random() < 0.3:
+                    selection['size'] = [rng.choice(SIZES)]
+                selections.append(selection)
+
+            timings = {'naive': [], 'facets': []}
+            for selection in selections:
+                with timer(timings['naive']):
+                    expected = naive_facet_counts(selection)
+                with timer(timings['facets']):
+                    actual = facet_counts(selection)
+                actual = {'count': actual['count'], 'facets': {
+                    facet: {item['value']: item['count'] for item in items}
+                    for facet, items in actual['facets'].items()}}
+                if actual != expected:
+                    raise CommandError(f'Facet counts differ for {selection}: {actual} != {expected}')
+
+            self.stdout.write(f'{"strategy":>8} {"mean ms":>9} {"p50 ms":>9} {"p90 ms":>9} {"p99 ms":>9}')
+            for name, samples in timings.items():
+                stats = summarize(samples)
+                self.stdout.write(f'{name:>8} {stats["mean_ms"]:>9.2f} {stats["p50_ms"]:>9.2f} '
+                                  f'{stats["p90_ms"]:>9.2f} {stats["p99_ms"]:>9.2f}')
+            speedup = summarize(timings['naive'])['mean_ms'] / max(summarize(timings['facets'])['mean_ms'], 1e-9)
+            self.stdout.write(self.style.SUCCESS(f'Facet engine is {speedup:.1f}x faster on average.'))
+
+    def _generate(self, rng, options):
+        owner = User.objects.create_user(username='bench', password='bench', user_type='vendor')
+        categories = Category.objects.bulk_create([
+            Category(image='images/category/bench.png', ru_name=f'Категория {n}', uz_name=f'Kategoriya {n}')
+            for n in range(30)
+        ])
+        shops = Shop.objects.bulk_create([
+            Shop(owner=owner, name=f'Shop {n}', description='Bench', image='images/shop/bench.png') for n in range(50)
+        ])
+        products = Product.objects.bulk_create([
+            Product(shop=rng.choice(shops), category=rng.choice(categories), name_ru='Товар', name_uz='Mahsulot',
+                    description_ru='Bench', description_uz='Bench', price=rng.randint(1000, 2000000),
+                    amount=100, articul=str(10000000 + n), rating=rng.choice([0, 3.5, 4.2, 4.8, 5]))
+            for n in range(options['products'])
+        ], batch_size=1000)
+        ProductVariant.objects.bulk_create([
+            ProductVariant(product=product, color=rng.choice(COLORS).title(), size=rng.choice(SIZES), price=1)
+            for product in products for _ in range(options['variants'])
+        ], batch_size=1000)
+        return [category.id for category in categories], [shop.id for shop in shops]
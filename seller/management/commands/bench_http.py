@@ -0,0 +1,81 @@
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from seller.bench import summarize
+
+
+async def fetch(url, headers):
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == 'https')
+    path = parts.path or '/'
+    if parts.query:
+        path += f'?{parts.query}'
+    lines = [f'GET {path} HTTP/1.1', f'Host: {parts.netloc}', 'Connection: close', *headers, '', '']
+    writer.write('\r\n'.join(lines).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(response.split(b' ', 2)[1])
+
+
+async def load(url, headers, requests, concurrency):
+    samples, errors = [], 0
+    queue = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                status = await fetch(url, headers)
+            except OSError:
+                status = None
+            samples.append(time.perf_counter() - started)
+            if status is None or status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {**summarize(samples), 'errors': errors, 'requests_per_second': len(samples) / elapsed if elapsed else 0.0}
+
+
+class Command(BaseCommand):
+    help = ('Load test one or more running endpoints (e.g. the sync gunicorn and the ASGI/uvicorn profile) '
+            'and report p50/p99 latency and throughput.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Full URLs to compare, e.g. http://127.0.0.1:8000/seller/product/')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=50)
+        parser.add_argument('--header', action='append', default=[], help='Extra request header, e.g. '
+                                                                          '"Authorization: Bearer <token>".')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        results = {}
+        for url in options['urls']:
+            if urlsplit(url).scheme not in ('http', 'https'):
+                raise CommandError(f'Not an http(s) URL: {url}')
+            asyncio.run(load(url, options['header'], options['warmup'], min(options['concurrency'], 10)))
+            results[url] = asyncio.run(load(url, options['header'], options['requests'], options['concurrency']))
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for url, stats in results.items():
+            self.stdout.write(
+                f"{url}\n  {stats['count']} requests, {stats['errors']} errors, "
+                f"{stats['requests_per_second']:.1f} req/s, p50 {stats['p50_ms']:.1f} ms, "
+                f"p90 {stats['p90_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms"
+            )
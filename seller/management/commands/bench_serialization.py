@@ -0,0 +1,110 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import RequestFactory
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from seller.bench import benchmark_database, summarize
+from seller.bench_data import SCALES, generate
+from seller.fast_serializers import product_converter, order_converter
+from seller.models.orders import Order
+from seller.models.products import Product
+from seller.renderers import MessagePackRenderer, msgpack
+from seller.serializers import ProductsSerializer, OrderSerializer
+from seller.views import product_catalog_queryset
+
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench-serialization'}}
+
+
+def measure(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+class Command(BaseCommand):
+    help = ('Compare rows per second of the DRF serializers and the values()-based converters used by the product '
+            'and order list endpoints, including the queries for one page and JSON rendering.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        size, iterations = options['page_size'], options['iterations']
+        request = RequestFactory().get('/seller/product/')
+        results = {'page_size': size, 'iterations': iterations, 'endpoints': {}}
+
+        setup_test_environment()
+        try:
+            with benchmark_database(), override_settings(CACHES=LOCAL_CACHE):
+                generate(options['scale'], options['seed'])
+                # Buyurtmalari eng ko'p mijozning tarixi o'lchanadi
+                customer = Order.objects.values('customer_id').annotate(orders=Count('id')).order_by(
+                    '-orders').values_list('customer_id', flat=True).first()
+
+                cases = {
+                    'product-list': (
+                        lambda: ProductsSerializer(
+                            product_catalog_queryset().order_by('-created_at', '-id')[:size], many=True,
+                            context={'request': request}).data,
+                        lambda: product_converter.convert(
+                            Product.objects.values(*product_converter.columns).order_by('-created_at', '-id')[:size],
+                            request),
+                    ),
+                    'order-list': (
+                        lambda: OrderSerializer(
+                            Order.objects.filter(customer_id=customer).order_by('-id')
+                            .prefetch_related('order_items')[:size], many=True, context={'request': request}).data,
+                        lambda: order_converter.convert(
+                            Order.objects.filter(customer_id=customer).order_by('-id')
+                            .values(*order_converter.columns)[:size], request),
+                    ),
+                }
+                for name, (before, after) in cases.items():
+                    results['endpoints'][name] = self._compare(before, after, iterations)
+        finally:
+            teardown_test_environment()
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"endpoint":<14} {"rows":>5} {"serializer rows/s":>18} {"converter rows/s":>17} '
+                          f'{"speedup":>8} {"json ms":>8} {"msgpack ms":>11}')
+        for name, stats in results['endpoints'].items():
+            packed = f'{stats["msgpack"]["p50_ms"]:.2f}' if stats['msgpack'] else '-'
+            self.stdout.write(f'{name:<14} {stats["rows"]:>5} {stats["serializer_rows_per_second"]:>18.0f} '
+                              f'{stats["converter_rows_per_second"]:>17.0f} {stats["speedup"]:>7.1f}x '
+                              f'{stats["json"]["p50_ms"]:>8.2f} {packed:>11}')
+
+    def _compare(self, before, after, iterations):
+        expected, data = before(), after()
+        if JSONRenderer().render(expected) != JSONRenderer().render(data):
+            raise CommandError('Converter output differs from the serializer output.')
+        rows = len(data)
+        if not rows:
+            raise CommandError('The generated dataset has no rows for this endpoint.')
+
+        before_samples = measure(before, iterations)
+        after_samples = measure(after, iterations)
+        serializer_rate = rows * iterations / sum(before_samples)
+        converter_rate = rows * iterations / sum(after_samples)
+        return {
+            'rows': rows,
+            'serializer_rows_per_second': serializer_rate,
+            'converter_rows_per_second': converter_rate,
+            'speedup': converter_rate / serializer_rate,
+            'serializer': summarize(before_samples),
+            'converter': summarize(after_samples),
+            'json': summarize(measure(lambda: JSONRenderer().render(data), iterations)),
+            'msgpack': summarize(measure(lambda: MessagePackRenderer().render(data), iterations)) if msgpack else None,
+        }
@@ -0,0 +1,138 @@
+import json
+import os
+import platform
+import random
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment, override_settings
+from django.utils import timezone
+
+from seller.bench import benchmark_database
+from seller.bench_data import SCALES, generate
+from seller.bench_scenarios import SCENARIOS, Context, run_scenario
+
+# Taqqoslashda ko'rsatiladigan metrikalar: (nomi, kalit yo'li, kattaroq yaxshimi)
+COMPARED = [
+    ('req/s', ('requests_per_second',), True),
+    ('p50 ms', ('latency', 'p50_ms'), False),
+    ('p99 ms', ('latency', 'p99_ms'), False),
+    ('queries', ('queries_mean',), False),
+]
+
+
+def metric(stats, path):
+    for key in path:
+        stats = stats[key]
+    return stats
+
+
+class Command(BaseCommand):
+    help = ('Generate a synthetic catalog in a throwaway database, replay user scenarios against the API and '
+            'report throughput, latency percentiles and queries per request. Results can be saved as JSON and '
+            'compared with a previous run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+        for entity in SCALES['small']:
+            parser.add_argument(f'--{entity.replace("_", "-")}', type=int, dest=entity,
+                                help=f'Override the number of {entity.replace("_", " ")} for the chosen scale.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=100, help='Runs of each scenario.')
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), dest='scenarios',
+                            help='Scenario to run, can be repeated. Runs all scenarios by default.')
+        parser.add_argument('--output', help='Write results to this JSON file.')
+        parser.add_argument('--compare', help='Compare results with a JSON file from a previous run.')
+        parser.add_argument('--endpoints', action='store_true', help='Print per-endpoint breakdown.')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            if not os.path.exists(options['compare']):
+                raise CommandError(f'Baseline file not found: {options["compare"]}')
+            with open(options['compare']) as source:
+                baseline = json.load(source)
+
+        scenarios = options['scenarios'] or list(SCENARIOS)
+        overrides = {entity: options[entity] for entity in SCALES['small']}
+        results = {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'scale': options['scale'],
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+            },
+            'scenarios': {},
+        }
+
+        setup_test_environment()
+        try:
+            # Kesh ishchi keshga tegmasligi uchun xotirada; auth ssenariysi bitta IP dan keladi,
+            # shuning uchun login cheklovi o'chiriladi
+            with benchmark_database(), override_settings(CACHES={
+                    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'},
+                    'ratelimit': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                  'LOCATION': 'bench-ratelimit'}},
+                    LOGIN_RATE_LIMITS={'ip': (10 ** 9, 60), 'username': (10 ** 9, 300)}):
+                started = time.perf_counter()
+                data = generate(options['scale'], options['seed'], **overrides)
+                results['meta']['sizes'] = data['sizes']
+                results['meta']['generate_seconds'] = round(time.perf_counter() - started, 3)
+                self.stdout.write(f'Generated {options["scale"]} dataset in {results["meta"]["generate_seconds"]} s')
+
+                ctx = Context(data, random.Random(options['seed']))
+                for name in scenarios:
+                    results['scenarios'][name] = run_scenario(name, ctx, options['iterations'], options['warmup'])
+        finally:
+            teardown_test_environment()
+
+        self.print_results(results, options['endpoints'])
+        if baseline is not None:
+            self.print_comparison(results, baseline)
+        if options['output']:
+            directory = os.path.dirname(options['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(options['output'], 'w') as target:
+                json.dump(results, target, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def print_results(self, results, endpoints):
+        self.stdout.write(f'{"scenario":<14} {"requests":>8} {"errors":>6} {"req/s":>8} {"p50 ms":>8} '
+                          f'{"p90 ms":>8} {"p99 ms":>8} {"queries":>8}')
+        for name, stats in results['scenarios'].items():
+            latency = stats['latency']
+            self.stdout.write(f'{name:<14} {stats["requests"]:>8} {stats["errors"]:>6} '
+                              f'{stats["requests_per_second"]:>8.1f} {latency["p50_ms"]:>8.2f} '
+                              f'{latency["p90_ms"]:>8.2f} {latency["p99_ms"]:>8.2f} {stats["queries_mean"]:>8.1f}')
+            if endpoints:
+                for label, endpoint in stats['endpoints'].items():
+                    self.stdout.write(f'  {label:<40} {endpoint["count"]:>6} {endpoint["errors"]:>4} err '
+                                      f'p50 {endpoint["p50_ms"]:.2f} ms p99 {endpoint["p99_ms"]:.2f} ms '
+                                      f'{endpoint["queries_mean"]:.1f} queries (max {endpoint["queries_max"]})')
+
+    def print_comparison(self, results, baseline):
+        meta = baseline.get('meta', {})
+        if (meta.get('scale'), meta.get('seed')) != (results['meta']['scale'], results['meta']['seed']):
+            self.stdout.write(self.style.WARNING('Baseline was recorded with a different scale or seed.'))
+        self.stdout.write(f'\nChange against {meta.get("timestamp", "baseline")}:')
+        for name, stats in results['scenarios'].items():
+            previous = baseline.get('scenarios', {}).get(name)
+            if previous is None:
+                self.stdout.write(f'{name:<14} not in baseline')
+                continue
+            parts = []
+            for label, path, higher_is_better in COMPARED:
+                before, after = metric(previous, path), metric(stats, path)
+                change = (after - before) / before * 100 if before else 0.0
+                better = change > 0 if higher_is_better else change < 0
+                text = f'{label} {before:.2f} -> {after:.2f} ({change:+.1f}%)'
+                parts.append(self.style.SUCCESS(text) if better and abs(change) >= 5 else
+                             self.style.ERROR(text) if not better and abs(change) >= 5 else text)
+            self.stdout.write(f'{name:<14} ' + ', '.join(parts))
@@ -0,0 +1,91 @@
+import json
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+
+from seller.bench import benchmark_database, summarize
+from seller.bench_data import generate
+from seller.models.orders import Order
+from seller.models.products import Product
+
+# Taqqoslash uchun Django ning SQLite standartlari: rollback jurnali, DEFERRED tranzaksiya, 5 soniya kutish
+SQLITE_DEFAULTS = {'timeout': 5, 'init_command': 'PRAGMA journal_mode=DELETE;PRAGMA synchronous=FULL;'}
+
+
+class Command(BaseCommand):
+    help = ('Place orders from concurrent threads against a throwaway copy of the configured database and report '
+            'write throughput, latency and lock errors. On SQLite the tuned profile is compared with the stock one.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--orders', type=int, default=50, help='Orders placed by each thread.')
+        parser.add_argument('--items', type=int, default=3, help='Lines per order.')
+        parser.add_argument('--products', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON.')
+
+    def handle(self, *args, **options):
+        profiles = {'configured': dict(connection.settings_dict.get('OPTIONS', {}))}
+        if connection.vendor == 'sqlite':
+            profiles = {'sqlite-default': SQLITE_DEFAULTS, 'sqlite-tuned': profiles['configured']}
+
+        results = {}
+        original = connection.settings_dict.get('OPTIONS', {})
+        for name, db_options in profiles.items():
+            connection.settings_dict['OPTIONS'] = db_options
+            try:
+                with benchmark_database(file_backed=True):
+                    results[name] = self._run(options)
+            finally:
+                connection.settings_dict['OPTIONS'] = original
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f'{"profile":>15} {"orders":>7} {"errors":>6} {"orders/s":>9} {"p50 ms":>8} {"p99 ms":>8}')
+        for name, stats in results.items():
+            self.stdout.write(f'{name:>15} {stats["count"]:>7} {stats["errors"]:>6} {stats["orders_per_second"]:>9.1f} '
+                              f'{stats["p50_ms"]:>8.2f} {stats["p99_ms"]:>8.2f}')
+
+    def _run(self, options):
+        data = generate('small', options['seed'], products=options['products'], orders=0, reviews=0)
+        products = list(Product.objects.prefetch_related('bulk_prices').filter(pk__in=data['products']))
+        # Asosiy oqim ulanishi yopiladi, aks holda u fayl qulfini ushlab turishi mumkin
+        connection.close()
+
+        barrier = threading.Barrier(options['threads'])
+        lock = threading.Lock()
+        samples, errors = [], [0]
+
+        def worker(seed):
+            rng = random.Random(seed)
+            local_samples, local_errors = [], 0
+            try:
+                barrier.wait()
+                for _ in range(options['orders']):
+                    lines = [(product, rng.randint(1, 20)) for product in rng.sample(products, options['items'])]
+                    started = time.perf_counter()
+                    try:
+                        order = Order.objects.create(customer_id=rng.choice(data['customers']))
+                        order.add_items(lines)
+                    except OperationalError:
+                        local_errors += 1
+                    else:
+                        local_samples.append(time.perf_counter() - started)
+            finally:
+                connection.close()
+                with lock:
+                    samples.extend(local_samples)
+                    errors[0] += local_errors
+
+        threads = [threading.Thread(target=worker, args=(options['seed'] + n,)) for n in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        return {**summarize(samples), 'errors': errors[0], 'orders_per_second': len(samples) / elapsed}
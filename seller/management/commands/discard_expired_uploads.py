@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from seller.uploads import discard_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete upload sessions that stopped receiving chunks, together with their partial files.'
+
+    def handle(self, *args, **options):
+        discarded = discard_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(f'Discarded {discarded} expired upload sessions.'))
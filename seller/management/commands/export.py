@@ -0,0 +1,50 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from seller.analytics import day_bounds
+from seller.exports import EXPORT_FORMATS, product_rows, order_rows, export_chunks
+
+ROWS = {'products': product_rows, 'orders': order_rows}
+
+
+class Command(BaseCommand):
+    help = ('Stream products (with variants, bulk prices and other nested data) or order lines to a CSV or XLSX '
+            'file without loading the whole table into memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(ROWS))
+        parser.add_argument('--output', '-o', help='Target file. Writes to stdout by default.')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--gzip', action='store_true', help='Compress the output with gzip.')
+        parser.add_argument('--shop', type=int)
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD), inclusive.')
+        parser.add_argument('--chunk-size', type=int, help='Rows fetched from the database at a time.')
+
+    def handle(self, *args, **options):
+        if options['gzip'] and options['format'] == 'xlsx':
+            raise CommandError('XLSX files are already compressed.')
+        if options['start'] and options['end'] and options['start'] > options['end']:
+            raise CommandError('--start must not be after --end.')
+
+        rows = ROWS[options['kind']](
+            shop_id=options['shop'],
+            start=day_bounds(options['start'])[0] if options['start'] else None,
+            end=day_bounds(options['end'])[1] if options['end'] else None,
+            chunk_size=options['chunk_size'],
+        )
+        chunks = export_chunks(rows, options['format'], options['gzip'])
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as target:
+            for chunk in chunks:
+                target.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(f'Wrote {written} bytes to {options["output"]}'))
@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from seller.importers import ProductImporter, IMPORT_FORMATS, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Import products with their nested data from a CSV or JSONL file in batched transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=IMPORT_FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            file_format = options['format'] or detect_format(options['path'])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+            report = ProductImporter(chunk_size=options['chunk_size']).run(read_rows(stream, file_format))
+
+        for error in report['errors']:
+            self.stderr.write(json.dumps(error, ensure_ascii=False))
+        self.stdout.write(self.style.SUCCESS(f"Created {report['created']} products, {report['failed']} rows failed."))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from seller.images import process_tasks
+
+
+class Command(BaseCommand):
+    help = 'Render queued WebP image renditions in a process pool.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Process pool size (default: CPU count, 0 renders in this process).')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the queue instead of exiting.')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+
+    def handle(self, *args, **options):
+        while True:
+            report = process_tasks(limit=options['batch_size'], workers=options['workers'])
+            if report['done'] or report['failed']:
+                self.stdout.write(f"Rendered {report['done']} images, {report['failed']} failed.")
+            if not options['loop']:
+                break
+            if not report['done'] and not report['failed']:
+                time.sleep(options['sleep'])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from seller.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Rebuild product facet rows and precomputed facet counts from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        products = rebuild_facets(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt facets for {products} products.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from seller.models.orders import OrderMonthlySummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the monthly order summary rollup from orders to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customer', type=int, action='append', dest='customers',
+                            help='Only rebuild summaries for this customer id (repeatable).')
+
+    def handle(self, *args, **options):
+        created = OrderMonthlySummary.rebuild(customer_ids=options['customers'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {created} monthly order summaries.'))
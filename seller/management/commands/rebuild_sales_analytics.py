@@ -0,0 +1,18 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from seller.analytics import rebuild_sales
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily sales rollups from order items (backfill or drift repair).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day to rebuild (YYYY-MM-DD).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild_sales(start=options['start'], end=options['end'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily product sales rows.'))
@@ -0,0 +1,25 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from seller.models.products import Product
+from seller.search import get_backend, index_products, search_available
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product full-text search index from scratch.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search_available():
+            raise CommandError('Product search is not available for this database backend.')
+
+        get_backend().clear()
+        ids = Product.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=options['batch_size'])
+        indexed = 0
+        while batch := list(islice(ids, options['batch_size'])):
+            index_products(batch)
+            indexed += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} products.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from seller.models.products import Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized product rating aggregates from reviews to repair drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = Product.recompute_ratings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed ratings for {updated} products.'))
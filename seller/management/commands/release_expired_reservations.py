@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from seller.stock import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Return stock held by expired, unconfirmed reservations and drop their order items.'
+
+    def handle(self, *args, **options):
+        released = release_expired()
+        self.stdout.write(self.style.SUCCESS(f'Released {released} expired reservations.'))
@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, OperationalError
+
+from accounts.models import User
+from seller.bench import benchmark_database
+from seller.models import Category, Shop
+from seller.models.products import Product
+from seller.stock import reserve, InsufficientStock
+
+
+class Command(BaseCommand):
+    help = 'Hammer one product with concurrent checkouts and report oversell for each stock strategy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=50, help='Checkout attempts per thread.')
+        parser.add_argument('--stock', type=int, default=300)
+        parser.add_argument('--max-quantity', type=int, default=5)
+        parser.add_argument('--strategy', choices=['conditional', 'naive'], nargs='+', default=['naive', 'conditional'])
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        with benchmark_database(file_backed=True):
+            owner = User.objects.create_user(username='bench', password='bench', user_type='vendor')
+            shop = Shop.objects.create(owner=owner, name='Bench', description='Bench', image='images/shop/bench.png')
+            category = Category.objects.create(image='images/category/bench.png', ru_name='Bench', uz_name='Bench')
+
+            self.stdout.write(f'{"strategy":>11} {"sold":>6} {"stock left":>10} {"oversold":>8} {"lost":>5} '
+                              f'{"rejected":>8} {"db errors":>9} {"ops/s":>8}')
+            for strategy in options['strategy']:
+                product = Product.objects.create(shop=shop, category=category, name_ru='Bench', name_uz='Bench',
+                                                 description_ru='Bench', description_uz='Bench', price=1,
+                                                 amount=options['stock'])
+                result = self._run(strategy, product.pk, options)
+                product.refresh_from_db()
+                sold = result['sold']
+                oversold = max(0, sold - options['stock'])
+                # Sotilgan miqdor qoldiqdagi kamayishga teng bo'lmasa, yozuvlar bir-birini ustidan yozgan
+                lost = sold - (options['stock'] - product.amount)
+                self.stdout.write(f'{strategy:>11} {sold:>6} {product.amount:>10} {oversold:>8} {lost:>5} '
+                                  f'{result["rejected"]:>8} {result["errors"]:>9} {result["ops"]:>8.0f}')
+
+    def _run(self, strategy, product_id, options):
+        barrier = threading.Barrier(options['threads'])
+        lock = threading.Lock()
+        totals = {'sold': 0, 'rejected': 0, 'errors': 0}
+
+        def naive_checkout(quantity):
+            product = Product.objects.get(pk=product_id)
+            if quantity > product.amount:
+                raise InsufficientStock()
+            time.sleep(0)
+            product.amount -= quantity
+            product.save()
+
+        def conditional_checkout(quantity):
+            reserve(product_id, quantity)
+
+        checkout = naive_checkout if strategy == 'naive' else conditional_checkout
+
+        def worker(seed):
+            rng = random.Random(seed)
+            counts = {'sold': 0, 'rejected': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                for _ in range(options['attempts']):
+                    quantity = rng.randint(1, options['max_quantity'])
+                    try:
+                        checkout(quantity)
+                    except InsufficientStock:
+                        counts['rejected'] += 1
+                    except OperationalError:
+                        counts['errors'] += 1
+                    else:
+                        counts['sold'] += quantity
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in counts.items():
+                        totals[key] += value
+
+        threads = [threading.Thread(target=worker, args=(options['seed'] + n,)) for n in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        totals['ops'] = options['threads'] * options['attempts'] / elapsed
+        return totals
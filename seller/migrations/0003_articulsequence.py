@@ -0,0 +1,21 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0002_product_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticulSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('next_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:51
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_rating_aggregates(apps, schema_editor):
+    Product = apps.get_model('seller', 'Product')
+    Review = apps.get_model('seller', 'Review')
+    stars = range(1, 6)
+    rows = Review.objects.values('product_id').order_by().annotate(
+        total=Sum('rating'),
+        count=Count('id'),
+        **{f'stars_{star}': Count('id', filter=Q(rating=star)) for star in stars},
+    )
+    products = [
+        Product(
+            id=row['product_id'],
+            rating=row['total'] / row['count'],
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            **{f'rating_{star}_count': row[f'stars_{star}'] for star in stars},
+        )
+        for row in rows
+    ]
+    fields = ['rating', 'rating_sum', 'rating_count', *(f'rating_{star}_count' for star in stars)]
+    Product.objects.bulk_update(products, fields, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0003_articulsequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_aggregates, migrations.RunPython.noop),
+    ]
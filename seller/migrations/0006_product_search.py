@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS seller_product_search "
+            "USING fts5(name, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE IF NOT EXISTS seller_product_search ("
+            "product_id bigint PRIMARY KEY REFERENCES seller_product(id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX IF NOT EXISTS seller_product_search_document_idx "
+            "ON seller_product_search USING gin (document)"
+        )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS seller_product_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0005_stockreservation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.5 on 2026-10-18 10:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0006_product_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('category', 'Category'), ('shop', 'Shop'), ('price', 'Price range'), ('rating', 'Rating'), ('color', 'Color'), ('size', 'Size')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='facet_count_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(choices=[('category', 'Category'), ('shop', 'Shop'), ('price', 'Price range'), ('rating', 'Rating'), ('color', 'Color'), ('size', 'Size')], max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facets', to='seller.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'facet'], name='product_facet_product_idx')],
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value', 'product'), name='product_facet_unique')],
+            },
+        ),
+    ]
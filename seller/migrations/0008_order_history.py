@@ -0,0 +1,59 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_order_summaries(apps, schema_editor):
+    Order = apps.get_model('seller', 'Order')
+    OrderMonthlySummary = apps.get_model('seller', 'OrderMonthlySummary')
+    rows = Order.objects.annotate(month=TruncMonth('created_at', output_field=models.DateField())).values(
+        'customer_id', 'month').order_by().annotate(order_count=Count('id'), total=Sum('total_price'))
+    OrderMonthlySummary.objects.bulk_create([
+        OrderMonthlySummary(customer_id=row['customer_id'], month=row['month'], order_count=row['order_count'],
+                            total_price=row['total'] or 0)
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0007_product_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderMonthlySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', '-id'], name='order_customer_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='ordermonthlysummary',
+            name='customer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='order_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='ordermonthlysummary',
+            constraint=models.UniqueConstraint(fields=('customer', 'month'), name='order_summary_customer_month'),
+        ),
+        migrations.RunPython(backfill_order_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0008_order_history'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('units', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='seller.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='seller.product')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='seller.shop')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shop', 'date'], name='daily_sales_shop_date_idx'), models.Index(fields=['category', 'date'], name='daily_sales_category_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date'), name='daily_sales_product_date')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySalesCustomer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='seller.category')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='seller.product')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='seller.shop')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shop', 'date'], name='daily_customer_shop_date_idx'), models.Index(fields=['category', 'date'], name='daily_customer_cat_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'date', 'customer'), name='daily_sales_customer_unique')],
+            },
+        ),
+    ]
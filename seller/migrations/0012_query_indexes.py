@@ -0,0 +1,27 @@
+# Generated by Django 5.1.5 on 2026-10-18 11:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller', '0011_upload_sessions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bulkprice',
+            index=models.Index(fields=['product', 'min_quantity'], name='bulk_price_product_qty_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='order_created_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-id'], name='review_product_id_idx'),
+        ),
+    ]
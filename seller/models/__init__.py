@@ -1,4 +1,10 @@
 from .shop import Shop
-from .orders import Order
+from .orders import Order, OrderMonthlySummary
 from .products import Product
-from .category import Category
\ No newline at end of file
+from .category import Category
+from .articul import ArticulSequence
+from .stock import StockReservation
+from .facets import ProductFacet, FacetCount
+from .analytics import DailySales, DailySalesCustomer
+from .images import ImageTask
+from .uploads import UploadSession
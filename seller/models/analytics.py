@@ -0,0 +1,50 @@
+from django.db import models
+
+from accounts.models.user import User
+from seller.models.category import Category
+from seller.models.products import Product
+from seller.models.shop import Shop
+
+
+class DailySales(models.Model):
+    """Mahsulotning kunlik sotuvi; do'kon va kategoriya bo'yicha hisobotlar shu jadvaldan yig'iladi."""
+
+    date = models.DateField()
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name='daily_sales')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='daily_sales')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_sales')
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date'], name='daily_sales_product_date'),
+        ]
+        indexes = [
+            models.Index(fields=['shop', 'date'], name='daily_sales_shop_date_idx'),
+            models.Index(fields=['category', 'date'], name='daily_sales_category_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.date} | {self.product_id}: {self.units}'
+
+
+class DailySalesCustomer(models.Model):
+    # Noyob xaridorlarni hisoblagich bilan saqlab bo'lmaydi, shuning uchun (kun, mahsulot, xaridor) juftliklari saqlanadi
+    date = models.DateField()
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'date', 'customer'], name='daily_sales_customer_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['shop', 'date'], name='daily_customer_shop_date_idx'),
+            models.Index(fields=['category', 'date'], name='daily_customer_cat_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.date} | {self.product_id}: {self.customer_id}'
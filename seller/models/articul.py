@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class ArticulSequence(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name}: {self.next_value}'
@@ -3,6 +3,7 @@ from django.db import models
 
 class Category(models.Model):
     image = models.ImageField(upload_to='images/category/')
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     ru_name = models.CharField(max_length=255)
     uz_name = models.CharField(max_length=255)
 
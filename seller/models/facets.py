@@ -0,0 +1,43 @@
+from django.db import models
+
+from seller.models.products import Product
+
+
+class ProductFacet(models.Model):
+    FACET_CHOICES = (
+        ('category', 'Category'),
+        ('shop', 'Shop'),
+        ('price', 'Price range'),
+        ('rating', 'Rating'),
+        ('color', 'Color'),
+        ('size', 'Size'),
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='facets')
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    value = models.CharField(max_length=100)
+
+    class Meta:
+        constraints = [
+            # (facet, value, product) indeksi filtr va sanash so'rovlarini jadvalga tegmasdan bajaradi
+            models.UniqueConstraint(fields=['facet', 'value', 'product'], name='product_facet_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'facet'], name='product_facet_product_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.product_id}: {self.facet}={self.value}'
+
+
+class FacetCount(models.Model):
+    facet = models.CharField(max_length=20, choices=ProductFacet.FACET_CHOICES)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value'], name='facet_count_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.facet}={self.value}: {self.count}'
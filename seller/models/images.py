@@ -0,0 +1,39 @@
+from django.db import models
+from django.db.models import Q
+
+
+class ImageTask(models.Model):
+    """Rasm renditionlarini yaratish uchun DB dagi navbat.
+
+    Vazifa rasm saqlangan tranzaksiyaning o'zida yoziladi, worker esa uni
+    so'rovdan tashqarida, alohida jarayonlarda bajaradi.
+    """
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    field = models.CharField(max_length=50)
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    claimed_by = models.CharField(max_length=36, blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Bir rasm uchun navbatda faqat bitta kutilayotgan vazifa bo'ladi
+            models.UniqueConstraint(fields=['model', 'object_id', 'field'], condition=Q(status='pending'),
+                                    name='image_task_pending_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id'], name='image_task_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}:{self.object_id}.{self.field} ({self.status})'
@@ -1,20 +1,132 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Sum, Value, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
 from seller.models.products import Product
 from accounts.models.user import User
 
 class Order(models.Model):
     customer = models.ForeignKey(User, on_delete=models.CASCADE)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # Buyurtmalar tarixi: WHERE customer_id = ? ORDER BY id DESC keyset sahifalash uchun
+            models.Index(fields=['customer', '-id'], name='order_customer_id_idx'),
+            # Kunlik sotuvlar va oylik yig'indilar created_at oralig'i bo'yicha o'qiladi
+            models.Index(fields=['created_at'], name='order_created_at_idx'),
+        ]
 
     def update_total_price(self):
-        total = sum(item.get_total_price() for item in self.order_items.all())
-        self.total_price = total
-        self.save()
+        # Jami summani Python da emas, bazaning o'zida bitta UPDATE bilan hisoblaymiz
+        items_total = OrderItem.objects.filter(order=OuterRef('pk')).values('order').annotate(
+            total=Sum(F('price_per_unit') * F('product_quantity')),
+        ).values('total')
+        with transaction.atomic():
+            previous = Order.objects.select_for_update().filter(pk=self.pk).values_list('total_price', flat=True).first()
+            Order.objects.filter(pk=self.pk).update(
+                total_price=Coalesce(Subquery(items_total), Value(Decimal('0')), output_field=models.DecimalField()),
+            )
+            self.refresh_from_db(fields=['total_price'])
+            if previous is not None:
+                OrderMonthlySummary.for_order(self.pk).update(total_price=F('total_price') + self.total_price - previous)
+
+    @staticmethod
+    def apply_total_delta(order_id, delta):
+        if delta:
+            Order.objects.filter(pk=order_id).update(total_price=F('total_price') + delta)
+            OrderMonthlySummary.for_order(order_id).update(total_price=F('total_price') + delta)
+
+    def add_items(self, lines):
+        from seller.analytics import add_sales, sale_line
+        from seller.stock import reserve_many
+
+        items = [
+            OrderItem(order=self, product=product, product_quantity=quantity,
+                      price_per_unit=product.get_price_for_quantity(quantity))
+            for product, quantity in lines
+        ]
+        with transaction.atomic():
+            OrderItem.objects.bulk_create(items)
+            reserve_many([(item.product_id, None, item.product_quantity, item) for item in items])
+            Order.apply_total_delta(self.pk, sum(item.get_total_price() for item in items))
+            # bulk_create signal bermaydi
+            add_sales(sale_line(self, item.product_id, item.product_quantity, item.get_total_price()) for item in items)
+        self.refresh_from_db(fields=['total_price'])
+        return items
 
     def __str__(self):
         return f"Order {self.id} - {self.customer}"
 
 
+class OrderMonthlySummary(models.Model):
+    """Mijoz buyurtmalarining oylik yig'indisi, Order o'zgarishlari bilan birga yangilanadi."""
+
+    customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='order_summaries')
+    month = models.DateField()
+    order_count = models.IntegerField(default=0)
+    total_price = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'month'], name='order_summary_customer_month'),
+        ]
+
+    @staticmethod
+    def month_of(moment):
+        return timezone.localtime(moment).date().replace(day=1)
+
+    @classmethod
+    def for_order(cls, order_id):
+        order = Order.objects.filter(pk=order_id)
+        return cls.objects.filter(
+            customer_id=Subquery(order.values('customer_id')),
+            month=Subquery(order.annotate(month=TruncMonth('created_at', output_field=models.DateField()))
+                           .values('month')),
+        )
+
+    @classmethod
+    def add_order(cls, order):
+        month = cls.month_of(order.created_at)
+        cls.objects.bulk_create([cls(customer_id=order.customer_id, month=month)], ignore_conflicts=True)
+        cls.objects.filter(customer_id=order.customer_id, month=month).update(
+            order_count=F('order_count') + 1, total_price=F('total_price') + order.total_price,
+        )
+
+    @classmethod
+    def remove_order(cls, order_id):
+        # Buyurtma o'chirilishidan oldin chaqiriladi: summa bazadagi joriy qiymatdan olinadi
+        cls.for_order(order_id).update(
+            order_count=F('order_count') - 1,
+            total_price=F('total_price') - Subquery(Order.objects.filter(pk=order_id).values('total_price')),
+        )
+
+    @classmethod
+    def rebuild(cls, customer_ids=None):
+        orders = Order.objects.all()
+        summaries = cls.objects.all()
+        if customer_ids is not None:
+            orders = orders.filter(customer_id__in=customer_ids)
+            summaries = summaries.filter(customer_id__in=customer_ids)
+        rows = orders.annotate(month=TruncMonth('created_at', output_field=models.DateField())).values(
+            'customer_id', 'month').order_by().annotate(order_count=models.Count('id'), total=Sum('total_price'))
+        with transaction.atomic():
+            summaries.delete()
+            created = cls.objects.bulk_create([
+                cls(customer_id=row['customer_id'], month=row['month'], order_count=row['order_count'],
+                    total_price=row['total'] or 0)
+                for row in rows
+            ], batch_size=1000)
+        return len(created)
+
+    def __str__(self):
+        return f"{self.customer_id} | {self.month:%Y-%m}"
+
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="order_items")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
@@ -22,14 +134,41 @@ class OrderItem(models.Model):
 
     price_per_unit = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
+    _loaded_order_id = None
+    _loaded_product_id = None
+    _loaded_quantity = 0
+    _loaded_total = Decimal('0')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded()
+        return instance
+
+    def _remember_loaded(self):
+        # Signal va save() dagi farqlar bazadagi oldingi qiymatlardan hisoblanadi
+        self._loaded_order_id = self.order_id
+        self._loaded_product_id = self.product_id
+        self._loaded_quantity = self.product_quantity
+        self._loaded_total = self.get_total_price()
+
     def save(self, *args, **kwargs):
         if self.product_quantity > self.product.amount:
             raise ValueError(f"Not enough stock available. Maximum available: {self.product.amount} units.")
 
         self.price_per_unit = self.product.get_price_for_quantity(self.product_quantity)
 
-        super().save(*args, **kwargs)
-        self.order.update_total_price()
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Butun buyurtmani qayta hisoblash o'rniga faqat farqni qo'shamiz
+            if adding or self._loaded_order_id != self.order_id:
+                if not adding:
+                    Order.apply_total_delta(self._loaded_order_id, -self._loaded_total)
+                Order.apply_total_delta(self.order_id, self.get_total_price())
+            else:
+                Order.apply_total_delta(self.order_id, self.get_total_price() - self._loaded_total)
+        self._remember_loaded()
 
     def get_total_price(self):
         return self.price_per_unit * self.product_quantity
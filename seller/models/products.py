@@ -1,12 +1,15 @@
-import random
-
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Q, Value, Count, Sum, Exists, OuterRef
+from django.db.models.functions import Cast, Coalesce, NullIf
 
+from seller.articul import articul_allocator
 from seller.models.category import Category
 from seller.models.shop import Shop
 from accounts.models.user import User
 
+RATING_STARS = range(1, 6)
+RATING_FIELDS = ['rating', 'rating_sum', 'rating_count', *(f'rating_{star}_count' for star in RATING_STARS)]
 
 class BaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
@@ -28,36 +31,110 @@ class Product(BaseModel):
     articul = models.CharField(max_length=8, unique=True, validators=[RegexValidator(r'^\d{8}$', 'Artikule must consist of 8 digits.')], blank=True)
 
     rating = models.FloatField(default=0.0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
 
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='category')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='product_created_id_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.articul:
             self.articul = self.generate_articul()
         super().save(*args, **kwargs)
 
 
+    @property
+    def rating_histogram(self):
+        return {str(star): getattr(self, f'rating_{star}_count') for star in RATING_STARS}
+
     def update_rating(self):
-        reviews = self.reviews.all()
-        total_reviews = reviews.count()
-        if total_reviews > 0:
-            self.rating = sum(review.rating for review in reviews) / total_reviews
-        else:
-            self.rating = 0.0
-        self.save()
+        Product.recompute_ratings(Product.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=RATING_FIELDS)
+
+    @staticmethod
+    def apply_rating_change(product_id, added=None, removed=None):
+        # Reytingni barcha sharhlarni o'qimasdan, bitta UPDATE bilan o'zgartiramiz
+        delta_sum = (added or 0) - (removed or 0)
+        delta_count = (added is not None) - (removed is not None)
+        updates = {
+            'rating_sum': F('rating_sum') + delta_sum,
+            'rating_count': F('rating_count') + delta_count,
+            'rating': Coalesce(
+                Cast(F('rating_sum') + delta_sum, models.FloatField()) / NullIf(F('rating_count') + delta_count, 0),
+                Value(0.0),
+            ),
+        }
+        if added is not None:
+            updates[f'rating_{added}_count'] = F(f'rating_{added}_count') + 1
+        if removed is not None:
+            if removed == added:
+                del updates[f'rating_{added}_count']
+            else:
+                updates[f'rating_{removed}_count'] = F(f'rating_{removed}_count') - 1
+        Product.objects.filter(pk=product_id).update(**updates)
+
+    @staticmethod
+    def recompute_ratings(queryset=None, batch_size=1000):
+        products = Product.objects.all() if queryset is None else queryset
+        aggregates = Review.objects.filter(product__in=products).values('product_id').order_by().annotate(
+            total=Sum('rating'),
+            count=Count('id'),
+            **{f'stars_{star}': Count('id', filter=Q(rating=star)) for star in RATING_STARS},
+        )
+
+        updated = 0
+        batch = []
+        for row in aggregates.iterator(chunk_size=batch_size):
+            batch.append(Product(
+                id=row['product_id'],
+                rating=row['total'] / row['count'],
+                rating_sum=row['total'],
+                rating_count=row['count'],
+                **{f'rating_{star}_count': row[f'stars_{star}'] for star in RATING_STARS},
+            ))
+            if len(batch) >= batch_size:
+                Product.objects.bulk_update(batch, RATING_FIELDS)
+                updated += len(batch)
+                batch = []
+        if batch:
+            Product.objects.bulk_update(batch, RATING_FIELDS)
+            updated += len(batch)
+
+        reset = products.filter(~Exists(Review.objects.filter(product=OuterRef('pk')))).exclude(
+            rating=0.0, rating_count=0, rating_sum=0, **{f'rating_{star}_count': 0 for star in RATING_STARS},
+        ).update(rating=0.0, rating_sum=0, rating_count=0, **{f'rating_{star}_count': 0 for star in RATING_STARS})
+        return updated + reset
 
     def get_price_for_quantity(self, quantity):
-        bulk_prices = self.bulk_prices.filter(min_quantity__lte=quantity).order_by('-min_quantity')
-        if bulk_prices.exists():
-            return bulk_prices.first().price_per_unit  # Get the best bulk price
-        return self.price
+        from seller.pricing import PriceTiers, price_tier_index
+
+        # Oldindan yuklangan bulk_prices bo'lsa so'rov yubormaymiz, aks holda keshdagi jadvaldan olamiz
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('bulk_prices')
+        if prefetched is not None:
+            tiers = PriceTiers.from_bulk_prices(self.price, prefetched)
+        elif self.pk is not None:
+            tiers = price_tier_index.get(self.pk) or PriceTiers(self.price, (), ())
+            tiers = tiers._replace(base_price=self.price)
+        else:
+            tiers = PriceTiers(self.price, (), ())
+        return tiers.price_for(quantity)
 
     @staticmethod
     def generate_articul():
-        while True:
-            articul = str(random.randint(10000000, 99999999))
-            if not Product.objects.filter(articul=articul).exists():
-                return articul
+        return articul_allocator.allocate()[0]
+
+    @staticmethod
+    def generate_articuls(count):
+        return articul_allocator.allocate(count)
 
     def __str__(self):
         return f'{self.name_ru} | {self.shop.name}'
@@ -84,6 +161,10 @@ class BulkPrice(models.Model):
 
     class Meta:
         ordering = ['min_quantity']
+        indexes = [
+            # Narx jadvali mahsulot bo'yicha min_quantity tartibida o'qiladi
+            models.Index(fields=['product', 'min_quantity'], name='bulk_price_product_qty_idx'),
+        ]
 
     def __str__(self):
         return f'{self.min_quantity}+ units for ${self.price_per_unit} each'
@@ -101,6 +182,7 @@ class KeywordsProduct(BaseModel):
 
 class PhotoProducts(BaseModel):
     image = models.ImageField(upload_to='products/images/', blank=True, null=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='photos', blank=True, null=True)
     product_variants = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name="variant_photos", blank=True, null=True)
 
@@ -130,14 +212,34 @@ class Review(models.Model):
 
     class Meta:
         unique_together = ('user', 'product')
+        indexes = [
+            # Mahsulot sharhlari id bo'yicha keyset sahifalanadi
+            models.Index(fields=['product', '-id'], name='review_product_id_idx'),
+        ]
 
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.product.update_rating()
+    _loaded_rating = None
+    _loaded_product_id = None
 
-    def delete(self, *args, **kwargs):
-        super().delete(*args, **kwargs)
-        self.product.update_rating()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_rating = instance.rating
+        instance._loaded_product_id = instance.product_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Product.apply_rating_change(self.product_id, added=self.rating)
+            elif self._loaded_product_id != self.product_id:
+                Product.apply_rating_change(self._loaded_product_id, removed=self._loaded_rating)
+                Product.apply_rating_change(self.product_id, added=self.rating)
+            elif self._loaded_rating != self.rating:
+                Product.apply_rating_change(self.product_id, added=self.rating, removed=self._loaded_rating)
+        self._loaded_rating = self.rating
+        self._loaded_product_id = self.product_id
 
     def __str__(self):
         return f"{self.user.username} - {self.product.name_ru} ({self.rating} stars)"
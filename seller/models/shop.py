@@ -7,6 +7,7 @@ class Shop(models.Model):
     name = models.CharField(max_length=255)
     description = models.CharField(max_length=455)
     image = models.ImageField(upload_to='images/shop/')
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return f'{self.owner} | {self.name}'
\ No newline at end of file
@@ -0,0 +1,27 @@
+from django.db import models
+
+from seller.models.orders import OrderItem
+from seller.models.products import Product, ProductVariant
+
+
+class StockReservation(models.Model):
+    STATUS_CHOICES = (
+        ('reserved', 'Reserved'),
+        ('confirmed', 'Confirmed'),
+        ('released', 'Released'),
+    )
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations', blank=True, null=True)
+    variant = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='reservations', blank=True, null=True)
+    order_item = models.ForeignKey(OrderItem, on_delete=models.SET_NULL, related_name='reservations', blank=True, null=True)
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='reserved')
+    expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='reservation_status_exp_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.quantity} x {self.variant or self.product} ({self.status})'
@@ -0,0 +1,44 @@
+import uuid
+
+from django.db import models
+
+from accounts.models.user import User
+from seller.models.products import Product, ProductVariant, PhotoProducts, VideoProducts
+
+
+class UploadSession(models.Model):
+    """Bo'laklab yuklanayotgan fayl holati; received - diskka yozilgan uzluksiz baytlar soni."""
+
+    KIND_CHOICES = (
+        ('video', 'Video'),
+        ('image', 'Image'),
+    )
+    STATUS_CHOICES = (
+        ('uploading', 'Uploading'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    )
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True, default='')
+    received = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    error = models.CharField(max_length=255, blank=True, default='')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    product_variants = models.ForeignKey(ProductVariant, on_delete=models.CASCADE, related_name='+', blank=True,
+                                         null=True)
+    video = models.ForeignKey(VideoProducts, on_delete=models.SET_NULL, related_name='+', blank=True, null=True)
+    photo = models.ForeignKey(PhotoProducts, on_delete=models.SET_NULL, related_name='+', blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'updated_at'], name='upload_session_status_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.filename} ({self.received}/{self.size})'
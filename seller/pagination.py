@@ -0,0 +1,66 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+
+class ProductCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class OrderCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-id'
+
+
+def encode_cursor(values):
+    # DjangoJSONEncoder vaqtni millisekundgacha qisqartiradi: shu millisekunddagi qatorlar o'tkazib yuborilardi
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+
+def decode_cursor(token, length):
+    try:
+        values = json.loads(urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor.')
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError('Invalid cursor.')
+    return values
+
+
+def keyset_filter(queryset, fields, values):
+    # Kamayish tartibidagi (a, b) < (va, vb) sharti: a < va OR (a = va AND b < vb)
+    condition = Q()
+    for index, field in enumerate(fields):
+        equal = {name: value for name, value in zip(fields[:index], values[:index])}
+        condition |= Q(**equal, **{f'{field}__lt': values[index]})
+    return queryset.filter(condition)
+
+
+async def keyset_page(request, queryset, fields, page_size=20, max_page_size=100):
+    """Async ORM uchun keyset sahifalash: faqat "next" havolasi, OFFSET ishlatilmaydi."""
+    try:
+        size = min(max(int(request.GET.get('page_size', page_size)), 1), max_page_size)
+    except ValueError:
+        size = page_size
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = keyset_filter(queryset, fields, decode_cursor(cursor, len(fields)))
+
+    rows = [row async for row in queryset.order_by(*(f'-{field}' for field in fields))[:size + 1]]
+    next_url = None
+    if len(rows) > size:
+        rows = rows[:size]
+        params = request.GET.copy()
+        params['cursor'] = encode_cursor([getattr(rows[-1], field) for field in fields])
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+    return rows, next_url
@@ -0,0 +1,88 @@
+from bisect import bisect_right
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from seller.models.products import Product, BulkPrice
+
+
+class PriceTiers(namedtuple('PriceTiers', ['base_price', 'min_quantities', 'prices'])):
+    __slots__ = ()
+
+    @classmethod
+    def from_bulk_prices(cls, base_price, bulk_prices):
+        tiers = sorted((bulk_price.min_quantity, bulk_price.price_per_unit) for bulk_price in bulk_prices)
+        return cls(base_price, tuple(q for q, _ in tiers), tuple(p for _, p in tiers))
+
+    def price_for(self, quantity):
+        # Eng katta min_quantity <= quantity bo'lgan pog'onani topamiz
+        index = bisect_right(self.min_quantities, quantity)
+        return self.prices[index - 1] if index else self.base_price
+
+
+class PriceTierIndex:
+    """Mahsulot narx pog'onalari keshi.
+
+    Kalitga mahsulotning updated_at qiymati qo'shiladi va har murojaatda u bazadan bitta
+    so'rov bilan o'qiladi: kesh har bir worker uchun alohida bo'lsa ham eski jadval qaytmaydi.
+    BulkPrice o'zgarishi mahsulotning updated_at ini yangilaydi (seller.signals).
+    """
+
+    key_prefix = 'price-tiers'
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+
+    def _key(self, product_id, version):
+        return f'{self.key_prefix}:{product_id}:{version.isoformat()}'
+
+    def _timeout(self):
+        return self.timeout if self.timeout is not None else getattr(settings, 'PRICE_TIER_CACHE_TIMEOUT', 300)
+
+    def tiers_for(self, product_ids):
+        products = {
+            product_id: (price, updated_at)
+            for product_id, price, updated_at in Product.objects.filter(id__in=set(product_ids)).values_list(
+                'id', 'price', 'updated_at')
+        }
+        keys = {self._key(product_id, updated_at): product_id for product_id, (_, updated_at) in products.items()}
+        found = {
+            keys[key]: tiers._replace(base_price=products[keys[key]][0]) for key, tiers in cache.get_many(keys).items()
+        }
+
+        missing = products.keys() - found.keys()
+        if missing:
+            loaded = self._load({product_id: products[product_id][0] for product_id in missing})
+            cache.set_many({self._key(product_id, products[product_id][1]): tiers
+                            for product_id, tiers in loaded.items()}, self._timeout())
+            found.update(loaded)
+        return found
+
+    def _load(self, base_prices):
+        rows = {product_id: [] for product_id in base_prices}
+        for bulk_price in BulkPrice.objects.filter(product_id__in=base_prices).only(
+                'product_id', 'min_quantity', 'price_per_unit'):
+            rows[bulk_price.product_id].append(bulk_price)
+        return {
+            product_id: PriceTiers.from_bulk_prices(base_price, rows[product_id])
+            for product_id, base_price in base_prices.items()
+        }
+
+    def get(self, product_id):
+        return self.tiers_for([product_id]).get(product_id)
+
+    def price(self, product_id, quantity):
+        return self.get(product_id).price_for(quantity)
+
+    def price_many(self, pairs):
+        """(product_id, quantity) juftliklari uchun narxlarni ikki so'rovdan oshmagan holda qaytaradi."""
+        pairs = list(pairs)
+        tiers = self.tiers_for(product_id for product_id, _ in pairs)
+        missing = {product_id for product_id, _ in pairs} - tiers.keys()
+        if missing:
+            raise Product.DoesNotExist(f'Products do not exist: {sorted(missing)}')
+        return [tiers[product_id].price_for(quantity) for product_id, quantity in pairs]
+
+
+price_tier_index = PriceTierIndex()
@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def encode_default(obj):
+    # JSONEncoder Decimal ni float qiladi, JSON javobidagi kabi satr bo'lishi uchun oldin str() ga aylantiriladi
+    if isinstance(obj, Decimal):
+        return str(obj)
+    return JSONEncoder().default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Accept: application/msgpack so'ralganda javobni MessagePack da beradi (msgpack o'rnatilgan bo'lsa)."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Decimal, sana va lazy satrlar JSON javobidagi kabi satrga aylantiriladi
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+# JSON javob o'zgarmaydi (DRF JSONRenderer), MessagePack faqat Accept sarlavhasi bilan tanlanadi
+LIST_RENDERER_CLASSES = [*api_settings.DEFAULT_RENDERER_CLASSES, *([MessagePackRenderer] if msgpack else [])]
@@ -0,0 +1,162 @@
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q
+
+from seller.batching import on_commit_batched
+from seller.models.products import Product, KeywordsProduct, CharacteristicsProduct
+
+SEARCH_TABLE = 'seller_product_search'
+
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ё': 'yo', 'ж': 'j', 'з': 'z', 'и': 'i',
+    'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p', 'р': 'r', 'с': 's', 'т': 't',
+    'у': 'u', 'ф': 'f', 'х': 'x', 'ц': 'ts', 'ч': 'ch', 'ш': 'sh', 'щ': 'sh', 'ъ': '', 'ы': 'i', 'ь': '',
+    'э': 'e', 'ю': 'yu', 'я': 'ya', 'ў': 'o', 'қ': 'q', 'ғ': 'g', 'ҳ': 'h',
+}
+_TRANSLATION = str.maketrans(CYRILLIC_TO_LATIN)
+_APOSTROPHES = re.compile(r"[ʻʼ‘’'`]")
+_NON_WORD = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """Ruscha/o'zbekcha (kirill va lotin) matnni bitta lotin ko'rinishiga keltiradi.
+
+    Indeks ham, qidiruv so'rovi ham shu ko'rinishda saqlanadi, shuning uchun
+    "чой" va "choy" bir xil topiladi.
+    """
+    text = (text or '').lower().translate(_TRANSLATION)
+    text = _APOSTROPHES.sub('', text)
+    return _NON_WORD.sub(' ', text).strip()
+
+
+def build_documents(product_ids):
+    product_ids = list(product_ids)
+    documents = {
+        row['id']: {'name': [row['name_ru'], row['name_uz']], 'body': [row['description_ru'], row['description_uz']]}
+        for row in Product.objects.filter(id__in=product_ids).values(
+            'id', 'name_ru', 'name_uz', 'description_ru', 'description_uz')
+    }
+    keywords = KeywordsProduct.objects.filter(
+        Q(product_id__in=documents) | Q(product_variants__product_id__in=documents)
+    ).values_list('product_id', 'product_variants__product_id', 'keyword')
+    for product_id, variant_product_id, keyword in keywords:
+        document = documents.get(product_id) or documents.get(variant_product_id)
+        if document is not None:
+            document['name'].append(keyword)
+    for row in CharacteristicsProduct.objects.filter(product_id__in=documents).values_list(
+            'product_id', 'title_ru', 'title_uz', 'info_ru', 'info_uz'):
+        documents[row[0]]['body'].extend(row[1:])
+
+    return {
+        product_id: (normalize(' '.join(filter(None, doc['name']))), normalize(' '.join(filter(None, doc['body']))))
+        for product_id, doc in documents.items()
+    }
+
+
+class SQLiteSearchBackend:
+    def remove(self, product_ids):
+        product_ids = list(product_ids)
+        if product_ids:
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(product_ids))})",
+                               product_ids)
+
+    def store(self, documents):
+        self.remove(documents)
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {SEARCH_TABLE} (rowid, name, body) VALUES (%s, %s, %s)',
+                               [(product_id, name, body) for product_id, (name, body) in documents.items()])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search(self, tokens, limit, offset):
+        # Nomdagi moslik tavsifdagidan muhimroq: bm25 og'irliklari (name=10, body=1)
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, 10.0, 1.0) LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    def remove(self, product_ids):
+        product_ids = list(product_ids)
+        if product_ids:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE product_id = ANY(%s)', [product_ids])
+
+    def store(self, documents):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (product_id, document) "
+                f"VALUES (%s, setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+                f"ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [(product_id, name, body) for product_id, (name, body) in documents.items()],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search(self, tokens, limit, offset):
+        query = ' & '.join(f'{token}:*' for token in tokens)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT product_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query "
+                f"WHERE document @@ query ORDER BY ts_rank(document, query) DESC, product_id DESC LIMIT %s OFFSET %s",
+                [query, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def search_available():
+    return connection.vendor in BACKENDS
+
+
+def get_backend():
+    backend_class = BACKENDS.get(connection.vendor)
+    if backend_class is None:
+        raise NotImplementedError(f'Product search is not available for the {connection.vendor!r} database backend.')
+    return backend_class()
+
+
+def index_products(product_ids):
+    product_ids = set(product_ids)
+    if not product_ids:
+        return
+    backend = get_backend()
+    documents = build_documents(product_ids)
+    with transaction.atomic():
+        backend.remove(product_ids - documents.keys())
+        if documents:
+            backend.store(documents)
+
+
+def remove_products(product_ids):
+    if search_available():
+        get_backend().remove(product_ids)
+
+
+def search_products(query, limit=20, offset=0):
+    tokens = normalize(query).split()
+    if not tokens:
+        return []
+    return get_backend().search(tokens, limit, offset)
+
+
+def schedule_reindex(product_id):
+    # Bir tranzaksiyada mahsulot va uning bolalari o'zgarsa, indeks commitdan keyin bir marta yangilanadi
+    if search_available():
+        on_commit_batched(index_products, product_id)
@@ -1,115 +1,225 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
 from seller.models.products import Product, PhotoProducts, VideoProducts, KeywordsProduct, CharacteristicsProduct, \
-    ProductVariant
-from seller.models.orders import Order, OrderItem
+    ProductVariant, BulkPrice
+from seller.images import enqueue_renditions, rendition_urls
+from seller.instrumentation import TimedSerializerMixin
+from seller.exports import EXPORT_FORMATS
+from seller.models import Category, Shop
+from seller.models.orders import Order, OrderItem, OrderMonthlySummary
+from seller.models.uploads import UploadSession
 from seller.models.products import Review
 
 
+class RenditionsField(serializers.ReadOnlyField):
+    # Tayyor bo'lmagan renditionlar uchun bo'sh obyekt qaytadi, mijoz asl rasmdan foydalanadi
+    def to_representation(self, value):
+        return rendition_urls(value, self.context.get('request'))
+
+
 class PhotoProductsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    renditions = RenditionsField()
+
     class Meta:
         model = PhotoProducts
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'renditions']
 
 class VideoProductsSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = VideoProducts
         fields = ['id', 'video']
 
 class KeywordsProductSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = KeywordsProduct
         fields = ['id', 'keyword']
 
 class CharacteristicsProductSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = CharacteristicsProduct
         fields = ['id', 'title_uz', 'title_ru', 'info_uz', 'info_ru']
 
 class ProductVariantSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = ProductVariant
         fields = ['id', 'color', 'size', 'stock', 'price', 'discount']
 
-class ProductsSerializer(serializers.ModelSerializer):
+class BulkPriceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BulkPrice
+        fields = ['id', 'min_quantity', 'price_per_unit']
+
+class ProductsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     photos = PhotoProductsSerializer(many=True, required=False)
     videos = VideoProductsSerializer(many=True, required=False)
     product_keywords = KeywordsProductSerializer(many=True, required=False)
     characteristics = CharacteristicsProductSerializer(many=True, required=False)
     variants = ProductVariantSerializer(many=True, required=False)
+    bulk_prices = BulkPriceSerializer(many=True, read_only=True)
     articul = serializers.CharField(read_only=True, required=False)
+    rating_histogram = serializers.ReadOnlyField()
 
     class Meta:
         model = Product
-        fields = "__all__"
+        exclude = ['rating_sum', 'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count']
+        read_only_fields = ['rating', 'rating_count']
+
+    nested_models = {
+        'photos': PhotoProducts,
+        'videos': VideoProducts,
+        'product_keywords': KeywordsProduct,
+        'characteristics': CharacteristicsProduct,
+        'variants': ProductVariant,
+    }
+
+    def validate(self, attrs):
+        if self.partial:
+            # PATCH da id siz elementlar yangi obyekt bo'ladi: ular partial=False bilan qayta tekshiriladi
+            for name in self.nested_models.keys() & attrs.keys():
+                self._validate_new_children(name, attrs[name])
+        return attrs
+
+    def _validate_new_children(self, name, items):
+        field = self.fields[name]
+        errors = []
+        for index, (data, item) in enumerate(zip(field.get_value(self.initial_data), items)):
+            if item.get('id') is not None:
+                errors.append({})
+                continue
+            serializer = type(field.child)(data=data, context=self.context)
+            if serializer.is_valid():
+                items[index] = serializer.validated_data
+                errors.append({})
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            raise serializers.ValidationError({name: errors})
 
     def create(self, validated_data):
-        photos_data = validated_data.pop('photos', [])
-        videos_data = validated_data.pop('videos', [])
-        keywords_data = validated_data.pop('product_keywords', [])
-        characteristics_data = validated_data.pop('characteristics', [])
-        variants_data = validated_data.pop('variants', [])
+        nested = {name: validated_data.pop(name, []) for name in self.nested_models}
 
-        # Asosiy mahsulotni yaratish
-        product = Product.objects.create(**validated_data)
+        with transaction.atomic():
+            # Asosiy mahsulotni yaratish
+            product = Product.objects.create(**validated_data)
 
-        # Related model ma'lumotlarini yaratish
-        for photo in photos_data:
-            PhotoProducts.objects.create(product=product, **photo)
+            # Related model ma'lumotlarini yaratish
+            for name, items in nested.items():
+                model = self.nested_models[name]
+                objects = [model(product=product, **self._without_id(item)) for item in items]
+                if objects:
+                    model.objects.bulk_create(objects)
+                    enqueue_renditions(objects)
 
-        for video in videos_data:
-            VideoProducts.objects.create(product=product, **video)
+        return product
 
-        for keyword in keywords_data:
-            KeywordsProduct.objects.create(product=product, **keyword)
+    def update(self, instance, validated_data):
+        # Faqat so'rovda kelgan ichki ro'yxatlar o'zgaradi, qolganlariga tegilmaydi
+        nested = {name: validated_data.pop(name) for name in self.nested_models if name in validated_data}
 
-        for characteristic in characteristics_data:
-            CharacteristicsProduct.objects.create(product=product, **characteristic)
+        with transaction.atomic():
+            # Asosiy maydonlarni yangilash
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-        for variant in variants_data:
-            ProductVariant.objects.create(product=product, **variant)
+            for name, items in nested.items():
+                self._sync_children(instance, name, items)
 
-        return product
+        return instance
 
-    def update(self, instance, validated_data):
-        photos_data = validated_data.pop('photos', [])
-        videos_data = validated_data.pop('videos', [])
-        keywords_data = validated_data.pop('product_keywords', [])
-        characteristics_data = validated_data.pop('characteristics', [])
-        variants_data = validated_data.pop('variants', [])
+    @staticmethod
+    def _without_id(item):
+        return {key: value for key, value in item.items() if key != 'id'}
+
+    def _sync_children(self, instance, name, items):
+        model = self.nested_models[name]
+        existing = {obj.pk: obj for obj in getattr(instance, name).all()}
+        file_fields = {field.name for field in model._meta.get_fields() if isinstance(field, models.FileField)}
+
+        to_create, to_update, to_save = [], [], []
+        changed_fields = set()
+        kept = set()
+        for item in items:
+            pk = item.get('id')
+            if pk is None:
+                to_create.append(model(product=instance, **self._without_id(item)))
+                continue
+            if pk not in existing or pk in kept:
+                raise serializers.ValidationError({name: [f'Invalid id {pk} for this product.']})
+            kept.add(pk)
+
+            obj = existing[pk]
+            dirty = [field for field, value in self._without_id(item).items()
+                     if field in file_fields or getattr(obj, field) != value]
+            if not dirty:
+                continue
+            for field in dirty:
+                setattr(obj, field, item[field])
+            if file_fields.intersection(dirty):
+                # Yangi fayl saqlanishi uchun oddiy save() kerak, bulk_update faylni yozmaydi
+                to_save.append((obj, dirty))
+            else:
+                to_update.append(obj)
+                changed_fields.update(dirty)
+
+        removed = existing.keys() - kept
+        if removed:
+            model.objects.filter(pk__in=removed).delete()
+        if to_create:
+            model.objects.bulk_create(to_create)
+            enqueue_renditions(to_create)
+        if to_update:
+            now = timezone.now()
+            for obj in to_update:
+                obj.updated_at = now
+            model.objects.bulk_update(to_update, [*changed_fields, 'updated_at'])
+        for obj, dirty in to_save:
+            obj.save(update_fields=[*dirty, 'updated_at'])
+
+
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    renditions = RenditionsField()
 
-        # Asosiy maydonlarni yangilash
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+    class Meta:
+        model = Category
+        fields = ['id', 'image', 'renditions', 'ru_name', 'uz_name']
 
-        # Eski ma'lumotlarni o'chirish
-        instance.photos.all().delete()
-        instance.videos.all().delete()
-        instance.product_keywords.all().delete()
-        instance.characteristics.all().delete()
-        instance.variants.all().delete()
 
-        # Yangi ma'lumotlarni qo'shish
-        for photo in photos_data:
-            PhotoProducts.objects.create(product=instance, **photo)
+class ShopSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    renditions = RenditionsField()
 
-        for video in videos_data:
-            VideoProducts.objects.create(product=instance, **video)
+    class Meta:
+        model = Shop
+        fields = ['id', 'owner', 'name', 'description', 'image', 'renditions']
 
-        for keyword in keywords_data:
-            KeywordsProduct.objects.create(product=instance, **keyword)
 
-        for characteristic in characteristics_data:
-            CharacteristicsProduct.objects.create(product=instance, **characteristic)
+class ProductSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=10000, default=0)
 
-        for variant in variants_data:
-            ProductVariant.objects.create(product=instance, **variant)
 
-        return instance
+class ProductImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=['csv', 'jsonl'], required=False)
+    chunk_size = serializers.IntegerField(min_value=1, max_value=5000, default=500)
 
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['id', 'order', 'product', 'product_quantity', 'price_per_unit']
@@ -125,39 +235,115 @@ class OrderItemSerializer(serializers.ModelSerializer):
         return data
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderItemLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    product_quantity = serializers.IntegerField(min_value=1)
+
+
+class OrderItemBulkCreateSerializer(serializers.Serializer):
+    order = serializers.IntegerField()
+    items = OrderItemLineSerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class PriceQuoteSerializer(serializers.Serializer):
+    items = OrderItemLineSerializer(many=True, allow_empty=False, max_length=1000)
+
+
+class PriceQuoteLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    product_quantity = serializers.IntegerField()
+    price_per_unit = serializers.DecimalField(max_digits=10, decimal_places=2)
+    total_price = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class OrderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     order_items = OrderItemSerializer(many=True, read_only=True)
 
     class Meta:
         model = Order
-        fields = ['id', 'customer', 'total_price', 'order_items']
+        fields = ['id', 'customer', 'total_price', 'created_at', 'order_items']
         read_only_fields = ['total_price']
 
     def create(self, validated_data):
         request = self.context['request']
-        user = request.user
-
-        order = Order.objects.create(customer=user)
+        order = Order.objects.create(customer_id=request.user.id)
 
         return order
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class OrderMonthlySummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    month = serializers.DateField(format='%Y-%m')
+
+    class Meta:
+        model = OrderMonthlySummary
+        fields = ['month', 'order_count', 'total_price']
+
+
+class SalesAnalyticsQuerySerializer(serializers.Serializer):
+    shop = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+    product = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=10)
+
+    def validate(self, data):
+        data['end'] = data.get('end') or timezone.localdate()
+        data['start'] = data.get('start') or data['end'] - timedelta(days=29)
+        if data['start'] > data['end']:
+            raise serializers.ValidationError({"start": ["Must not be after end."]})
+        if (data['end'] - data['start']).days > 366:
+            raise serializers.ValidationError({"start": ["The range must not exceed one year."]})
+        return data
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    shop = serializers.IntegerField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    # "format" DRF da renderer tanlash uchun band
+    file_format = serializers.ChoiceField(choices=EXPORT_FORMATS, default='csv')
+    gzip = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise serializers.ValidationError({"start": ["Must not be after end."]})
+        if data['gzip'] and data['file_format'] == 'xlsx':
+            raise serializers.ValidationError({"gzip": ["XLSX files are already compressed."]})
+        return data
+
+
+class UploadSessionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'kind', 'filename', 'size', 'sha256', 'product', 'product_variants', 'received', 'status',
+                  'error', 'video', 'photo']
+        read_only_fields = ['received', 'status', 'error', 'video', 'photo']
+
+    def validate_size(self, value):
+        limit = settings.UPLOAD_MAX_SIZE
+        if not 0 < value <= limit:
+            raise serializers.ValidationError(f"Size must be between 1 and {limit} bytes.")
+        return value
+
+    def validate(self, data):
+        variant = data.get('product_variants')
+        if variant is not None and variant.product_id != data['product'].id:
+            raise serializers.ValidationError({"product_variants": ["Variant does not belong to this product."]})
+        return data
+
+
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Review
         fields = ['id', 'user', 'product', 'rating', 'comment', 'created_at']
         read_only_fields = ['user']
 
     def validate(self, data):
-        user = self.context['request'].user
+        user_id = self.context['request'].user.id
         product = data['product']
 
-        if not OrderItem.objects.filter(order__customer=user, product=product).exists():
+        if not OrderItem.objects.filter(order__customer_id=user_id, product=product).exists():
             raise serializers.ValidationError("You can only review products you have purchased.")
 
         return data
-
-    def create(self, validated_data):
-        review = super().create(validated_data)
-        review.product.update_rating()
-        return review
\ No newline at end of file
@@ -0,0 +1,177 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from seller.analytics import sale_line, add_sales, remove_sales
+from accounts.models import User
+from seller.cache import schedule_product_invalidation, invalidate_products, category_cache, shop_cache
+from seller.images import enqueue_renditions, renditions_ready
+from seller.models import Category, Shop
+from seller.models.orders import Order, OrderItem, OrderMonthlySummary
+from seller.facets import schedule_facet_refresh, remove_product_facets
+from seller.models.products import Product, BulkPrice, KeywordsProduct, CharacteristicsProduct, ProductVariant, Review, \
+    PhotoProducts, VideoProducts
+from seller.models.stock import StockReservation
+from seller.search import schedule_reindex, remove_products
+from seller.stock import release
+
+
+@receiver([post_save, post_delete], sender=BulkPrice)
+def touch_bulk_price_product(sender, instance, **kwargs):
+    # Narx pog'onalari keshining versiyasi mahsulotning updated_at i
+    Product.objects.filter(pk=instance.product_id).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=OrderItem)
+def release_order_item_stock(sender, instance, **kwargs):
+    release(StockReservation.objects.filter(order_item=instance))
+
+
+def loaded_sale_line(item):
+    order = item.order if item._loaded_order_id == item.order_id else Order.objects.get(pk=item._loaded_order_id)
+    return sale_line(order, item._loaded_product_id, item._loaded_quantity, item._loaded_total)
+
+
+@receiver(post_save, sender=OrderItem)
+def add_order_item_sales(sender, instance, created, **kwargs):
+    if not created and instance._loaded_order_id is not None:
+        remove_sales([loaded_sale_line(instance)])
+    add_sales([sale_line(instance.order, instance.product_id, instance.product_quantity, instance.get_total_price())])
+
+
+@receiver(post_delete, sender=OrderItem)
+def remove_order_item_sales(sender, instance, **kwargs):
+    # post_delete: kaskadda bir xil xaridorning barcha qatorlari o'chib bo'lgach tekshiriladi
+    if instance._loaded_order_id is not None:
+        remove_sales([loaded_sale_line(instance)])
+    else:
+        remove_sales([sale_line(instance.order, instance.product_id, instance.product_quantity,
+                                instance.get_total_price())])
+
+
+@receiver(post_delete, sender=OrderItem)
+def subtract_order_item_total(sender, instance, origin=None, **kwargs):
+    # QuerySet.delete() va kaskadlar OrderItem.delete() ni chaqirmaydi, post_delete esa har birida keladi
+    order_id = instance._loaded_order_id or instance.order_id
+    if (isinstance(origin, Order) and origin.pk == order_id) or (isinstance(origin, QuerySet) and origin.model is Order):
+        # Buyurtmaning o'zi o'chirilmoqda: oylik yig'indidan remove_order_from_summary ayiradi
+        return
+    total = instance._loaded_total if instance._loaded_order_id else instance.get_total_price()
+    Order.apply_total_delta(order_id, -total)
+
+
+@receiver(post_save, sender=Order)
+def add_order_to_summary(sender, instance, created, **kwargs):
+    if created:
+        OrderMonthlySummary.add_order(instance)
+
+
+@receiver(pre_delete, sender=Order)
+def remove_order_from_summary(sender, instance, **kwargs):
+    OrderMonthlySummary.remove_order(instance.pk)
+
+
+@receiver(post_save, sender=Product)
+def reindex_product(sender, instance, **kwargs):
+    schedule_reindex(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    remove_products([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=KeywordsProduct)
+@receiver([post_save, post_delete], sender=CharacteristicsProduct)
+def reindex_product_text(sender, instance, **kwargs):
+    product_id = instance.product_id
+    variant_id = getattr(instance, 'product_variants_id', None)
+    if product_id is None and variant_id is not None:
+        product_id = ProductVariant.objects.filter(pk=variant_id).values_list('product_id', flat=True).first()
+    if product_id is not None:
+        schedule_reindex(product_id)
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_facets_on_save(sender, instance, **kwargs):
+    schedule_facet_refresh(instance.pk)
+
+
+@receiver(pre_delete, sender=Product)
+def remove_product_facets_on_delete(sender, instance, **kwargs):
+    remove_product_facets([instance.pk])
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_rating(sender, instance, **kwargs):
+    # QuerySet.delete() va kaskadlar Review.delete() ni chaqirmaydi, post_delete esa har birida keladi
+    product_id = instance._loaded_product_id or instance.product_id
+    rating = instance._loaded_rating if instance._loaded_rating is not None else instance.rating
+    Product.apply_rating_change(product_id, removed=rating)
+
+
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=Review)
+def refresh_parent_product_facets(sender, instance, **kwargs):
+    # Reyting F() bilan yangilanadi va signal bermaydi, shuning uchun sharh o'zgarishida facet qayta hisoblanadi
+    if instance.product_id is not None:
+        schedule_facet_refresh(instance.product_id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_cached_product(sender, instance, **kwargs):
+    schedule_product_invalidation(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=PhotoProducts)
+@receiver([post_save, post_delete], sender=VideoProducts)
+@receiver([post_save, post_delete], sender=KeywordsProduct)
+@receiver([post_save, post_delete], sender=CharacteristicsProduct)
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=BulkPrice)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_cached_parent_product(sender, instance, **kwargs):
+    product_id = instance.product_id
+    variant_id = getattr(instance, 'product_variants_id', None)
+    if product_id is None and variant_id is not None:
+        product_id = ProductVariant.objects.filter(pk=variant_id).values_list('product_id', flat=True).first()
+    if product_id is not None:
+        schedule_product_invalidation(product_id)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def invalidate_cached_category(sender, instance, **kwargs):
+    category_cache.invalidate(instance.pk)
+    category_cache.invalidate('all')
+
+
+@receiver([post_save, post_delete], sender=Shop)
+def invalidate_cached_shop(sender, instance, **kwargs):
+    shop_cache.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=PhotoProducts)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Shop)
+@receiver(post_save, sender=User)
+def enqueue_image_renditions(sender, instance, **kwargs):
+    enqueue_renditions([instance])
+
+
+@receiver(renditions_ready, sender=PhotoProducts)
+def invalidate_product_renditions(sender, pks, **kwargs):
+    rows = PhotoProducts.objects.filter(pk__in=pks).values_list('product_id', 'product_variants__product_id')
+    invalidate_products({product_id or variant_product_id for product_id, variant_product_id in rows} - {None})
+
+
+@receiver(renditions_ready, sender=Category)
+def invalidate_category_renditions(sender, pks, **kwargs):
+    for pk in [*pks, 'all']:
+        category_cache.invalidate(pk)
+
+
+@receiver(renditions_ready, sender=Shop)
+def invalidate_shop_renditions(sender, pks, **kwargs):
+    for pk in pks:
+        shop_cache.invalidate(pk)
@@ -0,0 +1,96 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from seller.cache import schedule_product_invalidation
+from seller.models.orders import OrderItem
+from seller.models.products import Product, ProductVariant
+from seller.models.stock import StockReservation
+
+ACTIVE_STATUSES = ('reserved', 'confirmed')
+
+
+class InsufficientStock(ValueError):
+    pass
+
+
+def _default_expiry():
+    ttl = getattr(settings, 'STOCK_RESERVATION_TTL', None)
+    return timezone.now() + timedelta(seconds=ttl) if ttl else None
+
+
+def _take(product_id, variant_id, quantity):
+    # Qoldiq yetarli bo'lsagina kamaytiradi: UPDATE ... WHERE amount >= qty
+    if variant_id is not None:
+        updated = ProductVariant.objects.filter(pk=variant_id, stock__gte=quantity).update(stock=F('stock') - quantity)
+        available = None if updated else ProductVariant.objects.filter(pk=variant_id).values_list('stock', flat=True).first()
+    else:
+        updated = Product.objects.filter(pk=product_id, amount__gte=quantity).update(amount=F('amount') - quantity)
+        available = None if updated else Product.objects.filter(pk=product_id).values_list('amount', flat=True).first()
+    if not updated:
+        raise InsufficientStock(f"Not enough stock available. Maximum available: {available or 0} units.")
+    # Qoldiq F() bilan o'zgaradi va signal bermaydi
+    schedule_product_invalidation(product_id)
+
+
+def _give_back(product_id, variant_id, quantity):
+    if variant_id is not None:
+        ProductVariant.objects.filter(pk=variant_id).update(stock=F('stock') + quantity)
+    else:
+        Product.objects.filter(pk=product_id).update(amount=F('amount') + quantity)
+    schedule_product_invalidation(product_id)
+
+
+def reserve(product_id, quantity, variant_id=None, order_item=None, expires_at=None):
+    return reserve_many([(product_id, variant_id, quantity, order_item)], expires_at=expires_at)[0]
+
+
+def reserve_many(lines, expires_at=None):
+    """(product_id, variant_id, quantity, order_item) qatorlari uchun zaxira qiladi.
+
+    Birorta qator uchun qoldiq yetmasa InsufficientStock ko'tariladi va
+    tranzaksiya to'liq bekor qilinadi.
+    """
+    expires_at = expires_at or _default_expiry()
+    with transaction.atomic():
+        for product_id, variant_id, quantity, _ in lines:
+            _take(product_id, variant_id, quantity)
+        return StockReservation.objects.bulk_create([
+            StockReservation(product_id=product_id, variant_id=variant_id, quantity=quantity, order_item=order_item,
+                             expires_at=expires_at)
+            for product_id, variant_id, quantity, order_item in lines
+        ])
+
+
+def release(reservations):
+    returned = defaultdict(int)
+    released = 0
+    with transaction.atomic():
+        for reservation in reservations.filter(status__in=ACTIVE_STATUSES):
+            # Ikki jarayon bir zaxirani ikki marta qaytarmasligi uchun holat shartli o'zgartiriladi
+            if StockReservation.objects.filter(pk=reservation.pk, status__in=ACTIVE_STATUSES).update(status='released'):
+                returned[(reservation.product_id, reservation.variant_id)] += reservation.quantity
+                released += 1
+        for (product_id, variant_id), quantity in returned.items():
+            _give_back(product_id, variant_id, quantity)
+    return released
+
+
+def confirm_order(order):
+    return StockReservation.objects.filter(order_item__order=order, status='reserved').update(
+        status='confirmed', expires_at=None,
+    )
+
+
+def release_expired(now=None):
+    expired = StockReservation.objects.filter(status='reserved', expires_at__lte=now or timezone.now())
+    item_ids = set(expired.exclude(order_item=None).values_list('order_item_id', flat=True))
+    released = release(expired)
+    # Muddati o'tgan zaxiraning buyurtma qatori ham o'chiriladi, aks holda u qoldiqsiz qolib ketadi
+    for order_item in OrderItem.objects.filter(pk__in=item_ids).select_related('order'):
+        order_item.delete()
+    return released
@@ -1,3 +1,1249 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from seller.cache import TieredCache, product_cache, category_cache, registry
+from seller.analytics import rebuild_sales
+from seller.exports import product_rows, order_rows
+from seller.fast_serializers import product_converter
+from seller.renderers import msgpack, encode_default
+from seller.serializers import ProductsSerializer, OrderSerializer
+from seller.views import product_catalog_queryset
+from seller.batching import on_commit_batched
+from seller.articul import ArticulAllocator, ArticulSpaceExhausted, FeistelPermutation, ARTICUL_MIN
+from seller.facets import rebuild_facets
+from seller.images import process_tasks
+from seller.importers import ProductImporter, read_rows
+from seller.models import Category, Shop
+from seller.models.orders import Order, OrderItem, OrderMonthlySummary
+from seller.models.articul import ArticulSequence
+from seller.models.analytics import DailySales, DailySalesCustomer
+from seller.models.images import ImageTask
+from seller.models.uploads import UploadSession
+from seller.models.stock import StockReservation
+from seller.pricing import price_tier_index
+from seller.search import normalize
+from seller.stock import reserve, release_expired, confirm_order, InsufficientStock
+from seller.models.products import Product, ProductVariant, BulkPrice, KeywordsProduct, PhotoProducts, Review, \
+    VideoProducts, CharacteristicsProduct
+
+
+def make_catalog_fixtures():
+    owner = User.objects.create_user(username='vendor', password='secret-pass-123', user_type='vendor')
+    shop = Shop.objects.create(owner=owner, name='Shop', description='Shop', image='images/shop/shop.png')
+    category = Category.objects.create(image='images/category/cat.png', ru_name='Категория', uz_name='Kategoriya')
+    return owner, shop, category
+
+
+def make_product(shop, category, **kwargs):
+    fields = {
+        'name_ru': 'Товар', 'name_uz': 'Mahsulot', 'description_ru': 'Описание', 'description_uz': 'Tavsif',
+        'price': 1000, 'amount': 100,
+    }
+    fields.update(kwargs)
+    return Product.objects.create(shop=shop, category=category, **fields)
+
+
+def make_full_product(shop, category, **kwargs):
+    product = make_product(shop, category, **kwargs)
+    PhotoProducts.objects.create(product=product, image='products/images/a.png')
+    VideoProducts.objects.create(product=product, video='products/videos/a.mp4')
+    KeywordsProduct.objects.create(product=product, keyword='kw')
+    CharacteristicsProduct.objects.create(product=product, title_uz='Rang', title_ru='Цвет', info_uz='Qizil', info_ru='Красный')
+    ProductVariant.objects.create(product=product, color='red', size='M', stock=5, price=900)
+    BulkPrice.objects.create(product=product, min_quantity=10, price_per_unit=800)
+    return product
+
+
+class ProductCatalogAPITests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('product-list'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_list_query_count_is_constant(self):
+        make_full_product(self.shop, self.category)
+        baseline, data = self.count_list_queries()
+        self.assertEqual(len(data['results']), 1)
+
+        for _ in range(9):
+            make_full_product(self.shop, self.category)
+        queries, data = self.count_list_queries()
+        self.assertEqual(len(data['results']), 10)
+        self.assertEqual(queries, baseline)
+
+    def test_list_is_cursor_paginated_newest_first(self):
+        products = [make_product(self.shop, self.category) for _ in range(3)]
+        response = self.client.get(reverse('product-list'), {'page_size': 2})
+        data = response.json()
+        self.assertEqual([p['id'] for p in data['results']], [products[2].id, products[1].id])
+        self.assertIsNotNone(data['next'])
+
+        data = self.client.get(data['next']).json()
+        self.assertEqual([p['id'] for p in data['results']], [products[0].id])
+        self.assertIsNone(data['next'])
+
+    def test_detail_includes_nested_relations(self):
+        product = make_full_product(self.shop, self.category)
+        response = self.client.get(reverse('product-detail', args=[product.id]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['variants']), 1)
+        self.assertEqual(data['bulk_prices'][0]['min_quantity'], 10)
+
+
+class ProductImportTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+
+    def test_jsonl_import_reports_row_errors_and_keeps_going(self):
+        good = {
+            'shop': self.shop.id, 'category': self.category.id, 'name_ru': 'Товар', 'name_uz': 'Mahsulot',
+            'description_ru': 'Описание', 'description_uz': 'Tavsif', 'price': 1000, 'amount': 10,
+            'product_keywords': [{'keyword': 'choy'}],
+            'variants': [{'color': 'red', 'size': 'M', 'stock': 3, 'price': '900.00'}],
+            'bulk_prices': [{'min_quantity': 10, 'price_per_unit': '850.00'}],
+        }
+        lines = [json.dumps(good), '{not json', json.dumps({**good, 'shop': 999999}), json.dumps({**good, 'price': 'x'})]
+        upload = SimpleUploadedFile('catalog.jsonl', '\n'.join(lines).encode())
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.post(reverse('product-import'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(report['failed'], 3)
+        self.assertCountEqual([error['row'] for error in report['errors']], [2, 3, 4])
+
+        product = Product.objects.get()
+        self.assertRegex(product.articul, r'^\d{8}$')
+        self.assertEqual(product.variants.count(), 1)
+        self.assertEqual(product.bulk_prices.get().min_quantity, 10)
+
+    def test_csv_nested_columns_are_json(self):
+        content = (
+            'shop,category,name_ru,name_uz,description_ru,description_uz,price,amount,product_keywords\n'
+            f'{self.shop.id},{self.category.id},A,A,A,A,100,5,"[{{""keyword"": ""a""}}]"\n'
+            f'{self.shop.id},{self.category.id},B,B,B,B,200,5,\n'
+        )
+        report = ProductImporter(chunk_size=1).run(read_rows(io.StringIO(content), 'csv'))
+        self.assertEqual(report, {'created': 2, 'failed': 0, 'errors': []})
+        self.assertEqual(KeywordsProduct.objects.get().keyword, 'a')
+
+
+class ArticulAllocatorTests(TestCase):
+    def test_permutation_is_a_bijection(self):
+        permutation = FeistelPermutation(1000, 'key')
+        self.assertEqual(sorted(permutation.permute(n) for n in range(1000)), list(range(1000)))
+
+    def test_allocations_never_repeat_and_skip_existing_articuls(self):
+        allocator = ArticulAllocator(sequence='test')
+        first = allocator.allocate(5)
+        owner, shop, category = make_catalog_fixtures()
+        make_product(shop, category, articul=str(ARTICUL_MIN + allocator.permutation.permute(5)))
+
+        second = allocator.allocate(5)
+        articuls = first + second
+        self.assertEqual(len(set(articuls)), 10)
+        self.assertFalse(Product.objects.filter(articul__in=articuls).exists())
+        self.assertTrue(all(len(articul) == 8 for articul in articuls))
+
+    def test_colliding_blocks_are_skipped_until_the_space_ends(self):
+        allocator = ArticulAllocator(sequence='small', block_size=2, domain=6)
+        owner, shop, category = make_catalog_fixtures()
+        for n in range(2):
+            make_product(shop, category, articul=str(ARTICUL_MIN + allocator.permutation.permute(n)))
+
+        articuls = allocator.allocate(4)
+        self.assertEqual(len(set(articuls)), 4)
+        self.assertFalse(Product.objects.filter(articul__in=articuls).exists())
+        with self.assertRaises(ArticulSpaceExhausted):
+            allocator.allocate(1)
+
+    def sequence_value(self, name):
+        return ArticulSequence.objects.filter(name=name).values_list('next_value', flat=True).first()
+
+    def test_blocks_reserved_in_a_transaction_are_kept_only_after_commit(self):
+        allocator = ArticulAllocator(sequence='test', block_size=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            first = allocator.allocate(2)
+        self.assertEqual(self.sequence_value('test'), 10)
+        second = allocator.allocate(8)
+        self.assertEqual(self.sequence_value('test'), 10)
+        self.assertEqual(len(set(first + second)), 10)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            allocator.allocate(1)
+            raise RuntimeError
+        # Bekor qilingan blok xotirada qolmaydi
+        self.assertEqual(self.sequence_value('test'), 10)
+        self.assertFalse(allocator._pending)
+
+
+class ArticulIndependentBumpTests(TransactionTestCase):
+    def test_bump_commits_on_its_own_connection(self):
+        allocator = ArticulAllocator(sequence='independent')
+        self.assertEqual([allocator._bump_independent(10), allocator._bump_independent(10)], [0, 10])
+        self.assertEqual(ArticulSequence.objects.get(name='independent').next_value, 20)
+
+
+class ProductRatingTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_product(self.shop, self.category)
+        self.buyers = [User.objects.create_user(username=f'buyer{i}', password='pass', user_type='user') for i in range(3)]
+
+    def test_review_writes_update_aggregates_incrementally(self):
+        reviews = [Review.objects.create(user=user, product=self.product, rating=rating)
+                   for user, rating in zip(self.buyers, (5, 4, 3))]
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_sum, self.product.rating), (3, 12, 4.0))
+
+        review = Review.objects.get(pk=reviews[2].pk)
+        review.rating = 1
+        review.save()
+        reviews[0].delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_sum, self.product.rating), (2, 5, 2.5))
+        self.assertEqual(self.product.rating_histogram, {'1': 1, '2': 0, '3': 0, '4': 1, '5': 0})
+
+        reviews[1].delete()
+        Review.objects.get(pk=reviews[2].pk).delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating), (0, 0.0))
+
+    def test_cascades_and_queryset_deletes_update_aggregates(self):
+        for user, rating in zip(self.buyers, (5, 4, 1)):
+            Review.objects.create(user=user, product=self.product, rating=rating)
+
+        self.buyers[0].delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_sum, self.product.rating), (2, 5, 2.5))
+        self.assertEqual(self.product.rating_histogram, {'1': 1, '2': 0, '3': 0, '4': 1, '5': 0})
+
+        Review.objects.filter(rating=1).delete()
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating), (1, 4.0))
+
+    def test_recompute_repairs_drift(self):
+        Review.objects.create(user=self.buyers[0], product=self.product, rating=2)
+        Product.objects.filter(pk=self.product.pk).update(rating_count=7, rating_sum=30, rating=9.0, rating_5_count=3)
+        other = make_product(self.shop, self.category)
+        Product.objects.filter(pk=other.pk).update(rating_count=1, rating_sum=4, rating=4.0)
+
+        Product.recompute_ratings()
+        self.product.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((self.product.rating_count, self.product.rating_sum, self.product.rating), (1, 2, 2.0))
+        self.assertEqual(self.product.rating_histogram['2'], 1)
+        self.assertEqual(self.product.rating_histogram['5'], 0)
+        self.assertEqual((other.rating_count, other.rating), (0, 0.0))
+
+
+class OrderTotalTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        self.order = Order.objects.create(customer=self.customer)
+        self.product = make_product(self.shop, self.category, price=100, amount=50)
+        BulkPrice.objects.create(product=self.product, min_quantity=10, price_per_unit=80)
+
+    def test_item_writes_adjust_total_by_delta(self):
+        item = OrderItem.objects.create(order=self.order, product=self.product, product_quantity=2)
+        OrderItem.objects.create(order=self.order, product=self.product, product_quantity=10)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal('1000'))
+
+        item = OrderItem.objects.get(pk=item.pk)
+        item.product_quantity = 3
+        item.save()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal('1100'))
+
+        item.delete()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal('800'))
+
+        Order.objects.filter(pk=self.order.pk).update(total_price=0)
+        self.order.update_total_price()
+        self.assertEqual(self.order.total_price, Decimal('800'))
+
+    def test_queryset_and_cascade_deletes_adjust_totals(self):
+        other = make_product(self.shop, self.category, price=30, amount=50)
+        for product, quantity in ((self.product, 2), (self.product, 10), (other, 3)):
+            OrderItem.objects.create(order=self.order, product=product, product_quantity=quantity)
+        summary = OrderMonthlySummary.objects.get(customer=self.customer)
+
+        OrderItem.objects.filter(product=self.product, product_quantity=2).delete()
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.total_price, Decimal('890'))
+        # Product kaskadi
+        other.delete()
+        self.order.refresh_from_db()
+        summary.refresh_from_db()
+        self.assertEqual((self.order.total_price, summary.total_price), (Decimal('800'), Decimal('800')))
+
+        Order.objects.filter(pk=self.order.pk).delete()
+        summary.refresh_from_db()
+        self.assertEqual((summary.order_count, summary.total_price), (0, Decimal('0')))
+
+    def test_bulk_add_items(self):
+        other = make_product(self.shop, self.category, price=30, amount=5)
+        client = APIClient()
+        client.force_authenticate(self.customer)
+        payload = {'order': self.order.id, 'items': [
+            {'product': self.product.id, 'product_quantity': 10},
+            {'product': other.id, 'product_quantity': 2},
+            {'product': self.product.id, 'product_quantity': 1},
+        ]}
+        response = client.post(reverse('order-item-bulk-create'), payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Decimal(response.json()['total_price']), Decimal('960'))
+        self.assertEqual(len(response.json()['order_items']), 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.amount, 39)
+
+        payload['items'] = [{'product': other.id, 'product_quantity': 4}]
+        response = client.post(reverse('order-item-bulk-create'), payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(OrderItem.objects.count(), 3)
+
+
+class PriceTierIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_product(self.shop, self.category, price=100)
+        BulkPrice.objects.create(product=self.product, min_quantity=10, price_per_unit=90)
+        BulkPrice.objects.create(product=self.product, min_quantity=50, price_per_unit=70)
+
+    def test_lookup_uses_cached_tiers(self):
+        self.assertEqual(self.product.get_price_for_quantity(5), 100)
+        # Keshdagi jadval ishlatiladi, faqat versiya (updated_at) o'qiladi
+        with self.assertNumQueries(3):
+            self.assertEqual(self.product.get_price_for_quantity(10), Decimal('90'))
+            self.assertEqual(self.product.get_price_for_quantity(49), Decimal('90'))
+            self.assertEqual(self.product.get_price_for_quantity(500), Decimal('70'))
+
+    def test_stale_entries_from_other_workers_are_ignored(self):
+        self.assertEqual(price_tier_index.price(self.product.id, 10), Decimal('90'))
+        # Boshqa workerdagi o'zgarish: bu jarayondagi kesh o'chirilmaydi, faqat updated_at yangilanadi
+        BulkPrice.objects.filter(product=self.product, min_quantity=10).update(price_per_unit=85)
+        Product.objects.filter(pk=self.product.pk).update(updated_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(price_tier_index.price(self.product.id, 10), Decimal('85'))
+
+        Product.objects.filter(pk=self.product.pk).update(price=120)
+        self.assertEqual(price_tier_index.price(self.product.id, 1), 120)
+
+    def test_bulk_price_changes_invalidate_tiers(self):
+        self.assertEqual(self.product.get_price_for_quantity(20), Decimal('90'))
+        BulkPrice.objects.create(product=self.product, min_quantity=20, price_per_unit=80)
+        self.assertEqual(self.product.get_price_for_quantity(20), Decimal('80'))
+        self.product.bulk_prices.get(min_quantity=20).delete()
+        self.assertEqual(self.product.get_price_for_quantity(20), Decimal('90'))
+
+    def test_price_many_and_quote_endpoint(self):
+        other = make_product(self.shop, self.category, price=30)
+        with self.assertNumQueries(2):
+            prices = price_tier_index.price_many([(self.product.id, 1), (other.id, 100), (self.product.id, 60)])
+        self.assertEqual(prices, [100, 30, Decimal('70')])
+
+        response = self.client.post(reverse('price-quote'), {'items': [
+            {'product': self.product.id, 'product_quantity': 10},
+            {'product': other.id, 'product_quantity': 2},
+        ]}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Decimal(response.json()['total_price']), Decimal('960'))
+
+
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        self.order = Order.objects.create(customer=self.customer)
+        self.product = make_product(self.shop, self.category, amount=5)
+
+    def test_reserve_never_oversells(self):
+        reserve(self.product.pk, 3)
+        with self.assertRaises(InsufficientStock):
+            reserve(self.product.pk, 3)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.amount, 2)
+
+    def test_variant_stock(self):
+        variant = ProductVariant.objects.create(product=self.product, stock=2, price=10)
+        reserve(self.product.pk, 2, variant_id=variant.pk)
+        with self.assertRaises(InsufficientStock):
+            reserve(self.product.pk, 1, variant_id=variant.pk)
+        variant.refresh_from_db()
+        self.assertEqual(variant.stock, 0)
+
+    def test_order_deletion_releases_stock(self):
+        item = OrderItem.objects.create(order=self.order, product=self.product, product_quantity=4)
+        reserve(self.product.pk, 4, order_item=item)
+        self.order.delete()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.amount, 5)
+        self.assertEqual(StockReservation.objects.get().status, 'released')
+
+    def test_expired_reservations_are_released_unless_confirmed(self):
+        past = timezone.now() - timedelta(minutes=1)
+        first = OrderItem.objects.create(order=self.order, product=self.product, product_quantity=2)
+        reserve(self.product.pk, 2, order_item=first, expires_at=past)
+        confirm_order(self.order)
+        second = OrderItem.objects.create(order=self.order, product=self.product, product_quantity=1)
+        reserve(self.product.pk, 1, order_item=second, expires_at=past)
+
+        self.assertEqual(release_expired(), 1)
+        self.product.refresh_from_db()
+        self.order.refresh_from_db()
+        self.assertEqual(self.product.amount, 3)
+        self.assertEqual(list(self.order.order_items.values_list('pk', flat=True)), [first.pk])
+        self.assertEqual(self.order.total_price, first.get_total_price())
+
+
+class ProductNestedUpdateTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_full_product(self.shop, self.category)
+        self.keep, self.drop = [KeywordsProduct.objects.create(product=self.product, keyword=k) for k in ('a', 'b')]
+        self.url = f'/seller/product/update/{self.product.pk}/'
+
+    def test_patch_without_nested_keys_leaves_children_alone(self):
+        children = {
+            'photos': list(self.product.photos.values_list('pk', 'updated_at')),
+            'variants': list(self.product.variants.values_list('pk', 'updated_at')),
+            'keywords': list(self.product.product_keywords.values_list('pk', 'updated_at')),
+        }
+        response = self.client.patch(self.url, {'price': 555}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['price'], 555)
+        self.assertEqual(children, {
+            'photos': list(self.product.photos.values_list('pk', 'updated_at')),
+            'variants': list(self.product.variants.values_list('pk', 'updated_at')),
+            'keywords': list(self.product.product_keywords.values_list('pk', 'updated_at')),
+        })
+
+    def test_patch_applies_only_the_delta(self):
+        variant = self.product.variants.get()
+        variant_photo = PhotoProducts.objects.create(product_variants=variant, image='products/images/v.png')
+        first_keyword = self.product.product_keywords.get(keyword='kw')
+        payload = {
+            'product_keywords': [
+                {'id': first_keyword.pk, 'keyword': 'kw'},
+                {'id': self.keep.pk, 'keyword': 'a2'},
+                {'keyword': 'c'},
+            ],
+            'variants': [{'id': variant.pk, 'color': 'blue', 'size': 'M', 'stock': 5, 'price': '900.00',
+                          'discount': '0.00'}],
+        }
+        response = self.client.patch(self.url, payload, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        keywords = dict(self.product.product_keywords.values_list('keyword', 'pk'))
+        self.assertEqual(set(keywords), {'kw', 'a2', 'c'})
+        self.assertEqual(keywords['kw'], first_keyword.pk)
+        self.assertEqual(keywords['a2'], self.keep.pk)
+        self.assertFalse(KeywordsProduct.objects.filter(pk=self.drop.pk).exists())
+
+        variant.refresh_from_db()
+        self.assertEqual(variant.color, 'blue')
+        self.assertTrue(PhotoProducts.objects.filter(pk=variant_photo.pk).exists())
+
+    def test_unknown_child_id_is_rejected(self):
+        other = make_full_product(self.shop, self.category)
+        foreign = other.product_keywords.get()
+        response = self.client.patch(self.url, {'product_keywords': [{'id': foreign.pk, 'keyword': 'x'}]},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        foreign.refresh_from_db()
+        self.assertEqual(foreign.keyword, 'kw')
+
+    def test_new_children_in_patch_are_validated_in_full(self):
+        variant = self.product.variants.get()
+        response = self.client.patch(self.url, {'variants': [{'id': variant.pk, 'color': 'red'}, {'color': 'blue'}]},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('price', response.json()['variants'][1])
+        self.assertEqual(list(self.product.variants.values_list('pk', 'color')), [(variant.pk, variant.color)])
+
+        response = self.client.patch(self.url, {'variants': [{'id': variant.pk, 'color': 'red'},
+                                                             {'color': 'blue', 'price': '10.00'}]},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(set(self.product.variants.values_list('color', flat=True)), {'red', 'blue'})
+
+
+class OnCommitBatchingTests(TestCase):
+    def test_items_are_flushed_once_per_transaction(self):
+        flushes = []
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, transaction.atomic():
+            for n in range(5):
+                on_commit_batched(flushes.append, n)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(flushes, [{0, 1, 2, 3, 4}])
+
+        # Bekor qilingan savepoint dan keyin yangi to'plam ochiladi
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            with transaction.atomic():
+                on_commit_batched(flushes.append, 5)
+                transaction.set_rollback(True)
+            on_commit_batched(flushes.append, 6)
+        self.assertEqual(flushes[1:], [{6}])
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+
+    def make_indexed_product(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                return make_product(self.shop, self.category, **kwargs)
+
+    def search(self, query):
+        response = self.client.get(reverse('product-search'), {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [product['id'] for product in response.json()['results']]
+
+    def test_normalize_transliterates_cyrillic(self):
+        self.assertEqual(normalize('Чой қора'), 'choy qora')
+        self.assertEqual(normalize("Ko'ylak, O‘zbek"), 'koylak ozbek')
+
+    def test_search_across_scripts_and_ranks_names_first(self):
+        tea = self.make_indexed_product(name_ru='Чай чёрный', name_uz='Qora choy')
+        cup = self.make_indexed_product(name_ru='Кружка', name_uz='Krujka', description_uz='choy uchun')
+        self.make_indexed_product(name_ru='Сахар', name_uz='Shakar')
+
+        self.assertEqual(self.search('чой'), [tea.id, cup.id])
+        self.assertEqual(self.search('qora cho'), [tea.id])
+        self.assertEqual(self.search('КРУЖ'), [cup.id])
+
+    def test_children_and_deletes_update_the_index(self):
+        product = self.make_indexed_product(name_ru='Товар', name_uz='Mahsulot')
+        with self.captureOnCommitCallbacks(execute=True):
+            KeywordsProduct.objects.create(product=product, keyword='termos')
+        self.assertEqual(self.search('termos'), [product.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.search('termos'), [])
+
+
+class ProductFacetTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.other_category = Category.objects.create(image='images/category/b.png', ru_name='Б', uz_name='B')
+
+    def make_faceted_product(self, category, price, colors):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                product = make_product(self.shop, category, price=price)
+                for color in colors:
+                    ProductVariant.objects.create(product=product, color=color, size='M', price=price)
+        return product
+
+    def facets(self, **params):
+        response = self.client.get(reverse('product-facets'), params)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['count'], {facet: {item['value']: item['count'] for item in items}
+                               for facet, items in data['facets'].items()}
+
+    def test_counts_are_maintained_incrementally_and_match_rebuild(self):
+        red = self.make_faceted_product(self.category, 5000, ['Red', 'blue'])
+        self.make_faceted_product(self.category, 20000, ['red'])
+        self.make_faceted_product(self.other_category, 20000, ['green'])
+
+        count, facets = self.facets()
+        self.assertEqual(count, 3)
+        self.assertEqual(facets['color'], {'red': 2, 'blue': 1, 'green': 1})
+        self.assertEqual(facets['price'], {'0-10000': 1, '10000-50000': 2})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            red.variants.filter(color='blue').delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            red.delete()
+        incremental = self.facets()
+        rebuild_facets()
+        self.assertEqual(incremental, self.facets())
+        self.assertEqual(incremental[1]['color'], {'red': 1, 'green': 1})
+
+    def test_filtered_counts_are_disjunctive_within_a_facet(self):
+        self.make_faceted_product(self.category, 5000, ['red'])
+        self.make_faceted_product(self.category, 20000, ['blue'])
+        self.make_faceted_product(self.other_category, 20000, ['red'])
+
+        count, facets = self.facets(color='red', category=str(self.category.id))
+        self.assertEqual(count, 1)
+        self.assertEqual(facets['color'], {'red': 1, 'blue': 1})
+        self.assertEqual(facets['category'], {str(self.category.id): 1, str(self.other_category.id): 1})
+
+        response = self.client.get(reverse('product-list'), {'color': ['red', 'blue'], 'price': '10000-50000'})
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        product_cache.clear_local()
+        category_cache.clear_local()
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+
+    def test_product_detail_is_cached_and_invalidated_by_child_changes(self):
+        product = make_full_product(self.shop, self.category)
+        url = reverse('product-detail', args=[product.pk])
+        first = self.client.get(url).json()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), first)
+        product_cache.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).json(), first)
+
+        PhotoProducts.objects.create(product=product, image='products/images/b.png')
+        self.assertEqual(len(self.client.get(url).json()['photos']), 2)
+
+        Review.objects.create(user=self.owner, product=product, rating=4, comment='ok')
+        self.assertEqual(self.client.get(url).json()['rating_count'], 1)
+
+    def test_hosts_share_one_entry_with_their_own_urls(self):
+        product = make_full_product(self.shop, self.category)
+        url = reverse('product-detail', args=[product.pk])
+        misses = product_cache.stats()['misses']
+        first = self.client.get(url, HTTP_HOST='localhost').json()
+        with self.assertNumQueries(0):
+            second = self.client.get(url, HTTP_HOST='127.0.0.1').json()
+        self.assertTrue(first['photos'][0]['image'].startswith('http://localhost/media/'))
+        self.assertEqual(second['photos'][0]['image'], first['photos'][0]['image'].replace('localhost', '127.0.0.1'))
+        self.assertEqual(product_cache.stats()['misses'], misses + 1)
+
+    def test_local_hits_check_the_shared_version(self):
+        product = make_product(self.shop, self.category, price=100)
+        url = reverse('product-detail', args=[product.pk])
+        self.assertEqual(self.client.get(url).json()['price'], 100)
+        Product.objects.filter(pk=product.pk).update(price=200)
+        # Boshqa jarayondagi invalidate: faqat umumiy keshdagi versiya oshadi, bu jarayonning lokal nusxasi qoladi
+        version_key = product_cache._version_key(product.pk)
+        cache.set(version_key, cache.get(version_key) + 1, None)
+        self.assertEqual(self.client.get(url).json()['price'], 200)
+
+    def test_category_list_sees_new_categories(self):
+        self.assertEqual(len(self.client.get(reverse('category-list')).json()), 1)
+        Category.objects.create(image='images/category/b.png', ru_name='Б', uz_name='B')
+        self.assertEqual(len(self.client.get(reverse('category-list')).json()), 2)
+
+    def test_local_tier_evicts_least_recently_used(self):
+        tiered = TieredCache('test-lru', local_size=2, local_ttl=60)
+        self.addCleanup(registry.pop, 'test-lru')
+        for pk in (1, 2, 1, 3):
+            tiered.get_or_set(pk, lambda: {'pk': pk})
+        stats = tiered.stats()
+        self.assertEqual((stats['local_hits'], stats['misses'], stats['local_evictions']), (1, 3, 1))
+        tiered.get_or_set(2, lambda: self.fail('shared tier should still hold the evicted entry'))
+        self.assertEqual(tiered.stats()['shared_hits'], 1)
+
+
+class OrderHistoryTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        self.product = make_product(self.shop, self.category, price=100, amount=1000)
+        self.client = APIClient()
+        self.client.force_authenticate(self.customer)
+
+    def make_order(self, quantity=1, **kwargs):
+        order = Order.objects.create(customer=self.customer, **kwargs)
+        OrderItem.objects.create(order=order, product=self.product, product_quantity=quantity)
+        return order
+
+    def test_history_is_keyset_paginated_with_constant_queries(self):
+        orders = [self.make_order() for _ in range(5)]
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(reverse('order-list-create'), {'page_size': 3})
+        for _ in range(20):
+            self.make_order()
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(reverse('order-list-create'), {'page_size': 3})
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+        data = response.json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(len(data['results'][0]['order_items']), 1)
+        next_page = self.client.get(data['next']).json()['results']
+        ids = [order['id'] for order in data['results'] + next_page]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertNotIn(orders[0].id, ids)
+
+    def test_summary_rollup_matches_rebuild(self):
+        march = timezone.make_aware(timezone.datetime(2026, 3, 10))
+        self.make_order(quantity=2, created_at=march)
+        self.make_order(quantity=3, created_at=march)
+        removed = self.make_order(quantity=5)
+        self.make_order(quantity=1)
+        removed.delete()
+
+        maintained = self.client.get(reverse('order-summary')).json()
+        OrderMonthlySummary.rebuild()
+        self.assertEqual(maintained, self.client.get(reverse('order-summary')).json())
+        self.assertEqual(maintained['order_count'], 3)
+        self.assertEqual(maintained['total_price'], '600.00')
+        self.assertEqual(maintained['months'][-1], {'month': '2026-03', 'order_count': 2, 'total_price': '500.00'})
+
+
+class SalesAnalyticsTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_product(self.shop, self.category, price=100, amount=1000)
+        self.other = make_product(self.shop, self.category, price=50, amount=1000)
+        self.buyers = [User.objects.create_user(username=f'buyer{i}', password='pass', user_type='user') for i in range(2)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def buy(self, customer, product, quantity):
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            order = Order.objects.create(customer=customer)
+            return OrderItem.objects.create(order=order, product=product, product_quantity=quantity)
+
+    def snapshot(self):
+        return (sorted(DailySales.objects.values_list('date', 'product_id', 'units', 'revenue')),
+                sorted(DailySalesCustomer.objects.values_list('date', 'product_id', 'customer_id')))
+
+    def test_incremental_rollups_match_rebuild(self):
+        self.buy(self.buyers[0], self.product, 2)
+        self.buy(self.buyers[0], self.product, 1)
+        self.buy(self.buyers[1], self.other, 4)
+        removed = self.buy(self.buyers[1], self.product, 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            removed.order.delete()
+
+        incremental = self.snapshot()
+        rebuild_sales()
+        self.assertEqual(incremental, self.snapshot())
+
+        response = self.client.get(reverse('sales-analytics'), {'shop': self.shop.id})
+        data = response.json()
+        self.assertEqual((data['units'], Decimal(data['revenue']), data['customers']), (7, Decimal('500'), 2))
+        self.assertEqual(data['series'][0]['customers'], 2)
+
+        top = self.client.get(reverse('top-products'), {'shop': self.shop.id, 'limit': 1}).json()
+        self.assertEqual([row['product'] for row in top], [self.product.id])
+
+    def test_rollups_are_updated_in_the_same_transaction(self):
+        first = self.buy(self.buyers[0], self.product, 2)
+        second = self.buy(self.buyers[0], self.product, 3)
+        with transaction.atomic():
+            OrderItem.objects.create(order=first.order, product=self.other, product_quantity=1)
+            self.assertEqual(DailySales.objects.get(product=self.other).units, 1)
+            transaction.set_rollback(True)
+        self.assertFalse(DailySales.objects.filter(product=self.other).exists())
+
+        second.product_quantity = 1
+        second.save()
+        first.product = self.other
+        first.save()
+        incremental = self.snapshot()
+        rebuild_sales()
+        self.assertEqual(incremental, self.snapshot())
+
+        # Kaskad: buyurtmaning ikkala qatori o'chgandan keyin xaridor yozuvi ham o'chadi
+        OrderItem.objects.create(order=second.order, product=self.product, product_quantity=4)
+        second.order.delete()
+        self.assertEqual(self.snapshot(), (
+            [(timezone.localdate(), self.other.id, 2, Decimal('100'))],
+            [(timezone.localdate(), self.other.id, self.buyers[0].id)],
+        ))
+
+    def test_vendor_only_sees_own_shop(self):
+        stranger = User.objects.create_user(username='other-vendor', password='pass', user_type='vendor')
+        client = APIClient()
+        client.force_authenticate(stranger)
+        self.assertEqual(client.get(reverse('sales-analytics'), {'shop': self.shop.id}).status_code, 404)
+        self.assertEqual(client.get(reverse('sales-analytics')).status_code, 400)
+
+        client.force_authenticate(self.buyers[0])
+        self.assertEqual(client.get(reverse('sales-analytics'), {'shop': self.shop.id}).status_code, 403)
+
+
+def make_png(width, height, name='photo.png'):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class ImageRenditionTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        category_cache.clear_local()
+
+    def test_renditions_are_rendered_off_request_and_served(self):
+        category = Category.objects.create(image=make_png(800, 400), ru_name='К', uz_name='K')
+        self.assertEqual(ImageTask.objects.filter(status='pending').count(), 1)
+        self.assertEqual(self.client.get(reverse('category-list')).json()[0]['renditions'], {})
+
+        self.assertEqual(process_tasks(workers=0), {'done': 1, 'failed': 0})
+        category.refresh_from_db()
+        self.assertEqual(sorted(category.renditions['widths']), ['320', '640'])
+        from PIL import Image
+        with Image.open(os.path.join(settings.MEDIA_ROOT, category.renditions['widths']['320'])) as image:
+            self.assertEqual((image.format, image.size), ('WEBP', (320, 160)))
+
+        renditions = self.client.get(reverse('category-list')).json()[0]['renditions']
+        self.assertTrue(renditions['640'].startswith('http://testserver/'))
+
+        category.save()
+        self.assertEqual(ImageTask.objects.filter(status='pending').count(), 0)
+
+    def test_replaced_image_discards_stale_renditions(self):
+        category = Category.objects.create(image=make_png(500, 500), ru_name='К', uz_name='K')
+        Category.objects.filter(pk=category.pk).update(image='images/category/other.png')
+        process_tasks(workers=0)
+        category.refresh_from_db()
+        self.assertEqual(category.renditions, {})
+        self.assertFalse(os.path.exists(os.path.join(settings.MEDIA_ROOT, 'images', 'category', 'renditions',
+                                                     'photo_320.webp')))
+
+
+@override_settings(UPLOAD_MAX_CHUNK_SIZE=1024)
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root, UPLOAD_SESSION_DIR=os.path.join(media_root, 'partial'))
+        override.enable()
+        self.addCleanup(override.disable)
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_product(self.shop, self.category)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.payload = bytes(range(256)) * 10
+
+    def start(self, **kwargs):
+        import hashlib
+        data = {'kind': 'video', 'filename': 'clip.mp4', 'size': len(self.payload), 'product': self.product.id,
+                'sha256': hashlib.sha256(self.payload).hexdigest(), **kwargs}
+        response = self.client.post(reverse('upload-create'), data, format='json')
+        self.assertEqual(response.status_code, 201)
+        return reverse('upload-detail', args=[response.json()['id']])
+
+    def send(self, url, start, end):
+        return self.client.put(url, self.payload[start:end + 1], content_type='application/octet-stream',
+                               HTTP_CONTENT_RANGE=f'bytes {start}-{end}/{len(self.payload)}')
+
+    def test_resumable_upload_is_attached_and_served_with_ranges(self):
+        url = self.start()
+        self.assertEqual(self.send(url, 0, 999).json()['received'], 1000)
+        # Javobi yo'qolgan bo'lak qayta yuboriladi
+        self.assertEqual(self.send(url, 0, 999).status_code, 200)
+        gap = self.send(url, 1500, 1999)
+        self.assertEqual((gap.status_code, gap['Range']), (409, 'bytes=0-999'))
+        self.send(url, 1000, 1999)
+        done = self.send(url, 2000, 2559).json()
+        self.assertEqual(done['status'], 'complete')
+
+        video = VideoProducts.objects.get(pk=done['video'])
+        self.assertEqual(video.product_id, self.product.id)
+        response = self.client.get(reverse('video-stream', args=[video.pk]), HTTP_RANGE='bytes=100-199')
+        self.assertEqual((response.status_code, response['Content-Range']), (206, 'bytes 100-199/2560'))
+        self.assertEqual(b''.join(response.streaming_content), self.payload[100:200])
+        response = self.client.get(reverse('video-stream', args=[video.pk]))
+        self.assertEqual(b''.join(response.streaming_content), self.payload)
+        self.assertEqual(self.client.get(reverse('video-stream', args=[video.pk]),
+                                         HTTP_RANGE='bytes=9000-').status_code, 416)
+
+    def test_checksum_mismatch_discards_upload(self):
+        url = self.start(sha256='0' * 64, size=1000)
+        self.payload = self.payload[:1000]
+        response = self.send(url, 0, 999)
+        self.assertEqual((response.status_code, response.json()['status']), (400, 'failed'))
+        self.assertFalse(VideoProducts.objects.exists())
+        self.assertEqual(self.send(url, 0, 999).status_code, 409)
+
+
+class AsyncEndpointTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+
+    def test_async_catalog_matches_sync_listing(self):
+        for _ in range(3):
+            make_full_product(self.shop, self.category)
+        sync = self.client.get(reverse('product-list'), {'page_size': 2}).json()
+        first = self.client.get(reverse('async-product-list'), {'page_size': 2}).json()
+        self.assertEqual(first['results'], sync['results'])
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+        self.assertEqual(self.client.get(reverse('async-product-list'), {'cursor': 'bad'}).status_code, 404)
+
+    def test_cursor_keeps_microseconds(self):
+        Product.objects.bulk_create([
+            Product(shop=self.shop, category=self.category, articul=articul, name_ru='Товар', name_uz='Mahsulot',
+                    description_ru='Описание', description_uz='Tavsif', price=1000, amount=100)
+            for articul in Product.generate_articuls(60)
+        ])
+        # Hammasi bir xil vaqtda, millisekunddan kichik qismi bilan
+        Product.objects.update(created_at=timezone.now().replace(microsecond=123456))
+
+        seen, url = [], reverse('async-product-list') + '?page_size=7'
+        while url:
+            page = self.client.get(url).json()
+            seen += [product['id'] for product in page['results']]
+            url = page['next']
+        self.assertEqual(sorted(seen), sorted(Product.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), 60)
+
+    def test_async_order_history_uses_token_claims(self):
+        from accounts.authentication import ClaimsRefreshToken
+
+        customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        product = make_product(self.shop, self.category, price=100)
+        orders = [Order.objects.create(customer=customer) for _ in range(3)]
+        OrderItem.objects.create(order=orders[0], product=product, product_quantity=2)
+
+        self.assertEqual(self.client.get(reverse('async-order-history')).status_code, 401)
+        token = ClaimsRefreshToken.for_user(customer).access_token
+        response = self.client.get(reverse('async-order-history'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual([order['id'] for order in response.json()['results']], [order.id for order in orders[::-1]])
+        self.assertEqual(response.json()['results'][-1]['order_items'][0]['product_quantity'], 2)
+
+
+class BenchSuiteTests(TestCase):
+    def test_generated_dataset_supports_every_scenario(self):
+        import random
+
+        from seller.bench_data import generate
+        from seller.bench_scenarios import SCENARIOS, Context, run_scenario
+
+        data = generate('small', seed=7, customers=5, vendors=1, shops=2, categories=2, products=30, orders=6,
+                        reviews=4)
+        self.assertEqual(Product.objects.count(), 30)
+        self.assertEqual(Review.objects.count(), 4)
+        self.assertEqual(OrderItem.objects.count(), 18)
+        self.assertEqual(Order.objects.filter(total_price=0).count(), 0)
+
+        ctx = Context(data, random.Random(7))
+        for name in SCENARIOS:
+            with self.subTest(scenario=name):
+                stats = run_scenario(name, ctx, iterations=1)
+                self.assertGreater(stats['requests'], 0)
+                self.assertEqual(stats['errors'], 0, stats['endpoints'])
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        from seller.instrumentation import registry
+
+        self.registry = registry
+        self.registry.reset()
+        _, self.shop, self.category = make_catalog_fixtures()
+
+    def test_sampled_request_records_queries_and_render_time(self):
+        product = make_product(self.shop, self.category, price=100)
+        self.assertEqual(self.client.get(reverse('product-detail', args=[product.pk])).status_code, 200)
+
+        self.assertEqual(self.registry.requests[('product-detail', 'GET', '2xx')], 1)
+        queries = self.registry.histograms[('db_queries_per_request', 'product-detail')]
+        self.assertEqual(queries.count, 1)
+        self.assertGreater(queries.sum, 0)
+        self.assertGreater(self.registry.histograms[('serialization_duration_seconds', 'product-detail')].sum, 0)
+        self.assertGreater(self.registry.histograms[('render_duration_seconds', 'product-detail')].sum, 0)
+
+    def test_serialization_time_covers_serializer_data(self):
+        from seller.instrumentation import RequestMetrics, current
+
+        make_full_product(self.shop, self.category)
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            ProductsSerializer(product_catalog_queryset(), many=True).data
+        finally:
+            current.reset(token)
+        self.assertGreater(metrics.serialization_time, 0)
+        self.assertFalse(metrics.serializing)
+        self.assertEqual(metrics.render_time, 0)
+
+    @override_settings(METRICS_DUPLICATE_QUERY_THRESHOLD=2)
+    def test_repeated_queries_are_flagged(self):
+        from seller.instrumentation import RequestMetrics, current
+
+        metrics = RequestMetrics()
+        token = current.set(metrics)
+        try:
+            # Parametrlari boshqa, shakli bir xil so'rovlar bitta yozuvga tushadi
+            for pk in (1, 2, 3):
+                Product.objects.filter(pk=pk).exists()
+        finally:
+            current.reset(token)
+        self.assertEqual(list(metrics.queries.values()), [3])
+
+        with self.assertLogs('seller.instrumentation', 'WARNING'):
+            self.registry.record('product-list', 'GET', 200, 0.01, metrics)
+        self.assertEqual(self.registry.duplicates['product-list'], 1)
+
+    def test_metrics_endpoint_is_local_only(self):
+        self.client.get(reverse('category-list'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('http_requests_total{route="category-list",method="GET",status="2xx"} 1', body)
+        self.assertIn('http_request_duration_seconds_bucket{route="category-list",le="+Inf"} 1', body)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1').status_code, 404)
+
+
+class DatabaseProfileTests(TestCase):
+    def test_sqlite_connections_use_tuned_pragmas(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite profile only.')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+            # WAL faqat SQLITE_WAL bilan yoqiladi, repodagi db.sqlite3 sarlavhasi o'zgarmaydi
+            wal = 'journal_mode=WAL' in settings.DATABASES['default']['OPTIONS']['init_command']
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1 if wal else 2)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], settings.DATABASES['default']['OPTIONS']['timeout'] * 1000)
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class ScalableAdminTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        admin = User.objects.create_superuser(username='admin', password='secret-pass-123', user_type='admin')
+        self.client.force_login(admin)
+
+    def make_variants(self, count):
+        for n in range(count):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    product = make_product(self.shop, self.category, name_ru=f'Товар {n}', name_uz=f'Mahsulot {n}')
+            ProductVariant.objects.create(product=product, color='red', size='M', stock=n, price=900)
+
+    def count_queries(self, name, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name), params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_query_per_row(self):
+        self.make_variants(2)
+        # Birinchi so'rov sessiya va ContentType keshlarini to'ldiradi
+        self.count_queries('admin:seller_product_changelist')
+        few = [self.count_queries('admin:seller_product_changelist'),
+               self.count_queries('admin:seller_productvariant_changelist')]
+        self.make_variants(10)
+        many = [self.count_queries('admin:seller_product_changelist'),
+                self.count_queries('admin:seller_productvariant_changelist')]
+        self.assertEqual(few, many)
+
+    def test_search_by_articul_and_name(self):
+        self.make_variants(3)
+        product = Product.objects.get(name_uz='Mahsulot 1')
+        url = reverse('admin:seller_productvariant_changelist')
+        for term in (product.articul, 'mahsulot 1'):
+            response = self.client.get(url, {'q': term})
+            self.assertEqual([variant.product_id for variant in response.context['cl'].result_list], [product.id])
+
+    def test_large_tables_use_estimated_count(self):
+        self.make_variants(3)
+        url = reverse('admin:seller_product_changelist')
+        with override_settings(ADMIN_APPROXIMATE_COUNT_THRESHOLD=1):
+            Product.objects.filter(name_uz='Mahsulot 0').delete()
+            # MAX(rowid) o'chirilgan qatorni ham sanaydi: COUNT(*) bajarilmagani shundan ko'rinadi
+            self.assertEqual(self.client.get(url).context['cl'].result_count, 3)
+        self.assertEqual(self.client.get(url).context['cl'].result_count, 2)
+
+    def test_product_autocomplete(self):
+        self.make_variants(2)
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'seller', 'model_name': 'productvariant', 'field_name': 'product', 'term': 'Mahsulot 1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_full_product(self.shop, self.category, name_ru='Чай, "зелёный"')
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def download(self, name, **params):
+        response = self.client.get(reverse(name), {'shop': self.shop.id, **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_product_csv_can_be_imported_again(self):
+        response, body = self.download('product-export')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="products.csv"')
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8-sig'))))
+        self.assertEqual([row['articul'] for row in rows], [self.product.articul])
+        self.assertEqual(json.loads(rows[0]['variants'])[0]['stock'], 5)
+
+        report = ProductImporter().run(read_rows(io.BytesIO(body), 'csv'))
+        self.assertEqual((report['created'], report['failed']), (1, 0))
+        copy = Product.objects.exclude(pk=self.product.pk).get()
+        self.assertEqual(copy.name_ru, self.product.name_ru)
+        for relation in ('variants', 'bulk_prices', 'product_keywords', 'characteristics', 'photos', 'videos'):
+            self.assertEqual(getattr(copy, relation).count(), 1, relation)
+
+    def test_orders_are_filtered_by_date_and_gzipped(self):
+        customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        old = Order.objects.create(customer=customer, created_at=timezone.now() - timedelta(days=10))
+        OrderItem.objects.create(order=old, product=self.product, product_quantity=1)
+        recent = Order.objects.create(customer=customer)
+        item = OrderItem.objects.create(order=recent, product=self.product, product_quantity=3)
+
+        today = timezone.localdate()
+        response, body = self.download('order-export', start=today - timedelta(days=1), end=today, gzip=True)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = list(csv.DictReader(io.StringIO(gzip.decompress(body).decode('utf-8-sig'))))
+        self.assertEqual([(row['order'], row['item'], row['customer_username']) for row in rows],
+                         [(str(recent.id), str(item.id), 'buyer')])
+        self.assertEqual(Decimal(rows[0]['line_total']), item.get_total_price())
+
+    def test_shop_order_export_hides_other_shops_revenue(self):
+        customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        other_owner = User.objects.create_user(username='other-vendor', password='pass', user_type='vendor')
+        other_shop = Shop.objects.create(owner=other_owner, name='Other', description='Other',
+                                         image='images/shop/other.png')
+        order = Order.objects.create(customer=customer)
+        item = OrderItem.objects.create(order=order, product=self.product, product_quantity=2)
+        OrderItem.objects.create(order=order, product=make_product(other_shop, self.category, price=70000),
+                                 product_quantity=1)
+
+        _, body = self.download('order-export')
+        rows = list(csv.DictReader(io.StringIO(body.decode('utf-8-sig'))))
+        self.assertEqual([row['item'] for row in rows], [str(item.id)])
+        self.assertEqual(Decimal(rows[0]['order_total']), item.get_total_price())
+        self.assertEqual(next(order_rows())[4], 'order_total')
+        order.refresh_from_db()
+        self.assertEqual(list(order_rows())[1][4], order.total_price)
+
+    def test_xlsx_is_a_valid_workbook(self):
+        _, body = self.download('product-export', file_format='xlsx')
+        with zipfile.ZipFile(io.BytesIO(body)) as workbook:
+            self.assertIsNone(workbook.testzip())
+            sheet = workbook.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row '), 2)
+        self.assertIn('Чай, "зелёный"', sheet)
+
+        response = self.client.get(reverse('product-export'), {'shop': self.shop.id, 'file_format': 'xlsx',
+                                                               'gzip': True})
+        self.assertEqual(response.status_code, 400)
+
+    def test_command_writes_gzipped_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'products.csv.gz')
+            call_command('export', 'products', output=path, gzip=True, shop=self.shop.id, stderr=io.StringIO())
+            with gzip.open(path, 'rt', encoding='utf-8-sig') as source:
+                rows = list(csv.DictReader(source))
+        self.assertEqual([row['id'] for row in rows], [str(self.product.id)])
+
+    def test_vendor_exports_only_own_shop(self):
+        stranger = User.objects.create_user(username='other-vendor', password='pass', user_type='vendor')
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.client.get(reverse('product-export'), {'shop': self.shop.id}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('order-export')).status_code, 400)
+
+    def test_rows_are_read_in_chunks(self):
+        for _ in range(4):
+            make_full_product(self.shop, self.category)
+        with CaptureQueriesContext(connection) as queries:
+            rows = list(product_rows(chunk_size=2))
+        self.assertEqual(len(rows), 6)
+        # Mahsulotlar bitta so'rovda, har bo'lak uchun 6 ta ichki jadval so'rovi
+        self.assertEqual(len(queries), 1 + 3 * 6)
+
+
+class FastSerializationTests(TestCase):
+    def setUp(self):
+        self.owner, self.shop, self.category = make_catalog_fixtures()
+        self.product = make_full_product(self.shop, self.category, name_ru='Чай\u2028"зелёный"', rating=4.5)
+        PhotoProducts.objects.filter(product=self.product).update(
+            renditions={'widths': {'320': 'products/renditions/a-320.webp'}})
+        PhotoProducts.objects.create(product=self.product)
+        self.bare = make_product(self.shop, self.category)
+        self.client = APIClient()
+
+    def expected(self, response, serializer_class, queryset):
+        data = serializer_class(queryset, many=True, context={'request': response.wsgi_request}).data
+        body = response.json()
+        return JSONRenderer().render({'next': body['next'], 'previous': body['previous'], 'results': data})
+
+    def test_product_list_is_byte_identical(self):
+        response = self.client.get(reverse('product-list'))
+        queryset = product_catalog_queryset().order_by('-created_at', '-id')
+        self.assertEqual(response.content, self.expected(response, ProductsSerializer, queryset))
+        self.assertEqual(len(response.json()['results'][1]['photos']), 2)
+
+        # Sahifa kursori ham eski yo'l bilan bir xil ishlaydi
+        first = self.client.get(reverse('product-list'), {'page_size': 1}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual([first['results'][0]['id'], second['results'][0]['id']], [self.bare.id, self.product.id])
+
+    def test_order_list_is_byte_identical(self):
+        customer = User.objects.create_user(username='buyer', password='pass', user_type='user')
+        for quantity in (1, 3):
+            order = Order.objects.create(customer=customer)
+            OrderItem.objects.create(order=order, product=self.product, product_quantity=quantity)
+            OrderItem.objects.create(order=order, product=self.bare, product_quantity=2)
+        Order.objects.create(customer=customer)
+        self.client.force_authenticate(customer)
+
+        response = self.client.get(reverse('order-list-create'))
+        queryset = Order.objects.filter(customer=customer).order_by('-id').prefetch_related('order_items')
+        self.assertEqual(response.content, self.expected(response, OrderSerializer, queryset))
+
+    def test_nested_rows_are_loaded_per_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            rows = product_converter.convert(Product.objects.values(*product_converter.columns))
+        self.assertEqual(len(rows), 2)
+        # Mahsulotlar va oltita ichki ro'yxat uchun bittadan so'rov
+        self.assertEqual(len(queries), 7)
+
+    @skipUnless(msgpack, 'msgpack is not installed.')
+    def test_msgpack_is_selected_by_accept_header(self):
+        response = self.client.get(reverse('product-list'), HTTP_ACCEPT='application/msgpack')
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), self.client.get(reverse('product-list')).json())
+
+    def test_msgpack_keeps_decimals_as_strings(self):
+        self.assertEqual(encode_default(Decimal('12.50')), '12.50')
+        self.assertEqual(encode_default(date(2026, 3, 1)), '2026-03-01')
@@ -0,0 +1,204 @@
+import hashlib
+import mimetypes
+import os
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import StreamingHttpResponse, HttpResponse
+from django.utils import timezone
+
+from seller.models.products import PhotoProducts, VideoProducts
+from seller.models.uploads import UploadSession
+
+READ_BLOCK = 64 * 1024
+CONTENT_RANGE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+TARGETS = {
+    'video': (VideoProducts, 'video'),
+    'image': (PhotoProducts, 'image'),
+}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def partial_path(session):
+    directory = getattr(settings, 'UPLOAD_SESSION_DIR', os.path.join(settings.MEDIA_ROOT, '.partial'))
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f'{session.pk.hex}.part')
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE.match(header or '')
+    if match is None:
+        raise UploadError('Content-Range header must look like "bytes <start>-<end>/<total>".')
+    start, end = int(match.group(1)), int(match.group(2))
+    if match.group(3) != '*' and int(match.group(3)) != size:
+        raise UploadError(f'Total size does not match the session size of {size} bytes.')
+    if start > end or end >= size:
+        raise UploadError('Content-Range is outside of the file.', status=416)
+    max_chunk = getattr(settings, 'UPLOAD_MAX_CHUNK_SIZE', 8 * 1024 * 1024)
+    if end - start + 1 > max_chunk:
+        raise UploadError(f'Chunks must not exceed {max_chunk} bytes.', status=413)
+    return start, end
+
+
+def write_chunk(session, start, end, stream):
+    """Bo'lakni diskdagi qisman faylga to'g'ridan-to'g'ri yozadi, xotirada to'plamaydi.
+
+    Faqat received joyidan boshlanadigan bo'lak qabul qilinadi. Allaqachon
+    olingan bo'lak qayta yuborilsa (tarmoq uzilgandan keyin), u e'tiborsiz
+    qoldiriladi va joriy holat qaytariladi.
+    """
+    if session.status != 'uploading':
+        raise UploadError(f'Upload is {session.status}.', status=409)
+    if end < session.received:
+        return session
+    if start != session.received:
+        raise UploadError(f'Expected a chunk starting at byte {session.received}.', status=409)
+
+    path = partial_path(session)
+    if start and not os.path.exists(path):
+        _fail(session, 'Partial upload data is missing, start a new upload.')
+
+    expected = end - start + 1
+    written = 0
+    with open(path, 'r+b' if os.path.exists(path) else 'wb') as target:
+        target.seek(start)
+        while written < expected:
+            block = stream.read(min(READ_BLOCK, expected - written))
+            if not block:
+                break
+            target.write(block)
+            written += len(block)
+        if written != expected:
+            raise UploadError(f'Expected {expected} bytes in this chunk, received {written}.')
+        target.truncate(end + 1)
+
+    # Ikki parallel so'rovdan faqat bittasi offsetni suradi
+    if not UploadSession.objects.filter(pk=session.pk, received=start, status='uploading').update(
+            received=end + 1, updated_at=timezone.now()):
+        raise UploadError('Another chunk was written concurrently, retry from the current offset.', status=409)
+    session.received = end + 1
+    if session.received == session.size:
+        finalize(session)
+    return session
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _PartialFile(File):
+    # temporary_file_path bo'lsa FileSystemStorage faylni nusxalamay, ko'chiradi
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def _fail(session, error):
+    UploadSession.objects.filter(pk=session.pk).update(status='failed', error=error[:255], updated_at=timezone.now())
+    session.status, session.error = 'failed', error
+    if os.path.exists(partial_path(session)):
+        os.remove(partial_path(session))
+    raise UploadError(error)
+
+
+def finalize(session):
+    path = partial_path(session)
+    checksum = file_sha256(path)
+    if session.sha256 and session.sha256.lower() != checksum:
+        _fail(session, 'Checksum mismatch, the upload has been discarded.')
+    session.sha256 = checksum
+
+    model, field = TARGETS[session.kind]
+    upload_to = model._meta.get_field(field).upload_to
+    with open(path, 'rb') as source:
+        name = default_storage.save(os.path.join(upload_to, os.path.basename(session.filename)), _PartialFile(source))
+    if os.path.exists(path):
+        os.remove(path)
+
+    with transaction.atomic():
+        attachment = model.objects.create(product=session.product, product_variants=session.product_variants,
+                                          **{field: name})
+        if session.kind == 'video':
+            session.video = attachment
+        else:
+            session.photo = attachment
+        session.status = 'complete'
+        session.save(update_fields=['sha256', 'status', 'video', 'photo', 'updated_at'])
+    return attachment
+
+
+def discard_expired_sessions(now=None):
+    ttl = getattr(settings, 'UPLOAD_SESSION_TTL', 24 * 60 * 60)
+    expired = UploadSession.objects.filter(status='uploading', updated_at__lt=(now or timezone.now()) - timedelta(
+        seconds=ttl))
+    count = 0
+    for session in expired:
+        path = partial_path(session)
+        if os.path.exists(path):
+            os.remove(path)
+        session.delete()
+        count += 1
+    return count
+
+
+def parse_range(header, size):
+    """Bitta "bytes=" oralig'ini (start, end) ko'rinishida qaytaradi; sarlavha bo'lmasa None."""
+    match = RANGE.match(header or '')
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    if match.group(1) == '':
+        length = int(match.group(2))
+        if not length:
+            raise UploadError('Requested range not satisfiable.', status=416)
+        return max(size - length, 0), size - 1
+    start = int(match.group(1))
+    end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+    if start >= size or start > end:
+        raise UploadError('Requested range not satisfiable.', status=416)
+    return start, end
+
+
+def _read_range(path, start, end):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            block = source.read(min(READ_BLOCK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def ranged_file_response(request, path):
+    size = os.path.getsize(path)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size) if size else None
+    except UploadError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(_read_range(path, start, end), content_type=content_type,
+                                     status=206 if byte_range else 200)
+    response['Content-Length'] = str(max(end - start + 1, 0))
+    response['Accept-Ranges'] = 'bytes'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
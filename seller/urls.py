@@ -1,13 +1,42 @@
 from django.urls import path
 
-from seller.views import ProductCreateAPIView, ProductUpdateAPIView, OrderListCreateView, OrderDetailView, \
-    OrderItemCreateView, ReviewListCreateView
+from seller import async_views
+
+from seller.views import ProductListAPIView, ProductDetailAPIView, ProductSearchAPIView, ProductFacetsAPIView, \
+    ProductCreateAPIView, ProductUpdateAPIView, ProductImportAPIView, PriceQuoteAPIView, OrderListCreateView, \
+    OrderDetailView, OrderConfirmView, OrderItemCreateView, OrderItemBulkCreateView, ReviewListCreateView, \
+    OrderSummaryView, CategoryListAPIView, CategoryDetailAPIView, ShopDetailAPIView, CacheStatsAPIView, \
+    SalesAnalyticsAPIView, TopProductsAPIView, UploadSessionCreateView, UploadSessionDetailView, video_stream, \
+    ProductExportView, OrderExportView
 
 urlpatterns = [
+    path('product/', ProductListAPIView.as_view(), name='product-list'),
+    path('product/<int:pk>/', ProductDetailAPIView.as_view(), name='product-detail'),
+    path('product/facets/', ProductFacetsAPIView.as_view(), name='product-facets'),
+    path('product/search/', ProductSearchAPIView.as_view(), name='product-search'),
     path('product/create/' ,ProductCreateAPIView.as_view()),
     path('product/update/<int:pk>/', ProductUpdateAPIView.as_view()),
+    path('product/import/', ProductImportAPIView.as_view(), name='product-import'),
+    path('category/', CategoryListAPIView.as_view(), name='category-list'),
+    path('category/<int:pk>/', CategoryDetailAPIView.as_view(), name='category-detail'),
+    path('shop/<int:pk>/', ShopDetailAPIView.as_view(), name='shop-detail'),
+    path('cache/stats/', CacheStatsAPIView.as_view(), name='cache-stats'),
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload-detail'),
+    path('videos/<int:pk>/stream/', video_stream, name='video-stream'),
+    path('pricing/quote/', PriceQuoteAPIView.as_view(), name='price-quote'),
     path('orders/', OrderListCreateView.as_view(), name='order-list-create'),
+    path('orders/summary/', OrderSummaryView.as_view(), name='order-summary'),
     path('orders/<int:pk>/', OrderDetailView.as_view(), name='order-detail'),
+    path('orders/<int:pk>/confirm/', OrderConfirmView.as_view(), name='order-confirm'),
     path('orders/add-item/', OrderItemCreateView.as_view(), name='order-item-create'),
+    path('orders/add-items/', OrderItemBulkCreateView.as_view(), name='order-item-bulk-create'),
+    path('analytics/sales/', SalesAnalyticsAPIView.as_view(), name='sales-analytics'),
+    path('analytics/top-products/', TopProductsAPIView.as_view(), name='top-products'),
+    path('export/products/', ProductExportView.as_view(), name='product-export'),
+    path('export/orders/', OrderExportView.as_view(), name='order-export'),
     path('reviews/', ReviewListCreateView.as_view(), name='review-list-create'),
+    path('async/product/', async_views.product_list, name='async-product-list'),
+    path('async/orders/', async_views.order_history, name='async-order-history'),
+    path('async/reviews/', async_views.review_list, name='async-review-list'),
 ]
\ No newline at end of file
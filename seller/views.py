@@ -1,13 +1,148 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from drf_spectacular.utils import extend_schema
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, generics, permissions
+from rest_framework import status, generics, permissions, serializers
+
+from accounts.permissions import IsVendor
+from seller.analytics import sales_series, top_products, day_bounds
+from seller.exports import CONTENT_TYPES, product_rows, order_rows, export_chunks, export_filename
+from seller.cache import product_cache, category_cache, shop_cache, cache_stats
+from seller.fast_serializers import product_converter, order_converter
+from seller.facets import filter_products, parse_selection, facet_counts
+from seller.instrumentation import registry
+from seller.importers import ProductImporter, detect_format, read_rows
+from seller.models import Shop, Category
+from seller.models.products import Product, Review, VideoProducts
+from seller.models.uploads import UploadSession
+from seller.pagination import ProductCursorPagination, OrderCursorPagination
+from seller.serializers import ProductsSerializer, ReviewSerializer, OrderSerializer, OrderItemSerializer, \
+    ProductImportSerializer, OrderItemBulkCreateSerializer, PriceQuoteSerializer, PriceQuoteLineSerializer, \
+    ProductSearchQuerySerializer, CategorySerializer, ShopSerializer, OrderMonthlySummarySerializer, \
+    SalesAnalyticsQuerySerializer, UploadSessionSerializer, ExportQuerySerializer
+from seller.renderers import LIST_RENDERER_CLASSES
+from seller.pricing import price_tier_index
+from seller.search import search_products
+from seller.stock import reserve, confirm_order
+from seller.uploads import UploadError, parse_content_range, write_chunk, ranged_file_response
+from seller.models.orders import Order, OrderItem, OrderMonthlySummary
+
+
+def product_catalog_queryset():
+    # Sahifadagi mahsulotlar soni qancha bo'lmasin, so'rovlar soni o'zgarmaydi
+    return Product.objects.select_related('shop', 'category').prefetch_related(
+        'photos', 'videos', 'product_keywords', 'characteristics', 'variants', 'bulk_prices',
+    )
+
+
+class ProductListAPIView(generics.ListAPIView):
+    serializer_class = ProductsSerializer
+    pagination_class = ProductCursorPagination
+    renderer_classes = LIST_RENDERER_CLASSES
+
+    def get_queryset(self):
+        return filter_products(product_catalog_queryset(), parse_selection(self.request.query_params))
+
+    def list(self, request, *args, **kwargs):
+        # Javob ProductsSerializer bilan bir xil, lekin model va serializer obyektlarisiz values() dan quriladi
+        queryset = filter_products(Product.objects.values(*product_converter.columns),
+                                   parse_selection(request.query_params))
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(product_converter.convert(page, request))
+
+
+class ProductFacetsAPIView(APIView):
+    def get(self, request):
+        return Response(facet_counts(parse_selection(request.query_params)))
+
+
+def host_independent_context(view):
+    # request berilmasa fayl URLlari nisbiy (/media/...) qoladi: keshdagi nusxa Host sarlavhasiga bog'liq emas
+    return {'view': view, 'format': view.format_kwarg, 'request': None}
+
+
+def absolute_media_urls(data, request):
+    """Keshdan o'qilgan ma'lumotdagi nisbiy media URLlarini joriy so'rov hosti bilan to'liq qiladi."""
+    if isinstance(data, str):
+        return request.build_absolute_uri(data) if data.startswith(settings.MEDIA_URL) else data
+    if isinstance(data, dict):
+        return {key: absolute_media_urls(value, request) for key, value in data.items()}
+    if isinstance(data, list):
+        return [absolute_media_urls(value, request) for value in data]
+    return data
+
+
+class CachedRetrieveMixin:
+    tiered_cache = None
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_field]
+
+        def load():
+            return self.get_serializer_class()(self.get_object(), context=host_independent_context(self)).data
+
+        return Response(absolute_media_urls(self.tiered_cache.get_or_set(pk, load), request))
+
+
+class ProductDetailAPIView(CachedRetrieveMixin, generics.RetrieveAPIView):
+    serializer_class = ProductsSerializer
+    tiered_cache = product_cache
+
+    def get_queryset(self):
+        return product_catalog_queryset()
+
+
+class CategoryListAPIView(generics.ListAPIView):
+    serializer_class = CategorySerializer
+    queryset = Category.objects.order_by('id')
+
+    def list(self, request, *args, **kwargs):
+        def load():
+            return self.get_serializer_class()(self.filter_queryset(self.get_queryset()), many=True,
+                                               context=host_independent_context(self)).data
+
+        return Response(absolute_media_urls(category_cache.get_or_set('all', load), request))
+
+
+class CategoryDetailAPIView(CachedRetrieveMixin, generics.RetrieveAPIView):
+    serializer_class = CategorySerializer
+    queryset = Category.objects.all()
+    tiered_cache = category_cache
+
+
+class ShopDetailAPIView(CachedRetrieveMixin, generics.RetrieveAPIView):
+    serializer_class = ShopSerializer
+    queryset = Shop.objects.all()
+    tiered_cache = shop_cache
+
+
+class CacheStatsAPIView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+class ProductSearchAPIView(APIView):
+    @extend_schema(parameters=[ProductSearchQuerySerializer])
+    def get(self, request):
+        params = ProductSearchQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        ids = search_products(params.validated_data['q'], params.validated_data['limit'], params.validated_data['offset'])
+        products = product_catalog_queryset().in_bulk(ids)
+        results = [products[product_id] for product_id in ids if product_id in products]
+        return Response({
+            "results": ProductsSerializer(results, many=True, context={'request': request}).data,
+        })
 
-from seller.models.products import Product, Review
-from seller.serializers import ProductsSerializer, ReviewSerializer, OrderSerializer, OrderItemSerializer
-from seller.models.orders import Order, OrderItem
 
 class ProductCreateAPIView(APIView):
     @extend_schema(request=ProductsSerializer)
@@ -31,14 +166,87 @@ class ProductUpdateAPIView(APIView):
 
 
 
+class ProductImportAPIView(APIView):
+    parser_classes = [MultiPartParser]
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=ProductImportSerializer)
+    def post(self, request):
+        serializer = ProductImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = serializer.validated_data['file']
+        try:
+            file_format = serializer.validated_data.get('format') or detect_format(upload.name)
+        except ValueError as exc:
+            return Response({"file": [str(exc)]}, status=status.HTTP_400_BAD_REQUEST)
+
+        shop_ids = None
+        if not request.user.is_staff:
+            shop_ids = Shop.objects.filter(owner_id=request.user.id).values_list('id', flat=True)
+        importer = ProductImporter(chunk_size=serializer.validated_data['chunk_size'], shop_ids=shop_ids)
+        report = importer.run(read_rows(upload.file, file_format))
+        return Response(report, status=status.HTTP_200_OK)
+
+
+class PriceQuoteAPIView(APIView):
+    @extend_schema(request=PriceQuoteSerializer)
+    def post(self, request):
+        serializer = PriceQuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        lines = serializer.validated_data['items']
+        try:
+            prices = price_tier_index.price_many((line['product'], line['product_quantity']) for line in lines)
+        except Product.DoesNotExist as exc:
+            raise ValidationError({"items": [str(exc)]})
+
+        items = [
+            {
+                "product": line['product'],
+                "product_quantity": line['product_quantity'],
+                "price_per_unit": price,
+                "total_price": price * line['product_quantity'],
+            }
+            for line, price in zip(lines, prices)
+        ]
+        total_price = serializers.DecimalField(max_digits=14, decimal_places=2).to_representation(
+            sum(item["total_price"] for item in items)
+        )
+        return Response({"items": PriceQuoteLineSerializer(items, many=True).data, "total_price": total_price})
+
+
 @extend_schema(request=OrderSerializer)
 class OrderListCreateView(generics.ListCreateAPIView):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = OrderCursorPagination
+    renderer_classes = LIST_RENDERER_CLASSES
 
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user)
+        return Order.objects.filter(customer_id=self.request.user.id).prefetch_related('order_items')
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(Order.objects.filter(customer_id=request.user.id)
+                                      .values(*order_converter.columns))
+        return self.get_paginated_response(order_converter.convert(page, request))
+
+
+class OrderSummaryView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        # Buyurtmalarni skanerlash o'rniga oylik yig'indi jadvalidan o'qiladi
+        months = OrderMonthlySummary.objects.filter(customer_id=request.user.id, order_count__gt=0).order_by('-month')
+        data = OrderMonthlySummarySerializer(months, many=True).data
+        return Response({
+            "order_count": sum(row['order_count'] for row in data),
+            "total_price": serializers.DecimalField(max_digits=14, decimal_places=2).to_representation(
+                sum((month.total_price for month in months), Decimal('0'))),
+            "months": data,
+        })
 
 @extend_schema(request=OrderSerializer)
 class OrderDetailView(generics.RetrieveDestroyAPIView):
@@ -47,33 +255,65 @@ class OrderDetailView(generics.RetrieveDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Order.objects.filter(customer=self.request.user)
+        return Order.objects.filter(customer_id=self.request.user.id)
+
+class OrderConfirmView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        order = get_object_or_404(Order, pk=pk, customer_id=request.user.id)
+        confirmed = confirm_order(order)
+        return Response({"confirmed": confirmed}, status=status.HTTP_200_OK)
+
 
 @extend_schema(request=OrderItemSerializer)
 class OrderItemCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        order = Order.objects.get(customer=request.user)
+        order = Order.objects.get(customer_id=request.user.id)
         serializer = OrderItemSerializer(data=request.data)
 
         if serializer.is_valid():
             product = serializer.validated_data['product']
             quantity = serializer.validated_data['product_quantity']
 
-            if quantity > product.amount:
-                raise ValidationError(f"Not enough stock available. Maximum: {product.amount}")
-
-            order_item = OrderItem.objects.create(order=order, product=product, product_quantity=quantity)
-            product.amount -= quantity
-            product.save()
-            order.update_total_price()
+            try:
+                with transaction.atomic():
+                    order_item = OrderItem.objects.create(order=order, product=product, product_quantity=quantity)
+                    reserve(product.pk, quantity, order_item=order_item)
+            except ValueError as exc:
+                raise ValidationError(str(exc))
+            order.refresh_from_db(fields=['total_price'])
 
             return Response(OrderSerializer(order).data)
 
         return Response(serializer.errors, status=400)
 
 
+@extend_schema(request=OrderItemBulkCreateSerializer)
+class OrderItemBulkCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        serializer = OrderItemBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        order = get_object_or_404(Order, pk=serializer.validated_data['order'], customer_id=request.user.id)
+        lines = serializer.validated_data['items']
+        products = Product.objects.prefetch_related('bulk_prices').in_bulk({line['product'] for line in lines})
+        missing = sorted({line['product'] for line in lines} - products.keys())
+        if missing:
+            raise ValidationError({"items": [f"Invalid product ids: {missing}"]})
+
+        try:
+            order.add_items([(products[line['product']], line['product_quantity']) for line in lines])
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+
+        return Response(OrderSerializer(order).data, status=status.HTTP_201_CREATED)
+
+
 @extend_schema(request=ReviewSerializer)
 class ReviewListCreateView(generics.ListCreateAPIView):
     queryset = Review.objects.all()
@@ -81,4 +321,132 @@ class ReviewListCreateView(generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
\ No newline at end of file
+        serializer.save(user_id=self.request.user.id)
+
+class SalesAnalyticsMixin:
+    permission_classes = [IsVendor]
+
+    def get_params(self, request):
+        params = SalesAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        filters = {f'{key}_id': data[key] for key in ('shop', 'category', 'product') if key in data}
+        if not request.user.is_staff:
+            # Sotuvchi faqat o'z do'koni hisobotini ko'radi
+            if 'shop' not in data:
+                raise ValidationError({"shop": ["This field is required."]})
+            get_object_or_404(Shop, pk=data['shop'], owner_id=request.user.id)
+        return data, filters
+
+
+class SalesAnalyticsAPIView(SalesAnalyticsMixin, APIView):
+    @extend_schema(parameters=[SalesAnalyticsQuerySerializer])
+    def get(self, request):
+        data, filters = self.get_params(request)
+        return Response(sales_series(data['start'], data['end'], **filters))
+
+
+class TopProductsAPIView(SalesAnalyticsMixin, APIView):
+    @extend_schema(parameters=[SalesAnalyticsQuerySerializer])
+    def get(self, request):
+        data, filters = self.get_params(request)
+        return Response(top_products(data['start'], data['end'], limit=data['limit'], **filters))
+
+
+class ExportView(APIView):
+    """Jadvalni CSV yoki XLSX fayl sifatida oqim bilan beradi; javob xotirada yig'ilmaydi."""
+
+    permission_classes = [IsVendor]
+    kind = None
+    rows = None
+
+    @extend_schema(parameters=[ExportQuerySerializer], responses={(200, 'text/csv'): {'type': 'string', 'format': 'binary'}})
+    def get(self, request):
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        if not request.user.is_staff:
+            # Sotuvchi faqat o'z do'koni ma'lumotlarini yuklaydi
+            if 'shop' not in data:
+                raise ValidationError({"shop": ["This field is required."]})
+            get_object_or_404(Shop, pk=data['shop'], owner_id=request.user.id)
+
+        rows = self.rows(
+            shop_id=data.get('shop'),
+            start=day_bounds(data['start'])[0] if data.get('start') else None,
+            end=day_bounds(data['end'])[1] if data.get('end') else None,
+        )
+        file_format, compress = data['file_format'], data['gzip']
+        response = StreamingHttpResponse(export_chunks(rows, file_format, compress),
+                                         content_type='application/gzip' if compress else CONTENT_TYPES[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(self.kind, file_format, compress)}"'
+        return response
+
+
+class ProductExportView(ExportView):
+    kind = 'products'
+    rows = staticmethod(product_rows)
+
+
+class OrderExportView(ExportView):
+    kind = 'orders'
+    rows = staticmethod(order_rows)
+
+
+class UploadSessionCreateView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @extend_schema(request=UploadSessionSerializer, responses=UploadSessionSerializer)
+    def post(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product']
+        if not request.user.is_staff and not Shop.objects.filter(pk=product.shop_id, owner_id=request.user.id).exists():
+            return Response({"product": ["You can only upload files to your own products."]},
+                            status=status.HTTP_403_FORBIDDEN)
+        session = serializer.save(owner_id=request.user.id)
+        return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+class UploadSessionDetailView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_session(self, request, pk):
+        return get_object_or_404(UploadSession, pk=pk, owner_id=request.user.id)
+
+    def respond(self, session, status_code=status.HTTP_200_OK, **extra):
+        response = Response({**UploadSessionSerializer(session).data, **extra}, status=status_code)
+        if session.received:
+            # Mijoz uzilishdan keyin qaysi baytdan davom etishini shu sarlavhadan biladi
+            response['Range'] = f'bytes=0-{session.received - 1}'
+        return response
+
+    @extend_schema(responses=UploadSessionSerializer)
+    def get(self, request, pk):
+        return self.respond(self.get_session(request, pk))
+
+    @extend_schema(request={'application/octet-stream': {'type': 'string', 'format': 'binary'}},
+                   responses=UploadSessionSerializer)
+    def put(self, request, pk):
+        session = self.get_session(request, pk)
+        try:
+            start, end = parse_content_range(request.headers.get('Content-Range'), session.size)
+            if request.stream is None:
+                raise UploadError('Chunk body is empty.')
+            write_chunk(session, start, end, request.stream)
+        except UploadError as exc:
+            session.refresh_from_db()
+            return self.respond(session, exc.status, detail=str(exc))
+        return self.respond(session)
+
+
+def video_stream(request, pk):
+    video = get_object_or_404(VideoProducts.objects.exclude(video=''), pk=pk)
+    return ranged_file_response(request, video.video.path)
+
+
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')